@@ -0,0 +1 @@
+# Benchmarks do dashboard: gerador de train.csv sintético e medição das funções
@@ -0,0 +1,37 @@
+""" Compara dois arquivos de resultados do benchmarks.run
+
+    Uso:
+        python -m benchmarks.compare antes.json depois.json
+"""
+# Libraries
+import argparse
+import json
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report, {(r['rows'], r['case']): r for r in report['results']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compara dois resultados de benchmark (depois / antes).')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+
+    before_report, before = load(args.before)
+    after_report, after = load(args.after)
+
+    print('{} -> {}'.format(before_report.get('label') or args.before, after_report.get('label') or args.after))
+    print('{:>10} {:<28} {:>10} {:>10} {:>8} {:>8}'.format('rows', 'case', 'antes (s)', 'depois (s)', 'tempo', 'memória'))
+    for key in sorted(set(before) & set(after)):
+        b, a = before[key], after[key]
+        print('{:>10} {:<28} {:>10.4f} {:>10.4f} {:>7.2f}x {:>7.2f}x'.format(
+            key[0], key[1], b['wall_s'], a['wall_s'],
+            a['wall_s'] / b['wall_s'] if b['wall_s'] else float('nan'),
+            a['peak_bytes'] / b['peak_bytes'] if b['peak_bytes'] else float('nan')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+""" Gera um train.csv sintético com o mesmo schema do dataset real
+
+    Uso:
+        python -m benchmarks.generate 1000000 dataset/bench_1m.csv [--seed 42]
+"""
+# Libraries
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Distribuições aproximadas do dataset real
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+COLUMNS = ['ID', 'Delivery_person_ID', 'Delivery_person_Age', 'Delivery_person_Ratings', 'Restaurant_latitude',
+           'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude', 'Order_Date', 'Time_Orderd',
+           'Time_Order_picked', 'Weatherconditions', 'Road_traffic_density', 'Vehicle_condition', 'Type_of_order',
+           'Type_of_vehicle', 'multiple_deliveries', 'Festival', 'City', 'Time_taken(min)']
+
+# Códigos das cidades usados no Delivery_person_ID e coordenadas aproximadas dos restaurantes
+CITIES = {'INDO': (22.72, 75.86), 'BANG': (12.97, 77.59), 'COIMB': (11.02, 76.96), 'CHEN': (13.08, 80.27),
+          'HYD': (17.39, 78.49), 'RANCHI': (23.34, 85.31), 'MYS': (12.30, 76.64), 'DEH': (30.32, 78.03),
+          'KOC': (9.93, 76.27), 'PUNE': (18.52, 73.86), 'LUDH': (30.90, 75.86), 'KNP': (26.45, 80.33),
+          'MUM': (19.08, 72.88), 'KOL': (22.57, 88.36), 'JAP': (26.91, 75.79), 'SUR': (21.17, 72.83),
+          'GOA': (15.49, 73.83), 'AURG': (19.88, 75.34), 'AGR': (27.18, 78.01), 'VAD': (22.31, 73.18),
+          'ALH': (25.44, 81.85), 'BHP': (23.26, 77.41)}
+
+DISTRIBUTIONS = {
+    'City': (['Metropolitian', 'Urban', 'Semi-Urban', 'NaN'], [0.745, 0.223, 0.004, 0.028]),
+    'Road_traffic_density': (['Low', 'Jam', 'Medium', 'High', 'NaN'], [0.337, 0.311, 0.239, 0.099, 0.014]),
+    'Festival': (['No', 'Yes', 'NaN'], [0.975, 0.020, 0.005]),
+    'Weatherconditions': (['Fog', 'Stormy', 'Cloudy', 'Sandstorms', 'Windy', 'Sunny', 'NaN'],
+                          [0.169, 0.167, 0.166, 0.165, 0.164, 0.155, 0.014]),
+    'Type_of_order': (['Snack', 'Meal', 'Drinks', 'Buffet'], [0.254, 0.252, 0.248, 0.246]),
+    'Type_of_vehicle': (['motorcycle', 'scooter', 'electric_scooter', 'bicycle'], [0.584, 0.334, 0.081, 0.001]),
+    'multiple_deliveries': (['1', '0', '2', '3', 'NaN'], [0.619, 0.310, 0.044, 0.005, 0.022]),
+}
+
+FIRST_DATE = pd.Timestamp('2022-02-11')
+LAST_DATE = pd.Timestamp('2022-04-06')
+
+
+def _padded(values):
+    # texto com o espaço sobrando do dataset real ('Urban ', 'NaN ')
+    return np.char.add(values.astype(str), ' ').astype(object)
+
+
+def _choice(rng, name, n):
+    values, probs = DISTRIBUTIONS[name]
+    return rng.choice(np.array(values), size=n, p=probs)
+
+
+def generate_chunk(n, rng, first_id=0, restaurants=20):
+    """ Gera n linhas sintéticas no formato bruto do train.csv
+        
+        Input: quantidade de linhas, numpy Generator, número do primeiro pedido,
+               restaurantes por cidade (define a quantidade de entregadores)
+        Output: Dataframe com as colunas do csv, ainda com 'NaN ' e '(min) N'
+    """
+    cities = np.array(list(CITIES))
+    city_code = rng.integers(0, len(cities), n)
+    centers = np.array(list(CITIES.values()))
+
+    # Entregadores: cidade + restaurante + número
+    restaurant = rng.integers(1, restaurants + 1, n)
+    deliverer = rng.integers(1, 4, n)
+    delivery_person_id = np.char.add(np.char.add(np.char.add(cities[city_code], 'RES'), restaurant.astype(str)),
+                                     np.char.add('DEL0', deliverer.astype(str)))
+
+    rest_lat = np.round(centers[city_code, 0] + rng.normal(0, 0.05, n), 6)
+    rest_lon = np.round(centers[city_code, 1] + rng.normal(0, 0.05, n), 6)
+
+    age = rng.integers(20, 40, n).astype(str).astype(object)
+    ratings = np.round(np.clip(rng.normal(4.63, 0.33, n), 2.5, 5.0), 1).astype(str).astype(object)
+    sem_idade = rng.random(n) < 0.04
+    age[sem_idade] = 'NaN '
+    ratings[sem_idade] = 'NaN '
+
+    days = rng.integers(0, (LAST_DATE - FIRST_DATE).days + 1, n)
+    dates = (FIRST_DATE + pd.to_timedelta(days, unit='D')).strftime('%d-%m-%Y')
+    minutes = rng.integers(8 * 60, 23 * 60 + 45, n)
+    ordered = pd.to_datetime(minutes, unit='m').strftime('%H:%M:%S').to_numpy().astype(object)
+    picked = pd.to_datetime(minutes + rng.choice([5, 10, 15], n), unit='m').strftime('%H:%M:%S')
+    ordered[sem_idade] = 'NaN '
+
+    weather = _choice(rng, 'Weatherconditions', n)
+    multiple_deliveries = _choice(rng, 'multiple_deliveries', n).astype(object)
+    multiple_deliveries[multiple_deliveries == 'NaN'] = 'NaN '
+
+    return pd.DataFrame({
+        'ID': _padded(np.char.add('0x', np.char.mod('%x', np.arange(first_id, first_id + n)))),
+        'Delivery_person_ID': _padded(delivery_person_id),
+        'Delivery_person_Age': age,
+        'Delivery_person_Ratings': ratings,
+        'Restaurant_latitude': rest_lat,
+        'Restaurant_longitude': rest_lon,
+        'Delivery_location_latitude': np.round(rest_lat + rng.uniform(-0.1, 0.1, n), 6),
+        'Delivery_location_longitude': np.round(rest_lon + rng.uniform(-0.1, 0.1, n), 6),
+        'Order_Date': dates,
+        'Time_Orderd': ordered,
+        'Time_Order_picked': picked,
+        'Weatherconditions': np.char.add('conditions ', weather),
+        'Road_traffic_density': _padded(_choice(rng, 'Road_traffic_density', n)),
+        'Vehicle_condition': rng.integers(0, 3, n),
+        'Type_of_order': _padded(_choice(rng, 'Type_of_order', n)),
+        'Type_of_vehicle': _padded(_choice(rng, 'Type_of_vehicle', n)),
+        'multiple_deliveries': multiple_deliveries,
+        'Festival': _padded(_choice(rng, 'Festival', n)),
+        'City': _padded(_choice(rng, 'City', n)),
+        'Time_taken(min)': np.char.add('(min) ', rng.integers(10, 55, n).astype(str)),
+    }, columns=COLUMNS)
+
+
+def generate(rows, path, seed=42, chunksize=1000000):
+    """ Grava um train.csv sintético com rows linhas
+        As linhas são geradas e gravadas em blocos, então o tamanho do arquivo
+        não é limitado pela memória. A quantidade de entregadores cresce com a
+        quantidade de linhas (cerca de 30 pedidos por entregador), como na base real.
+        
+        Input: quantidade de linhas, caminho de saída, semente, linhas por bloco
+        Output: None
+    """
+    rng = np.random.default_rng(seed)
+    restaurants = max(20, rows // 2000)
+    for start in range(0, rows, chunksize):
+        chunk = generate_chunk(min(chunksize, rows - start), rng, first_id=start, restaurants=restaurants)
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera um train.csv sintético.')
+    parser.add_argument('rows', type=int, help='quantidade de linhas')
+    parser.add_argument('output', help='csv de saída')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    generate(args.rows, args.output, args.seed)
+
+
+if __name__ == '__main__':
+    main()
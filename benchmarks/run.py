@@ -0,0 +1,128 @@
+""" Mede tempo e pico de memória das etapas do dashboard em várias escalas
+
+    Uso:
+        python -m benchmarks.run [--rows 10000 100000 1000000] [--output benchmarks/results.json] [--label rev]
+"""
+# Libraries
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate import LAST_DATE, generate
+from utils.dataset import build_dataset, clean_code
+from utils.rollup import compute_rollups, filter_rollup, regroup, time_percentiles
+from utils.sketch import DistinctSketches
+from views.empresa import order_by_week_person, order_metric, traffic_order_share
+from views.entregadores import top_delivers
+from views.restaurantes import avg_std_time_on_traffic, distance
+
+# Filtro usado nas funções de visualização: todas as datas e condições de trânsito
+DATE_LIMIT = LAST_DATE + pd.Timedelta(days=1)
+TRAFFIC_OPTIONS = ['Low', 'Medium', 'High', 'Jam']
+
+
+def measure(func, *args, repeat=3):
+    """ Executa func(*args) e mede o menor tempo entre as repetições e o pico
+        de memória alocada (tracemalloc, em uma execução separada)
+        
+        Input: função, argumentos, quantidade de repetições cronometradas
+        Output: tupla (resultado, tempo em segundos, pico de memória em bytes)
+    """
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        result = func(*args)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return result, min(tempos), peak
+
+
+def dataset_file(rows, workdir, seed):
+    # reaproveita o csv sintético de execuções anteriores
+    path = os.path.join(workdir, 'bench_{}_{}.csv'.format(rows, seed))
+    if not os.path.exists(path):
+        generate(rows, path, seed)
+    return path
+
+
+def run_scale(rows, workdir, seed=42, repeat=3):
+    """ Executa todos os casos de benchmark para um tamanho de dataset
+        
+        Input: quantidade de linhas, diretório dos csv sintéticos, semente, repetições
+        Output: lista de dicionários {rows, case, wall_s, peak_bytes}
+    """
+    results = []
+
+    def case(name, func, *args):
+        result, wall, peak = measure(func, *args, repeat=repeat)
+        results.append({'rows': rows, 'case': name, 'wall_s': wall, 'peak_bytes': peak})
+        print('{:>10} {:<28} {:>10.4f}s {:>10.1f} MB'.format(rows, name, wall, peak / 2**20))
+        return result
+
+    path = dataset_file(rows, workdir, seed)
+    raw = case('read_csv', pd.read_csv, path)
+    case('clean_code', clean_code, raw)
+    df = case('build_dataset', build_dataset, raw)
+    cube, deliverer_cube, histogram = case('compute_rollups', compute_rollups, df)
+    sketches = case('distinct_sketches', DistinctSketches.build, deliverer_cube, 'Delivery_person_ID')
+
+    cube = case('filter_rollup', filter_rollup, cube, DATE_LIMIT, TRAFFIC_OPTIONS)
+    deliverer_cube = filter_rollup(deliverer_cube, DATE_LIMIT, TRAFFIC_OPTIONS)
+    sketches = sketches.filter(DATE_LIMIT, TRAFFIC_OPTIONS)
+    histogram = filter_rollup(histogram, DATE_LIMIT, TRAFFIC_OPTIONS)
+    time_stats = case('regroup_time_stats', regroup, cube, ['City', 'Road_traffic_density', 'Festival', 'Type_of_order'])
+
+    case('order_metric', order_metric, cube)
+    case('traffic_order_share', traffic_order_share, cube)
+    case('order_by_week_person', order_by_week_person, deliverer_cube, sketches)
+    case('top_delivers', top_delivers, deliverer_cube)
+    case('distance', distance, time_stats, False)
+    case('distance_fig', distance, time_stats, True)
+    case('avg_std_time_on_traffic', avg_std_time_on_traffic, time_stats)
+    case('time_percentiles', time_percentiles, histogram, ['City', 'Road_traffic_density'])
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark das etapas do dashboard com datasets sintéticos.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000], help='tamanhos dos datasets')
+    parser.add_argument('--output', default='benchmarks/results.json', help='arquivo JSON de resultados')
+    parser.add_argument('--label', default='', help='identificação da revisão medida')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'curry_company_bench'),
+                        help='diretório dos csv sintéticos')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for rows in args.rows:
+        results.extend(run_scale(rows, args.workdir, args.seed, args.repeat))
+
+    report = {'label': args.label,
+              'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'python': platform.python_version(),
+              'pandas': pd.__version__,
+              'numpy': np.__version__,
+              'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
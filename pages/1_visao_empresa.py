@@ -1,153 +1,24 @@
 # Libraries
-import re
-from haversine import haversine
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 from PIL import Image
-import folium
-from streamlit_folium import folium_static
 
-st. set_page_config(page_title = 'Visão Empresa', page_icon='📊', layout='wide')
-
-# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
-# Funções
-# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
-def clean_code(df):
-    """ Esta função tem a responsabilidade de limpar o dataframe
-        1. Remoção dos dados NaN
-        2. Mudança do tipo de coluna de dados
-        3. Remoção dos espaços das variáveis de texto
-        4. Formatação de coluna de datas
-        5. Limpeza da coluna de tempo (remoção do texto da variável numérica)
-        
-        Input: Dataframe
-        Output: Dataframe
-    """
-    # Convertendo colunas e retirando valores NaN
-    linhas_selecionadas = (df['Delivery_person_Age'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['Road_traffic_density'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['City'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['Festival'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype( int )
-
-    # Convertendo a coluna ratings de texto para numero decimal (float)
-    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype( float )
-
-    # Convertendo a coluna order date de texto para data
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
-
-    # Convertendo multiple_deliveries de textopara numero inteiro (int)
-    linhas_selecionadas = (df['multiple_deliveries'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-    df['multiple_deliveries'] = df['multiple_deliveries'].astype( int )
-
-    # Removendo os espaços dentro de string/texto/objeto
-    df.loc[:, 'ID'] = df.loc[:, 'ID'].str.strip()
-    df.loc[:, 'Road_traffic_density'] = df.loc[:, 'Road_traffic_density'].str.strip()
-    df.loc[:, 'Type_of_order'] = df.loc[:, 'Type_of_order'].str.strip()
-    df.loc[:, 'Type_of_vehicle'] = df.loc[:, 'Type_of_vehicle'].str.strip()
-    df.loc[:, 'City'] = df.loc[:, 'City'].str.strip()
-    df.loc[:, 'Festival'] = df.loc[:, 'Festival'].str.strip()
-
-    # Limpando a Coluna de time taken
-    df['Time_taken(min)'] = df['Time_taken(min)'].apply( lambda x: x.split( '(min)' )[1])
-    df['Time_taken(min)'] = df['Time_taken(min)'].astype( int )
-    
-    return df
-
-# Pedidos por dia
-def order_metric(df):
-            # colunas
-            cols = ['ID', 'Order_Date']
-
-            df_pedidos_dia = (df.loc[:, cols]
-                                .groupby(['Order_Date'])
-                                .count()
-                                .reset_index())
-            df_pedidos_dia.head()
-
-            # Desenhar o gráfico de linhas
-            # Plotly
-            fig = px.bar(df_pedidos_dia, x = 'Order_Date', y = 'ID')
-            return fig
-
-# Porcentagem de tráfego  
-def traffic_order_share(df): 
-    cols = ['ID', 'Road_traffic_density']
-
-    df_pedidos_trafego = df.loc[:, cols].groupby(['Road_traffic_density']).count().reset_index()
-
-    df_pedidos_trafego['entregas_perc'] = df_pedidos_trafego['ID'] / df_pedidos_trafego['ID'].sum()
-
-    fig = px.pie(df_pedidos_trafego, values='entregas_perc', names='Road_traffic_density')
-
-    return fig
-# Tráfego por cidade
-def traffic_order_city(df):
-    df_aux = df.loc[:, ['ID', 'City', 'Road_traffic_density']].groupby(['City', 'Road_traffic_density']).count().reset_index()
-    
-    # Fazendo um gráfico de bolhas
-    fig = px.scatter(df_aux, x = 'City', y = 'Road_traffic_density', size='ID', color='City')
-    return fig
-
-# Pedidos por semana
-def order_by_week(df):
-    # criar a coluna semana
-    df['week_of_year'] = df['Order_Date'].dt.strftime('%U')
-
-    # Groupby de entregas por semana
-    cols = ['ID', 'week_of_year']
-
-    df_pedidos_semana = df.loc[:, cols].groupby(['week_of_year']).count().reset_index()
+from utils import profiling, refresh, sqlstore
+from utils.dataset import filter_dataset, load_report
+from utils.geo import grid_cells
+from utils.rollup import ROLLUP_COLUMNS
+from utils.snapshot import FIGURE_CACHE, Panels
+from views.empresa import PANELS, city_medians, country_maps, density_map
+from views.layout import dataset_status, folium_html, lazy_tabs, session_memo, static_map
 
-    # Desenhando o gráfico
-    fig = px.line(df_pedidos_semana, x = 'week_of_year', y = 'ID')
-
-    return fig
-
-def order_by_week_person(df):       
-    # Quantidade de pedidos dividos pelo número único de entregadores por semana
-    df_aux01 = df.loc[:, ['ID', 'week_of_year']].groupby(['week_of_year']).count().reset_index()
-    df_aux02 = df.loc[:, ['Delivery_person_ID', 'week_of_year']].groupby(['week_of_year']).nunique().reset_index()
-
-    # Juntar 2 dataframes
-    df_aux = pd.merge(df_aux01, df_aux02, how='inner')
-    df_aux['order_by_deliver'] = df_aux['ID'] / df_aux['Delivery_person_ID'] 
-
-    fig = px.line(df_aux, x = 'week_of_year', y='order_by_deliver')
-
-    return fig
-
-def country_maps(df):
-        cols = ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
-        df_aux = df.loc[:, cols].groupby(['City','Road_traffic_density']).median().reset_index()
+st. set_page_config(page_title = 'Visão Empresa', page_icon='📊', layout='wide')
+prof = profiling.start('visao_empresa')
+refresh.start()
 
-        map = folium.Map()
-        for index, location_info in df_aux.iterrows():
-            folium.Marker([location_info['Delivery_location_latitude'],
-                          location_info['Delivery_location_longitude']],
-                          popup=location_info[['City', 'Road_traffic_density']]).add_to(map)
-        folium_static(map, width=1024, height=600)
-        
 # ----------------------------------------------- Início da estrutura lógica do código -------------------------------------------------------- #
-# Importando Dataset
-df_root = pd.read_csv('dataset/train.csv')
-
-# Fazendo cópia do dataframe lido
-df = df_root.copy()
-
-# Limpando dados
-df = clean_code( df )
+# Colunas usadas pelos mapas (só elas são lidas do cache colunar)
+COLUMNS = ['Order_Date', 'Road_traffic_density', 'City', 'Time_taken(min)', 'distance', 'Restaurant_latitude',
+           'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude']
 
 #====================================================
 # Barra Lateral
@@ -177,13 +48,30 @@ traffic_options = st.sidebar.multiselect('Quais as condições de trânsito?',
 st.sidebar.markdown("""---""")
 st.sidebar.markdown('Powerd by Comunidade DS')
 
-# Filtro de Data
-linhas_selecionadas = df['Order_Date'] < date_slider
-df = df.loc[linhas_selecionadas, :]
-
-# Filtro de transito
-linhas_selecionadas = df['Road_traffic_density'].isin(traffic_options)
-df = df.loc[linhas_selecionadas, :]
+# Gráficos servidos do snapshot pré-calculado ou, sem ele, dos rollups com os mesmos filtros.
+# Os resultados ficam na sessão enquanto os filtros não mudam.
+with prof.stage('load_snapshot'):
+    panels = Panels('visao_empresa', PANELS, date_slider, traffic_options, memo=session_memo('visao_empresa'), stage=prof.stage)
+
+def map_dataset():
+    # Dataset limpo da mesma geração dos painéis (lido e limpo uma única vez por processo) com o
+    # filtro de Data (busca binária no dataset ordenado) e de transito; só os mapas usam as linhas
+    with prof.stage('load_dataset'):
+        return filter_dataset(panels.generation.dataset(COLUMNS), date_slider, traffic_options)
+
+# Com CURRY_SQLITE=1 e o banco da versão da geração, os mapas são agregados no banco SQLite,
+# com os filtros na consulta, e as linhas do dataset não são carregadas na página
+def map_medians():
+    if panels.generation.sqlite_available():
+        with prof.stage('query_sqlite'):
+            return sqlstore.city_medians(date_slider, traffic_options)
+    return city_medians(map_dataset())
+
+def map_grid(lat_col, lon_col, cell_size):
+    if panels.generation.sqlite_available():
+        with prof.stage('query_sqlite'):
+            return sqlstore.grid_cells(date_slider, traffic_options, lat_col, lon_col, cell_size)
+    return grid_cells(map_dataset(), lat_col, lon_col, cell_size)
 
 #====================================================
 # Layout no Streamlit
@@ -191,42 +79,73 @@ df = df.loc[linhas_selecionadas, :]
 st.header('Marketplace - Visão Cliente')
 
 
-# Criando tabs
-tab1, tab2, tab3 = st.tabs(['Visão Gerencial', 'Visão Tática', 'Visão Geográfica'])
+# Criando tabs (só a aba aberta é calculada)
+tab = lazy_tabs(['Visão Gerencial', 'Visão Tática', 'Visão Geográfica'], key='tab_visao_empresa')
 
-with tab1:
+if tab == 0:
     with st.container():
         # Order metric
         # 1. Qual a quantidade de pedidos por dia?
         st.markdown('# Orders by Day')
-        fig  = order_metric(df)
-        st.plotly_chart(fig, use_container_width = True)
+        with prof.stage('order_metric', 'panel') as panel:
+            fig  = panels['order_metric']
+            panel.mark('build')
+            panel.payload(fig)
+            st.plotly_chart(fig, use_container_width = True)
     
     with st.container():
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown('# Traffic Order Share')
-            fig = traffic_order_share(df)
-            st.plotly_chart(fig, use_container_width = True)
+            with prof.stage('traffic_order_share', 'panel') as panel:
+                fig = panels['traffic_order_share']
+                panel.mark('build')
+                panel.payload(fig)
+                st.plotly_chart(fig, use_container_width = True)
             
         with col2:
             st.markdown('# Traffic Order City')
-            fig = traffic_order_city(df)
-            st.plotly_chart(fig, use_container_width = True)
+            with prof.stage('traffic_order_city', 'panel') as panel:
+                fig = panels['traffic_order_city']
+                panel.mark('build')
+                panel.payload(fig)
+                st.plotly_chart(fig, use_container_width = True)
            
-with tab2: 
+elif tab == 1:
     with st.container():
         st.markdown('# Order By Week')
-        fig = order_by_week(df)
-        st.plotly_chart(fig, use_container_width = True)
+        with prof.stage('order_by_week', 'panel') as panel:
+            fig = panels['order_by_week']
+            panel.mark('build')
+            panel.payload(fig)
+            st.plotly_chart(fig, use_container_width = True)
         
     with st.container():
         st.markdown('# Order By Week per Delivery Person')
-        fig = order_by_week_person(df)
-        st.plotly_chart(fig, use_container_width = True)
+        with prof.stage('order_by_week_person', 'panel') as panel:
+            fig = panels['order_by_week_person']
+            panel.mark('build')
+            panel.payload(fig)
+            st.plotly_chart(fig, use_container_width = True)
         
-with tab3:
+else:
     st.markdown('# Country Maps')
-    country_maps(df)
+    map_mode = st.radio('Visualização', ['Medianas por cidade', 'Densidade de entregas'], horizontal=True)
+    if map_mode == 'Medianas por cidade':
+        with prof.stage('country_maps', 'panel') as panel:
+            html = panels.cached('country_maps', lambda: folium_html(country_maps(map_medians())))
+            panel.mark('build')
+            panel.payload(html)
+            static_map(html, width=1024, height=600)
+    else:
+        cell_size = st.select_slider('Tamanho da célula (graus)', options=[0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0], value=0.1)
+        with prof.stage('density_map', 'panel') as panel:
+            html = panels.cached(('density_map', cell_size), lambda: folium_html(density_map(map_grid, cell_size)))
+            panel.mark('build')
+            panel.payload(html)
+            static_map(html, width=1024, height=600)
+
+dataset_status(st.sidebar, refresh.status())
+prof.finish(st.sidebar, FIGURE_CACHE.stats(), load_report(columns=ROLLUP_COLUMNS))
     
\ No newline at end of file
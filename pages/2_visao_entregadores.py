@@ -1,91 +1,20 @@
 # Bibliotecas
-import re
-from haversine import haversine
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 from PIL import Image
-import folium
-from streamlit_folium import folium_static
 
-st. set_page_config(page_title = 'Visão Entregadores', page_icon='🦲', layout='wide')
-# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
-# Funções
-# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
-def clean_code(df):
-    """ Esta função tem a responsabilidade de limpar o dataframe
-        1. Remoção dos dados NaN
-        2. Mudança do tipo de coluna de dados
-        3. Remoção dos espaços das variáveis de texto
-        4. Formatação de coluna de datas
-        5. Limpeza da coluna de tempo (remoção do texto da variável numérica)
-        
-        Input: Dataframe
-        Output: Dataframe
-    """
-    # Convertendo colunas e retirando valores NaN
-    linhas_selecionadas = (df['Delivery_person_Age'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['Road_traffic_density'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['City'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['Festival'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype( int )
-
-    # Convertendo a coluna ratings de texto para numero decimal (float)
-    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype( float )
-
-    # Convertendo a coluna order date de texto para data
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
-
-    # Convertendo multiple_deliveries de textopara numero inteiro (int)
-    linhas_selecionadas = (df['multiple_deliveries'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-    df['multiple_deliveries'] = df['multiple_deliveries'].astype( int )
-
-    # Removendo os espaços dentro de string/texto/objeto
-    df.loc[:, 'ID'] = df.loc[:, 'ID'].str.strip()
-    df.loc[:, 'Road_traffic_density'] = df.loc[:, 'Road_traffic_density'].str.strip()
-    df.loc[:, 'Type_of_order'] = df.loc[:, 'Type_of_order'].str.strip()
-    df.loc[:, 'Type_of_vehicle'] = df.loc[:, 'Type_of_vehicle'].str.strip()
-    df.loc[:, 'City'] = df.loc[:, 'City'].str.strip()
-    df.loc[:, 'Festival'] = df.loc[:, 'Festival'].str.strip()
-
-    # Limpando a Coluna de time taken
-    df['Time_taken(min)'] = df['Time_taken(min)'].apply( lambda x: x.split( '(min)' )[1])
-    df['Time_taken(min)'] = df['Time_taken(min)'].astype( int )
-    
-    return df
-# Retornar melhores entregadores por cidade
-def top_delivers(df, top_asc):
-    df_slowest_delivery_city = (df.loc[:, ['Delivery_person_ID', 'City', 'Time_taken(min)']]
-                                .groupby(['City', 'Delivery_person_ID'])
-                                .mean()
-                                .sort_values(['City', 'Time_taken(min)'], ascending=top_asc).reset_index())
-
-    df_aux01 = df_slowest_delivery_city.loc[df_slowest_delivery_city['City'] == 'Metropolitian', :].head(10)
-    df_aux02 = df_slowest_delivery_city.loc[df_slowest_delivery_city['City'] == 'Urban', :].head(10)
-    df_aux03 = df_slowest_delivery_city.loc[df_slowest_delivery_city['City'] == 'Semi-Urban', :].head(10)
-
-    df_new = pd.concat([df_aux01, df_aux02, df_aux03]).reset_index()
-
-    return df_new
-# Dataset
-df_root = pd.read_csv('dataset/train.csv')
-
-# Fazendo cópia do dataframe lido
-df = df_root.copy()
-
-# Limpandando Dataset
-df = clean_code(df)
+from utils import profiling, refresh
+from utils.dataset import load_report
+from utils.profiles import load_profiles
+from utils.rollup import ROLLUP_COLUMNS
+from utils.snapshot import FIGURE_CACHE, Panels
+from utils.table import IndexedTable
+from views.entregadores import PANELS
+from views.layout import dataset_status, lazy_tabs, paged_table, session_memo
 
+st. set_page_config(page_title = 'Visão Entregadores', page_icon='🦲', layout='wide')
+prof = profiling.start('visao_entregadores')
+refresh.start()
 #====================================================
 # Barra Lateral
 #====================================================
@@ -112,45 +41,45 @@ traffic_options = st.sidebar.multiselect('Quais as condições de trânsito?',
 st.sidebar.markdown("""---""")
 st.sidebar.markdown('Powerd by Comunidade DS')
 
-# Filtro de Data
-linhas_selecionadas = df['Order_Date'] < date_slider
-df = df.loc[linhas_selecionadas, :]
+# Painéis servidos do snapshot pré-calculado ou, sem ele, dos rollups pré-agregados
+# com os filtros de Data e de transito. Os resultados ficam na sessão enquanto os filtros não mudam.
+with prof.stage('load_snapshot'):
+    panels = Panels('visao_entregadores', PANELS, date_slider, traffic_options, memo=session_memo('visao_entregadores'), stage=prof.stage)
 
-# Filtro de transito
-linhas_selecionadas = df['Road_traffic_density'].isin(traffic_options)
-df = df.loc[linhas_selecionadas, :]
 
 #====================================================
 # Layout no Streamlit
 #====================================================
 st.header('Marketplace - Visão Entregadores')
 
-tab1, tab2, tab3 = st.tabs(['Visão Gerencial', '_', '_'])
+# Só a aba aberta é calculada
+tab = lazy_tabs(['Visão Gerencial', 'Perfil do Entregador', '_'], key='tab_visao_entregadores')
 
-with tab1:
+if tab == 0:
     with st.container():
         st.title('Overall Metrics')
         
         col1, col2, col3, col4 = st.columns(4, gap='large')
-        with col1:
-            # A maior idade dos entregadores
-            maior_idade = df['Delivery_person_Age'].max()
-            col1.metric('Maior idade', maior_idade)
-            
-        with col2:
-            # A menor idade dos entregadores
-            menor_idade = df['Delivery_person_Age'].min()
-            col2.metric('Menor idade', menor_idade)
-            
-        with col3:
-            # A melhor condição de veículos
-            melhor_condicao = df['Vehicle_condition'].max()
-            col3.metric('Melhor condição de veículos', melhor_condicao)
-            
-        with col4:
-            # A pior condição de veículos
-            pior_condicao = df['Vehicle_condition'].min()
-            col4.metric('Pior condição de veículos', pior_condicao)
+        with prof.stage('overall_metrics', 'panel'):
+            with col1:
+                # A maior idade dos entregadores
+                maior_idade = panels['maior_idade']
+                col1.metric('Maior idade', maior_idade)
+                
+            with col2:
+                # A menor idade dos entregadores
+                menor_idade = panels['menor_idade']
+                col2.metric('Menor idade', menor_idade)
+                
+            with col3:
+                # A melhor condição de veículos
+                melhor_condicao = panels['melhor_condicao']
+                col3.metric('Melhor condição de veículos', melhor_condicao)
+                
+            with col4:
+                # A pior condição de veículos
+                pior_condicao = panels['pior_condicao']
+                col4.metric('Pior condição de veículos', pior_condicao)
         
     with st.container():
         st.markdown("""---""")
@@ -159,50 +88,97 @@ with tab1:
         
         with col1:
             st.markdown('##### Avaliação média por entregador')
-            df_average_ratings_by_deliveries = (df.loc[:, ['Delivery_person_ID', 'Delivery_person_Ratings']]
-                                                .groupby(['Delivery_person_ID'])
-                                                .mean()
-                                                .reset_index())
-            st.dataframe(df_average_ratings_by_deliveries)
+            with prof.stage('ratings_by_deliverer', 'panel') as panel:
+                # Tabela indexada no servidor: só a página exibida é enviada ao navegador
+                table = panels.cached('ratings_by_deliverer_table',
+                                      lambda: IndexedTable(panels['ratings_by_deliverer'], 'Delivery_person_ID'))
+                panel.mark('build')
+                df_average_ratings_by_deliveries = paged_table(table, 'ratings_by_deliverer', search_label='Buscar entregador')
+                panel.payload(df_average_ratings_by_deliveries)
             
         with col2:
             st.markdown('##### Avaliação média por trânsito')
-            df_avg_std_rating_by_traffic = (df.loc[:, ['Delivery_person_Ratings', 'Road_traffic_density']]
-                                            .groupby(['Road_traffic_density'])
-                                            .agg({'Delivery_person_Ratings': ['mean', 'std']}))
-
-            # Mudando nomes das colunas
-            df_avg_std_rating_by_traffic.columns = ['delivery_mean', 'delivery_std']
-
-            # Resetando o index
-            df_avg_std_rating_by_traffic = df_avg_std_rating_by_traffic.reset_index()
-            st.dataframe(df_avg_std_rating_by_traffic)
+            with prof.stage('ratings_by_traffic', 'panel') as panel:
+                df_avg_std_rating_by_traffic = panels['ratings_by_traffic']
+                panel.mark('build')
+                panel.payload(df_avg_std_rating_by_traffic)
+                st.dataframe(df_avg_std_rating_by_traffic)
             
             st.markdown('##### Avaliação média por clima')
-            df_avg_std_rating_by_weather = (df.loc[:, ['Delivery_person_Ratings', 'Weatherconditions']]
-                                            .groupby(['Weatherconditions'])
-                                            .agg({'Delivery_person_Ratings' : ['mean', 'std']}))
-
-            # Mudando os nomes das colunas
-            df_avg_std_rating_by_weather.columns = ['weather_mean', 'weather_std']
-
-            # Resetando index
-            df_avg_std_rating_by_weather = df_avg_std_rating_by_weather.reset_index()
-            st.dataframe(df_avg_std_rating_by_weather)
+            with prof.stage('ratings_by_weather', 'panel') as panel:
+                df_avg_std_rating_by_weather = panels['ratings_by_weather']
+                panel.mark('build')
+                panel.payload(df_avg_std_rating_by_weather)
+                st.dataframe(df_avg_std_rating_by_weather)
             
     with st.container():
         st.markdown("""---""")
         st.title('Velocidade de Entrega')
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown('##### Top entregadores mais rápidos')
-            df_aux = top_delivers(df, True)
-            st.dataframe(df_aux)
-                                  
-        with col2:
-            st.markdown('##### Top entregadores mais lentos')
-            df_aux = top_delivers(df, False)
-            st.dataframe(df_aux)
-            
\ No newline at end of file
+        top_k = st.slider('Entregadores por cidade', min_value=5, max_value=50, value=10)
+        with prof.stage('top_delivers', 'panel') as panel:
+            df_fastest, df_slowest = panels.get('top_delivers', top_k=top_k)
+            panel.mark('build')
+            panel.payload(df_fastest)
+            panel.payload(df_slowest)
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown('##### Top entregadores mais rápidos')
+                st.dataframe(df_fastest)
+                                      
+            with col2:
+                st.markdown('##### Top entregadores mais lentos')
+                st.dataframe(df_slowest)
+
+if tab == 1:
+    # Perfis montados uma vez por versão do dataset: consulta pelo índice, sem groupby dos pedidos
+    with prof.stage('load_profiles'):
+        profiles = load_profiles()
+
+    st.caption('Perfis de todo o período do dataset, com as condições de trânsito selecionadas.')
+
+    with st.container():
+        st.title('Perfil do Entregador')
+        deliverer_id = st.text_input('ID do entregador', key='profile_id')
+
+        with prof.stage('profile', 'panel') as panel:
+            profile = profiles.profile(deliverer_id, traffic_options) if deliverer_id else None
+            panel.mark('build')
+
+            if deliverer_id and profile is None:
+                st.warning('Entregador não encontrado')
+            elif profile is not None:
+                col1, col2, col3, col4 = st.columns(4, gap='large')
+                col1.metric('Pedidos', profile['count'])
+                col2.metric('Avaliação média', '{:.2f}'.format(profile['avg_rating']))
+                col3.metric('Tempo médio (min)', '{:.1f}'.format(profile['avg_time']))
+                col4.metric('Último pedido', profile['last_order'].strftime('%d-%m-%Y'))
+
+                col1, col2, col3, col4 = st.columns(4, gap='large')
+                col1.metric('Veículo', profile['vehicle_type'])
+                col2.metric('Idade', '{} - {}'.format(profile['age_min'], profile['age_max']))
+                col3.metric('Condição do veículo', '{} - {}'.format(profile['vehicle_min'], profile['vehicle_max']))
+                col4.metric('Desvio do tempo (min)', '{:.1f}'.format(profile['std_time']))
+
+                st.markdown('##### Tempo por cidade e trânsito')
+                panel.payload(profile['time_by_city'])
+                st.dataframe(profile['time_by_city'])
+
+    with st.container():
+        st.markdown("""---""")
+        st.title('Ranking de Entregadores')
+        col1, col2, col3 = st.columns(3)
+        measure = col1.selectbox('Medida', ['rating', 'time', 'count'],
+                                 format_func={'rating': 'Avaliação média', 'time': 'Tempo médio', 'count': 'Pedidos'}.get)
+        k = col2.slider('Entregadores', min_value=5, max_value=50, value=10)
+        min_orders = col3.number_input('Mínimo de pedidos', min_value=1, value=3, step=1)
+
+        with prof.stage('ranking', 'panel') as panel:
+            df_ranking = profiles.ranked(measure, k, ascending=measure == 'time', traffics=traffic_options, min_orders=min_orders)
+            panel.mark('build')
+            panel.payload(df_ranking)
+            st.dataframe(df_ranking)
+
+dataset_status(st.sidebar, refresh.status())
+prof.finish(st.sidebar, FIGURE_CACHE.stats(), load_report(columns=ROLLUP_COLUMNS))
@@ -1,130 +1,19 @@
 # Libraries
-import re
-from haversine import haversine
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 from PIL import Image
-import folium
-from streamlit_folium import folium_static
 
-st.set_page_config(page_title = 'Visão Restaurantes', page_icon='🍽️', layout='wide')
-# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
-# Funções
-# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
-def clean_code(df):
-    """ Esta função tem a responsabilidade de limpar o dataframe
-        1. Remoção dos dados NaN
-        2. Mudança do tipo de coluna de dados
-        3. Remoção dos espaços das variáveis de texto
-        4. Formatação de coluna de datas
-        5. Limpeza da coluna de tempo (remoção do texto da variável numérica)
-        
-        Input: Dataframe
-        Output: Dataframe
-    """
-    # Convertendo colunas e retirando valores NaN
-    linhas_selecionadas = (df['Delivery_person_Age'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['Road_traffic_density'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['City'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    linhas_selecionadas = (df['Festival'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-
-    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype( int )
-
-    # Convertendo a coluna ratings de texto para numero decimal (float)
-    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype( float )
-
-    # Convertendo a coluna order date de texto para data
-    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
-
-    # Convertendo multiple_deliveries de textopara numero inteiro (int)
-    linhas_selecionadas = (df['multiple_deliveries'] != 'NaN ')
-    df = df.loc[linhas_selecionadas, :].copy()
-    df['multiple_deliveries'] = df['multiple_deliveries'].astype( int )
-
-    # Removendo os espaços dentro de string/texto/objeto
-    df.loc[:, 'ID'] = df.loc[:, 'ID'].str.strip()
-    df.loc[:, 'Road_traffic_density'] = df.loc[:, 'Road_traffic_density'].str.strip()
-    df.loc[:, 'Type_of_order'] = df.loc[:, 'Type_of_order'].str.strip()
-    df.loc[:, 'Type_of_vehicle'] = df.loc[:, 'Type_of_vehicle'].str.strip()
-    df.loc[:, 'City'] = df.loc[:, 'City'].str.strip()
-    df.loc[:, 'Festival'] = df.loc[:, 'Festival'].str.strip()
-
-    # Limpando a Coluna de time taken
-    df['Time_taken(min)'] = df['Time_taken(min)'].apply( lambda x: x.split( '(min)' )[1])
-    df['Time_taken(min)'] = df['Time_taken(min)'].astype( int )
-    
-    return df
-def distance(df, fig):
-    if fig:
-        cols = ['Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude']
-        
-        df['distance'] = df.loc[:, cols].apply( lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
-                                                                        (x['Delivery_location_latitude'], x['Delivery_location_longitude'])), axis = 1)
-        avg_distance = df.loc[:, ['City', 'distance']].groupby('City').mean().reset_index()
-
-        fig = go.Figure(data= [go.Pie(labels=avg_distance['City'], values=avg_distance['distance'], pull=[0, 0.1, 0])])
-        return fig
-    else:
-        cols = ['Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude']
-        df['distance'] = df.loc[:, cols].apply( lambda x: haversine((x['Restaurant_latitude'], x['Restaurant_longitude']),
-                                                    (x['Delivery_location_latitude'], x['Delivery_location_longitude'])), axis = 1)
-        avg_distance = np.round(df['distance'].mean(), 2)
-        return avg_distance
-
-def avg_std_time_deliverie(df, operation, festival):
-    df_aux = (df.loc[:, ['Time_taken(min)', 'Festival']]
-           .groupby(['Festival'])
-           .agg({'Time_taken(min)': ['mean', 'std']}))
-
-
-    df_aux.columns = ['avg_time', 'std_time']
-    df_aux = df_aux.reset_index()
-    df_aux = np.round(df_aux.loc[df_aux['Festival'] == festival, operation], 2)
-
-    return df_aux
-
-def avg_std_time_graph(df):    
-    df_aux = df.loc[:, ['Time_taken(min)', 'City']].groupby('City').agg({'Time_taken(min)': ['mean', 'std'] })
-
-    df_aux.columns = ['avg_time', 'std_time']
-
-    df_aux = df_aux.reset_index()
-
-    fig = go.Figure()
-    fig.add_trace(go.Bar(name = 'Control', x=df_aux['City'], y=df_aux['avg_time'], error_y=dict(type='data', array=df_aux['std_time'])))
-    fig.update_layout(barmode='group')
-
-    return fig
-
-def avg_std_time_on_traffic(df):
-    df_aux = df.loc[:, ['Time_taken(min)', 'City', 'Road_traffic_density']].groupby(['City', 'Road_traffic_density']).agg({'Time_taken(min)': ['mean', 'std'] })
-
-    df_aux.columns = ['avg_time', 'std_time']
-
-    df_aux = df_aux.reset_index()
-
-    fig = px.sunburst(df_aux, path=['City', 'Road_traffic_density'], values='avg_time',
-                     color='std_time', color_continuous_scale='RdBu',
-                     color_continuous_midpoint=np.average(df_aux['std_time']))
-    return fig
-
-# Dataset
-df_root = pd.read_csv('dataset/train.csv')
-
-# Fazendo cópia do dataframe lido
-df = df_root.copy()
-df = clean_code(df)
+from utils import profiling, refresh, sketch
+from utils.dataset import load_report
+from utils.rollup import ROLLUP_COLUMNS
+from utils.snapshot import FIGURE_CACHE, Panels
+from utils.table import IndexedTable
+from views.restaurantes import PANELS
+from views.layout import dataset_status, lazy_tabs, paged_table, session_memo
 
+st.set_page_config(page_title = 'Visão Restaurantes', page_icon='🍽️', layout='wide')
+prof = profiling.start('visao_restaurantes')
+refresh.start()
 #====================================================
 # Barra Lateral
 #====================================================
@@ -154,66 +43,97 @@ traffic_options = st.sidebar.multiselect('Quais as condições de trânsito?',
 st.sidebar.markdown("""---""")
 st.sidebar.markdown('Powerd by Comunidade DS')
 
-# Filtro de Data
-linhas_selecionadas = df['Order_Date'] < date_slider
-df = df.loc[linhas_selecionadas, :]
-
-# Filtro de transito
-linhas_selecionadas = df['Road_traffic_density'].isin(traffic_options)
-df = df.loc[linhas_selecionadas, :]
+# Painéis servidos do snapshot pré-calculado ou, sem ele, dos rollups pré-agregados
+# com os filtros de Data e de transito. Os resultados ficam na sessão enquanto os filtros não mudam.
+with prof.stage('load_snapshot'):
+    panels = Panels('visao_restaurantes', PANELS, date_slider, traffic_options, memo=session_memo('visao_restaurantes'), stage=prof.stage)
 
 #====================================================
 # Layout no Streamlit
 #====================================================
 st.header('Marketplace - Visão Restaurantes')
 
-tab1, tab2, tab3 = st.tabs(['Visão Gerencial', '_', '_'])
+# Só a aba aberta é calculada
+tab = lazy_tabs(['Visão Gerencial', '_', '_'], key='tab_visao_restaurantes')
 
-with tab1:
+if tab == 0:
     with st.container():
         st.title('Overall Metrics')
         
         col1, col2, col3, col4, col5, col6 = st.columns(6)
-        with col1:
-            entregadores_unicos = df['Delivery_person_ID'].nunique()
-            col1.metric(value = entregadores_unicos, label = "Entregadores Únicos")
-            
-        with col2:
-            distancia_media = distance(df, False)
-            col2.metric(value = distancia_media, label = "Distância Média")
-            
-        with col3:  
-            df_aux = avg_std_time_deliverie(df, 'avg_time', 'Yes')
-            col3.metric('Tempo Médio de Entrega - Festival', df_aux)
-            
-            
-        with col4:
-            df_aux = avg_std_time_deliverie(df, 'std_time', 'Yes')
-            col4.metric('Desvio Padrão de Entrega - Festival', df_aux)
-            
-        with col5:
-            df_aux = avg_std_time_deliverie(df, 'avg_time', 'No')
-            col5.metric('Tempo Médio de Entrega - Festival', df_aux)
-        with col6:
-            df_aux = avg_std_time_deliverie(df, 'std_time', 'No')
-            col6.metric('Desvio Padrão de Entrega - Festival', df_aux)
+        with prof.stage('overall_metrics', 'panel'):
+            with col1:
+                entregadores_unicos = panels['entregadores_unicos']
+                col1.metric(value = entregadores_unicos, label = "Entregadores Únicos" if sketch.HLL_PRECISION <= 0 else "Entregadores Únicos (aprox.)")
+                
+            with col2:
+                distancia_media = panels['distancia_media']
+                col2.metric(value = distancia_media, label = "Distância Média")
+                
+            with col3:  
+                df_aux = panels['festival_avg_time']
+                col3.metric('Tempo Médio de Entrega - Festival', df_aux)
+                
+                
+            with col4:
+                df_aux = panels['festival_std_time']
+                col4.metric('Desvio Padrão de Entrega - Festival', df_aux)
+                
+            with col5:
+                df_aux = panels['no_festival_avg_time']
+                col5.metric('Tempo Médio de Entrega - Festival', df_aux)
+            with col6:
+                df_aux = panels['no_festival_std_time']
+                col6.metric('Desvio Padrão de Entrega - Festival', df_aux)
             
         st.markdown("""---""")
         
+    with st.container():
+        st.title('Percentis do Tempo de Entrega')
+        with prof.stage('time_percentiles', 'panel') as panel:
+            # Percentis combinados dos histogramas de tempo das células dentro dos filtros
+            df_aux = panels['time_percentiles']
+            panel.mark('build')
+            panel.payload(df_aux)
+
+            cols = st.columns(len(df_aux.columns) - 1)
+            for col, percentil in zip(cols, df_aux.columns[1:]):
+                col.metric('Tempo de Entrega - {}'.format(percentil.upper()), df_aux[percentil].iloc[0] if len(df_aux) else '-')
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            with prof.stage('percentile_time_graph', 'panel') as panel:
+                fig = panels['percentile_time_graph']
+                panel.mark('build')
+                panel.payload(fig)
+                st.plotly_chart(fig)
+
+        with col2:
+            with prof.stage('percentile_time_on_traffic', 'panel') as panel:
+                df_aux = panels['percentile_time_on_traffic']
+                panel.mark('build')
+                panel.payload(df_aux)
+                st.dataframe(df_aux)
+
+        st.markdown("""---""")
+
     with st.container():
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = avg_std_time_graph(df)
-            st.plotly_chart(fig)
+            with prof.stage('avg_std_time_graph', 'panel') as panel:
+                fig = panels['avg_std_time_graph']
+                panel.mark('build')
+                panel.payload(fig)
+                st.plotly_chart(fig)
         
         with col2: 
-            df_aux = df.loc[:, ['Time_taken(min)', 'City', 'Type_of_order']].groupby(['City', 'Type_of_order']).agg({'Time_taken(min)': ['mean', 'std'] })
-
-            df_aux.columns = ['avg_time', 'std_time']
-
-            df_aux = df_aux.reset_index()
-            st.dataframe(df_aux)
+            with prof.stage('time_by_city_order', 'panel') as panel:
+                table = panels.cached('time_by_city_order_table', lambda: IndexedTable(panels['time_by_city_order'], 'City'))
+                panel.mark('build')
+                df_aux = paged_table(table, 'time_by_city_order', search_label='Buscar cidade')
+                panel.payload(df_aux)
 
             
         st.markdown("""---""")
@@ -223,12 +143,20 @@ with tab1:
         
         with col1:
             st.title('Distribuição do Tempo')
-            fig = distance(df, True)
-            st.plotly_chart(fig)
+            with prof.stage('distance', 'panel') as panel:
+                fig = panels['distance']
+                panel.mark('build')
+                panel.payload(fig)
+                st.plotly_chart(fig)
             
         with col2:
-            fig = avg_std_time_on_traffic(df)
-            st.plotly_chart(fig)
+            with prof.stage('avg_std_time_on_traffic', 'panel') as panel:
+                fig = panels['avg_std_time_on_traffic']
+                panel.mark('build')
+                panel.payload(fig)
+                st.plotly_chart(fig)
             
         st.markdown("""---""")
-        
\ No newline at end of file
+
+dataset_status(st.sidebar, refresh.status())
+prof.finish(st.sidebar, FIGURE_CACHE.stats(), load_report(columns=ROLLUP_COLUMNS))
@@ -0,0 +1,31 @@
+# Libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generate import generate
+from utils.dataset import build_dataset
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Dataset sintético compartilhado pelos testes (mesmo gerador dos benchmarks)
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+ROWS = 20000
+
+
+@pytest.fixture(scope='session')
+def csv_path(tmp_path_factory):
+    # train.csv sintético gravado uma vez por sessão
+    path = tmp_path_factory.mktemp('dataset') / 'train.csv'
+    generate(ROWS, str(path), seed=7)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def orders(csv_path):
+    # dataset limpo, ordenado por Order_Date, como nas páginas
+    return build_dataset(pd.read_csv(csv_path))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
@@ -0,0 +1,42 @@
+# Libraries
+import os
+import shutil
+import threading
+
+import pandas as pd
+import pytest
+
+from utils import columnar
+from utils.dataset import mapped_is_fresh, publish_mapped
+
+pytestmark = pytest.mark.skipif(not columnar.available(), reason='pyarrow não está instalado')
+
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Arquivos colunares e publicação do Arrow mapeado
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def test_mapped_round_trip(orders, tmp_path):
+    path = str(tmp_path / 'train.arrow')
+    columnar.write_mapped(orders, path, (1, 2), {'rows_out': len(orders)})
+
+    pd.testing.assert_frame_equal(columnar.read_mapped(path), orders)
+    assert columnar.read_mapped_metadata(path)['source_size'] == 1
+    assert os.listdir(tmp_path) == ['train.arrow']
+
+
+def test_concurrent_publish_writes_once(csv_path, orders, tmp_path):
+    path = str(tmp_path / 'train.csv')
+    shutil.copy(csv_path, path)
+
+    reports = []
+    threads = [threading.Thread(target=lambda: reports.append(publish_mapped(path, force=False))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # só a primeira publicação grava o arquivo; as demais encontram a versão atual depois do lock
+    assert sum(report is not None for report in reports) == 1
+    assert mapped_is_fresh(path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    pd.testing.assert_frame_equal(columnar.read_mapped(str(tmp_path / 'train.arrow')), orders)
@@ -0,0 +1,54 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from benchmarks.generate import generate_chunk
+from utils.dataset import clean_code
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# clean_code comparado com a limpeza original das páginas (várias passadas)
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def baseline_clean_code(df):
+    # limpeza original, copiada das páginas antes da máscara única
+    linhas_selecionadas = (df['Delivery_person_Age'] != 'NaN ')
+    df = df.loc[linhas_selecionadas, :].copy()
+
+    linhas_selecionadas = (df['Road_traffic_density'] != 'NaN ')
+    df = df.loc[linhas_selecionadas, :].copy()
+
+    linhas_selecionadas = (df['City'] != 'NaN ')
+    df = df.loc[linhas_selecionadas, :].copy()
+
+    linhas_selecionadas = (df['Festival'] != 'NaN ')
+    df = df.loc[linhas_selecionadas, :].copy()
+
+    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype( int )
+    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype( float )
+    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
+
+    linhas_selecionadas = (df['multiple_deliveries'] != 'NaN ')
+    df = df.loc[linhas_selecionadas, :].copy()
+    df['multiple_deliveries'] = df['multiple_deliveries'].astype( int )
+
+    df.loc[:, 'ID'] = df.loc[:, 'ID'].str.strip()
+    df.loc[:, 'Road_traffic_density'] = df.loc[:, 'Road_traffic_density'].str.strip()
+    df.loc[:, 'Type_of_order'] = df.loc[:, 'Type_of_order'].str.strip()
+    df.loc[:, 'Type_of_vehicle'] = df.loc[:, 'Type_of_vehicle'].str.strip()
+    df.loc[:, 'City'] = df.loc[:, 'City'].str.strip()
+    df.loc[:, 'Festival'] = df.loc[:, 'Festival'].str.strip()
+
+    df['Time_taken(min)'] = df['Time_taken(min)'].apply( lambda x: x.split( '(min)' )[1])
+    df['Time_taken(min)'] = df['Time_taken(min)'].astype( int )
+
+    return df
+
+
+def test_clean_code_matches_baseline():
+    raw = generate_chunk(20000, np.random.default_rng(5))
+    report = {}
+    result = clean_code(raw.copy(), report)
+    expected = baseline_clean_code(raw.copy())
+
+    # o gerador produz linhas com 'NaN ' em todas as colunas de NAN_COLUMNS
+    assert 0 < report['rows_dropped'] < len(raw)
+    pd.testing.assert_frame_equal(result, expected)
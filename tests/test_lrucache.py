@@ -0,0 +1,50 @@
+# Libraries
+from utils.lrucache import ByteLRU
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Cache LRU com orçamento em bytes
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def test_least_recently_used_is_evicted_first():
+    cache = ByteLRU(30, len)
+    for key in 'abc':
+        cache.get(key, lambda: key * 10)
+
+    # 'a' foi usado por último: o próximo valor descarta 'b', o menos recente
+    assert cache.get('a', lambda: 'outro') == 'a' * 10
+    cache.get('d', lambda: 'd' * 10)
+
+    assert list(cache._items) == ['c', 'a', 'd']
+    assert cache.stats()['evictions'] == 1
+    assert cache.get('b', lambda: 'novo') == 'novo'
+
+
+def test_value_larger_than_budget_is_not_kept():
+    cache = ByteLRU(30, len)
+    cache.get('a', lambda: 'a' * 10)
+
+    assert cache.get('grande', lambda: 'g' * 31) == 'g' * 31
+    stats = cache.stats()
+    assert stats['entries'] == 1 and stats['bytes'] == 10 and stats['evictions'] == 0
+
+
+def test_bytes_follow_puts_replacements_and_evictions():
+    cache = ByteLRU(100, len)
+    cache.put('a', 'a' * 40)
+    cache.put('b', 'b' * 30)
+    assert cache.stats()['bytes'] == 70
+
+    # substituir uma chave desconta o tamanho anterior e a torna a mais recente
+    cache.put('a', 'a' * 10)
+    assert cache.stats()['bytes'] == 40
+
+    # passar do orçamento descarta só o necessário, a partir da menos recente
+    cache.put('c', 'c' * 80)
+    stats = cache.stats()
+    assert list(cache._items) == ['a', 'c'] and stats['bytes'] == 90 and stats['evictions'] == 1
+
+    # valor que o chamador não quer guardar (keep) não entra na conta
+    cache.get('d', lambda: 'd' * 5, keep=lambda: False)
+    assert cache.stats()['bytes'] == 90 and 'd' not in cache._items
+
+    cache.clear()
+    assert cache.stats()['bytes'] == 0 and cache.stats()['entries'] == 0
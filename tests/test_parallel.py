@@ -0,0 +1,65 @@
+# Libraries
+import logging
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+from utils import parallel
+from utils.rollup import compute_rollups
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Rollups no pool de processos com uma página do Streamlit como __main__
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+PAGE = """
+import pathlib
+pathlib.Path({marker!r}).write_text('executada')
+raise RuntimeError('a página não pode rodar nos workers')
+"""
+
+
+@pytest.fixture
+def fresh_pool():
+    # pool criado dentro do teste (os workers herdam o __main__ do momento da criação)
+    with parallel._pool_lock:
+        if parallel._pool is not None:
+            parallel._pool.shutdown()
+        parallel._pool = None
+    yield
+    with parallel._pool_lock:
+        if parallel._pool is not None:
+            parallel._pool.shutdown()
+        parallel._pool = None
+
+
+def test_compute_rollups_pool_does_not_rerun_page(orders, tmp_path, monkeypatch, caplog, fresh_pool):
+    marker = tmp_path / 'page_ran'
+    page = tmp_path / 'page.py'
+    page.write_text(PAGE.format(marker=str(marker)))
+
+    # como no Streamlit: o __main__ do processo é o script da página
+    main = types.ModuleType('__main__')
+    main.__file__ = str(page)
+    monkeypatch.setitem(sys.modules, '__main__', main)
+
+    expected = compute_rollups(orders, workers=1)
+    with caplog.at_level(logging.WARNING, logger=parallel.__name__):
+        result = compute_rollups(orders, workers=2)
+
+    assert not marker.exists()
+    assert not [record for record in caplog.records if record.name == parallel.__name__]
+    assert sys.modules['__main__'] is main
+    for got, want in zip(result, expected):
+        pd.testing.assert_frame_equal(got[want.columns].reset_index(drop=True), want.reset_index(drop=True), check_dtype=False)
+
+
+def test_map_partitions_falls_back_and_logs(monkeypatch, caplog, fresh_pool):
+    def broken_pool(workers):
+        raise OSError('sem processos')
+
+    monkeypatch.setattr(parallel, '_get_pool', broken_pool)
+    with caplog.at_level(logging.WARNING, logger=parallel.__name__):
+        assert parallel.map_partitions(abs, [-1, -2, 3], workers=2) == [1, 2, 3]
+
+    assert any('modo serial' in record.getMessage() for record in caplog.records)
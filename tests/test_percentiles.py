@@ -0,0 +1,43 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from utils.dataset import filter_dataset
+from utils.parallel import partition_by_month
+from utils.rollup import build_time_histogram, filter_rollup, merge_histograms, time_percentiles
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Percentis do histograma de tempos comparados com numpy.quantile
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+DATE_LIMIT = pd.Timestamp('2022-03-20')
+TRAFFIC = ['Low', 'High']
+
+
+def expected_percentiles(times):
+    return [np.quantile(times, q, method='inverted_cdf') for q in [0.5, 0.9, 0.99]]
+
+
+def test_total_percentiles_match_numpy(orders):
+    out = time_percentiles(build_time_histogram(orders))
+    df_aux = orders.dropna(subset=['City', 'Road_traffic_density', 'Festival'])
+
+    assert out['count'].item() == len(df_aux)
+    assert out[['p50', 'p90', 'p99']].iloc[0].tolist() == expected_percentiles(df_aux['Time_taken(min)'])
+
+
+def test_filtered_percentiles_by_city_match_numpy(orders):
+    histogram = filter_rollup(build_time_histogram(orders), DATE_LIMIT, TRAFFIC)
+    out = time_percentiles(histogram, ['City'])
+    df_aux = filter_dataset(orders, DATE_LIMIT, TRAFFIC).dropna(subset=['City', 'Festival'])
+
+    for _, row in out.iterrows():
+        times = df_aux.loc[df_aux['City'] == row['City'], 'Time_taken(min)']
+        assert row['count'] == len(times)
+        assert [row['p50'], row['p90'], row['p99']] == expected_percentiles(times)
+
+
+def test_merged_histograms_match_whole(orders):
+    merged = merge_histograms([build_time_histogram(part) for part in partition_by_month(orders)])
+    pd.testing.assert_frame_equal(time_percentiles(merged, ['Road_traffic_density']),
+                                  time_percentiles(build_time_histogram(orders), ['Road_traffic_density']),
+                                  check_dtype=False, check_categorical=False)
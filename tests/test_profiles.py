@@ -0,0 +1,43 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from utils.profiles import PROFILE_COLUMNS, DelivererProfiles, stream_profile_summary
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Perfis dos entregadores comparados com o pandas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def test_profile_matches_pandas(orders):
+    profiles = DelivererProfiles.build(orders[PROFILE_COLUMNS])
+    ids = orders['Delivery_person_ID'].astype(str).str.strip()
+
+    for deliverer in profiles.ids[::97]:
+        df_aux = orders.loc[(ids == deliverer) & orders['City'].notna() & orders['Road_traffic_density'].notna()]
+        profile = profiles.profile(deliverer)
+
+        assert profile['count'] == len(df_aux)
+        assert np.isclose(profile['avg_time'], df_aux['Time_taken(min)'].mean())
+        assert np.isclose(profile['std_rating'], df_aux['Delivery_person_Ratings'].astype('float64').std(), equal_nan=True)
+        assert profile['last_order'] == df_aux['Order_Date'].max()
+        assert profile['vehicle_type'] in set(df_aux['Type_of_vehicle'].astype(str).mode())
+
+
+def test_ranked_matches_pandas(orders):
+    profiles = DelivererProfiles.build(orders[PROFILE_COLUMNS])
+    df_aux = orders.loc[orders['City'].astype(str) == 'Urban'].assign(ID=lambda df: df['Delivery_person_ID'].astype(str).str.strip())
+    expected = df_aux.groupby('ID')['Time_taken(min)'].agg(['count', 'mean'])
+    expected = expected.loc[expected['count'] >= 3]
+
+    ranking = profiles.ranked('time', k=10, ascending=True, cities=['Urban'], min_orders=3)
+    assert np.allclose(ranking['avg_time'], expected['mean'].sort_values().head(10))
+    assert ranking['count'].tolist() == expected.loc[ranking['Delivery_person_ID'], 'count'].tolist()
+
+
+def test_stream_profiles_match_full_build(csv_path, orders):
+    full = DelivererProfiles.build(orders[PROFILE_COLUMNS])
+    stream = DelivererProfiles(*stream_profile_summary(csv_path, chunksize=3000))
+
+    assert list(stream.ids) == list(full.ids)
+    for col in full.cells:
+        assert np.allclose(stream.cells[col], full.cells[col])
+    pd.testing.assert_frame_equal(stream.ranked('rating', 20), full.ranked('rating', 20))
@@ -0,0 +1,75 @@
+# Libraries
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generate import generate_chunk
+from utils import columnar
+from utils.dataset import build_cache, ingest_batch, read_dataset
+from utils.parallel import partition_by_month
+from utils.rollup import (DELIVERER_KEYS, ROLLUP_COLUMNS, build_deliverer_rollup, build_rollup, build_time_histogram,
+                          compute_rollups, merge_rollups, rollups_entry, stream_rollups, summarize)
+from utils.sketch import DistinctSketches
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Rollups comparados com o groupby do pandas sobre as linhas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def assert_same_cube(result, expected):
+    result = result.loc[:, expected.columns].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_dtype=False, check_categorical=False)
+
+
+def test_summarize_matches_pandas(orders):
+    out = summarize(build_rollup(orders), ['City', 'Road_traffic_density'])
+    expected = (orders.groupby(['City', 'Road_traffic_density'], observed=True)
+                .agg(count=('Time_taken(min)', 'size'), avg_time=('Time_taken(min)', 'mean'), std_time=('Time_taken(min)', 'std'),
+                     avg_distance=('distance', 'mean'))
+                .reset_index())
+
+    assert out['count'].tolist() == expected['count'].tolist()
+    for col in ['avg_time', 'std_time', 'avg_distance']:
+        assert np.allclose(out[col], expected[col], rtol=1e-5)
+
+
+def test_merge_rollups_of_partitions_matches_whole(orders):
+    parts = partition_by_month(orders)
+    assert len(parts) > 1
+
+    assert_same_cube(merge_rollups([build_rollup(part) for part in parts]), build_rollup(orders))
+    assert_same_cube(merge_rollups([build_deliverer_rollup(part) for part in parts], DELIVERER_KEYS), build_deliverer_rollup(orders))
+
+
+def test_stream_rollups_match_full_build(csv_path, orders):
+    # 20000 linhas em pedaços de 1500: 14 parciais, combinados em árvore
+    cube, deliverer_cube, histogram = stream_rollups(csv_path, chunksize=1500)
+
+    assert_same_cube(cube, build_rollup(orders))
+    assert_same_cube(deliverer_cube, build_deliverer_rollup(orders))
+    assert_same_cube(histogram, build_time_histogram(orders))
+
+
+@pytest.mark.skipif(not columnar.available(), reason='pyarrow não está instalado')
+def test_incremental_rollups_match_rebuild(csv_path, tmp_path):
+    path = str(tmp_path / 'train.csv')
+    shutil.copy(csv_path, path)
+    build_cache(path)
+
+    version, df, report = read_dataset(path, ROLLUP_COLUMNS)
+    previous = rollups_entry(path, df, version, report)
+
+    # lote novo ingerido: só ele é agregado e combinado à entrada anterior
+    batch_path = str(tmp_path / 'lote.csv')
+    generate_chunk(2000, np.random.default_rng(11), first_id=10 ** 6).to_csv(batch_path, index=False)
+    ingest_batch(batch_path, path)
+
+    version, df, report = read_dataset(path, ROLLUP_COLUMNS, (version, df, report))
+    _, cube, deliverer_cube, _, histogram, sketches = rollups_entry(path, df, version, report, previous)
+    expected = compute_rollups(df, workers=1)
+
+    assert len(df) > len(previous[0])
+    assert_same_cube(cube, expected[0])
+    assert_same_cube(deliverer_cube, expected[1])
+    assert_same_cube(histogram, expected[2])
+    assert sketches.count() == DistinctSketches.build(expected[1], 'Delivery_person_ID').count()
@@ -0,0 +1,39 @@
+# Libraries
+import pandas as pd
+import pytest
+
+from utils.rollup import build_deliverer_rollup
+from utils.sketch import DistinctSketches
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Entregadores distintos dos sketches comparados com o nunique do pandas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+DATE_LIMIT = pd.Timestamp('2022-03-20')
+TRAFFIC = ['Low', 'Jam']
+
+
+def filtered(orders):
+    return orders.loc[(orders['Order_Date'] < DATE_LIMIT) & orders['Road_traffic_density'].isin(TRAFFIC)]
+
+
+def test_exact_sketches_match_nunique(orders):
+    sketches = DistinctSketches.build(build_deliverer_rollup(orders), 'Delivery_person_ID', precision=0)
+    assert sketches.exact
+    assert sketches.count() == orders.loc[orders['City'].notna() & orders['Road_traffic_density'].notna(), 'Delivery_person_ID'].nunique()
+
+    df_aux = filtered(orders)
+    sketches = sketches.filter(DATE_LIMIT, TRAFFIC)
+    assert sketches.count() == df_aux.loc[df_aux['City'].notna(), 'Delivery_person_ID'].nunique()
+
+    expected = df_aux.groupby('City', observed=True)['Delivery_person_ID'].nunique()
+    assert sketches.count('City').to_dict() == expected.to_dict()
+
+
+@pytest.mark.parametrize('precision', [10, 12])
+def test_hll_sketches_within_error(orders, precision):
+    sketches = DistinctSketches.build(build_deliverer_rollup(orders), 'Delivery_person_ID', precision=precision)
+    df_aux = filtered(orders)
+    expected = df_aux.loc[df_aux['City'].notna(), 'Delivery_person_ID'].nunique()
+
+    # quatro vezes o erro típico de 1.04 / sqrt(2^p)
+    assert abs(sketches.filter(DATE_LIMIT, TRAFFIC).count() - expected) <= 4 * 1.04 / 2 ** (precision / 2) * expected
@@ -0,0 +1,124 @@
+# Libraries
+import json
+import shutil
+
+import pandas as pd
+
+from utils import dataset, snapshot
+from utils.dataset import publish, published
+from utils.refresh import build_generation
+from utils.rollup import ROLLUP_COLUMNS
+from utils.snapshot import FIGURE_CACHE, Panels, compute_panels, encode, filter_state, read_snapshot, source_version, write_snapshot
+from views.restaurantes import PANELS
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Snapshots: painéis gravados e lidos de volta iguais aos calculados
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+DATE_LIMIT = pd.Timestamp('2022-03-20')
+TRAFFIC = ['Low', 'Medium', 'High', 'Jam']
+
+
+def assert_same_panel(result, expected):
+    if isinstance(expected, tuple):
+        for got, want in zip(result, expected):
+            assert_same_panel(got, want)
+    elif isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected.astype({col: str for col in expected.select_dtypes('category')}),
+                                      check_dtype=False)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(result, expected, check_dtype=False, check_index_type=False)
+    elif hasattr(expected, 'to_plotly_json'):
+        # o template padrão é expandido na leitura; os traços do gráfico não mudam
+        assert json.loads(result.to_json())['data'] == json.loads(expected.to_json())['data']
+    else:
+        assert result == expected
+
+
+def test_snapshot_round_trip(csv_path, tmp_path):
+    path = str(tmp_path / 'train.csv')
+    shutil.copy(csv_path, path)
+    directory = str(tmp_path / 'snapshots')
+    state = filter_state(DATE_LIMIT, TRAFFIC)
+
+    panels = compute_panels(PANELS, DATE_LIMIT, TRAFFIC, path)
+    write_snapshot('visao_restaurantes', state, panels, source_version(path), directory)
+
+    # as páginas recebem do snapshot os mesmos valores calculados dos rollups
+    served = Panels('visao_restaurantes', PANELS, DATE_LIMIT, TRAFFIC, path, directory)
+    assert set(served.snapshot) == set(PANELS)
+    for name, value in panels.items():
+        assert_same_panel(served[name], value)
+
+    # outra versão do csv invalida o snapshot
+    assert read_snapshot('visao_restaurantes', state, [0, 0], directory) is None
+
+
+def test_snapshot_is_read_only_on_a_miss(csv_path, tmp_path, monkeypatch):
+    path = str(tmp_path / 'train.csv')
+    shutil.copy(csv_path, path)
+    directory = str(tmp_path / 'snapshots')
+    state = filter_state(DATE_LIMIT, TRAFFIC)
+    write_snapshot('visao_restaurantes', state, compute_panels(PANELS, DATE_LIMIT, TRAFFIC, path), source_version(path), directory)
+
+    reads = []
+    monkeypatch.setattr(snapshot, 'read_snapshot', lambda *args: reads.append(args) or read_snapshot(*args))
+
+    memo = {}
+    first = Panels('visao_restaurantes', PANELS, DATE_LIMIT, TRAFFIC, path, directory, memo)
+    assert not reads
+    value = first['distancia_media']
+    assert len(reads) == 1
+
+    # painéis já no memo da sessão: o arquivo do snapshot não é lido de novo
+    again = Panels('visao_restaurantes', PANELS, DATE_LIMIT, TRAFFIC, path, directory, memo)
+    assert again['distancia_media'] == value
+    assert len(reads) == 1
+
+
+def test_panels_keep_one_generation_during_render(csv_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, '_published', {})
+    path = str(tmp_path / 'train.csv')
+    shutil.copy(csv_path, path)
+    directory = str(tmp_path / 'snapshots')
+
+    publish(path, build_generation(path))
+    generation = published(path)
+    expected = compute_panels(PANELS, DATE_LIMIT, TRAFFIC, path)
+
+    memo = {}
+    panels = Panels('visao_restaurantes', PANELS, DATE_LIMIT, TRAFFIC, path, directory, memo)
+    assert panels['distancia_media'] == expected['distancia_media']
+
+    # outra versão do csv é publicada no meio da execução
+    pd.read_csv(path).iloc[:10000].to_csv(path, index=False)
+    publish(path, build_generation(path))
+    assert published(path)['version'] != generation['version']
+
+    # o restante da execução continua na geração do início, inclusive as linhas dos mapas
+    for name, value in expected.items():
+        assert encode(panels[name]) == encode(value)
+    assert panels.generation.dataset(ROLLUP_COLUMNS) is generation['datasets'][tuple(ROLLUP_COLUMNS)][1]
+    assert not panels.generation.stale
+    assert memo['key'] == panels.key
+
+    # a execução seguinte usa a geração nova e descarta o memo da anterior
+    following = Panels('visao_restaurantes', PANELS, DATE_LIMIT, TRAFFIC, path, directory, memo)
+    assert following.key != panels.key and not memo['results']
+    assert following['distancia_media'] == compute_panels(PANELS, DATE_LIMIT, TRAFFIC, path)['distancia_media']
+    assert following['distancia_media'] != expected['distancia_media']
+
+
+def test_panels_from_a_changed_csv_are_not_cached(csv_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, '_published', {})
+    path = str(tmp_path / 'train.csv')
+    shutil.copy(csv_path, path)
+
+    # sem geração publicada, o csv muda entre o início da execução e a carga dos rollups
+    memo = {}
+    panels = Panels('visao_restaurantes', PANELS, DATE_LIMIT, TRAFFIC, path, str(tmp_path / 'snapshots'), memo)
+    pd.read_csv(path).iloc[:10000].to_csv(path, index=False)
+
+    entries = FIGURE_CACHE.stats()['entries']
+    panels['distancia_media']
+    assert panels.generation.stale
+    assert not memo['results'] and FIGURE_CACHE.stats()['entries'] == entries
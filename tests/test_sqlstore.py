@@ -0,0 +1,68 @@
+# Libraries
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import sqlstore
+from utils.dataset import filter_dataset
+from utils.geo import grid_cells
+from views.empresa import city_medians
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Consultas do banco SQLite comparadas com o pandas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+DATE_LIMIT = pd.Timestamp('2022-03-20')
+TRAFFIC = ['Low', 'Medium', 'Jam']
+
+
+@pytest.fixture(scope='module')
+def published_csv(csv_path, tmp_path_factory):
+    # banco publicado em pedaços pequenos (vários to_sql por publicação)
+    path = str(tmp_path_factory.mktemp('sqlite') / 'train.csv')
+    shutil.copy(csv_path, path)
+    sqlstore.publish_sqlite(path, chunksize=3000)
+    return path
+
+
+def test_publish_is_chunked_and_fresh(published_csv, orders):
+    assert sqlstore.sqlite_is_fresh(published_csv)
+    assert sqlstore.read_sqlite_metadata(sqlstore.sqlite_path_for(published_csv))['rows'] == len(orders)
+    assert sqlstore.publish_sqlite(published_csv, force=False) is None
+    assert not [name for name in os.listdir(os.path.dirname(published_csv)) if name.endswith('.tmp')]
+
+
+def test_city_medians_match_pandas(published_csv, orders):
+    expected = city_medians(filter_dataset(orders, DATE_LIMIT, TRAFFIC))
+    result = sqlstore.city_medians(DATE_LIMIT, TRAFFIC, published_csv)
+
+    assert result[['City', 'Road_traffic_density']].values.tolist() == expected[['City', 'Road_traffic_density']].astype(str).values.tolist()
+    for col in ['Delivery_location_latitude', 'Delivery_location_longitude']:
+        assert np.allclose(result[col], expected[col])
+
+
+def test_grid_cells_match_pandas(published_csv, orders):
+    df_aux = filter_dataset(orders, DATE_LIMIT, TRAFFIC)
+    expected = grid_cells(df_aux, 'Delivery_location_latitude', 'Delivery_location_longitude', 0.05)
+    result = sqlstore.grid_cells(DATE_LIMIT, TRAFFIC, 'Delivery_location_latitude', 'Delivery_location_longitude', 0.05, published_csv)
+
+    expected = expected.sort_values(['lat', 'lon'], ignore_index=True)
+    result = result.sort_values(['lat', 'lon'], ignore_index=True)
+    assert result['count'].tolist() == expected['count'].tolist()
+    for col in ['lat', 'lon', 'median_time', 'median_distance']:
+        assert np.allclose(result[col], expected[col], rtol=1e-5)
+
+
+def test_stale_database_is_not_published_by_pages(csv_path, tmp_path, monkeypatch, caplog):
+    path = str(tmp_path / 'train.csv')
+    shutil.copy(csv_path, path)
+    monkeypatch.setattr(sqlstore, 'SQLITE', True)
+
+    with caplog.at_level(logging.WARNING, logger=sqlstore.__name__):
+        assert not sqlstore.available(path)
+
+    assert not os.path.exists(sqlstore.sqlite_path_for(path))
+    assert any('desatualizado' in record.getMessage() for record in caplog.records)
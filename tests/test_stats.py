@@ -0,0 +1,60 @@
+# Libraries
+import numpy as np
+
+from utils.dataset import concat_frames
+from utils.stats import accumulate, combine, mean_std, merge_tree
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Acumuladores de média/desvio padrão comparados com o groupby do pandas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+MEASURES = {'time': 'Time_taken(min)', 'rating': 'Delivery_person_Ratings'}
+
+
+def expected_stats(orders, by, col):
+    return orders.groupby(by, observed=True)[col].agg(['count', 'mean', 'std']).reset_index()
+
+
+def test_accumulate_matches_pandas(orders):
+    acc = accumulate(orders, ['City'], MEASURES)
+    expected = expected_stats(orders.assign(rating=orders['Delivery_person_Ratings'].astype('float64')), ['City'], 'rating')
+
+    mean, std = mean_std(acc, 'rating')
+    assert acc['rating_n'].tolist() == expected['count'].tolist()
+    assert np.allclose(mean, expected['mean'])
+    assert np.allclose(std, expected['std'])
+
+
+def test_combine_fine_cells_matches_pandas(orders):
+    acc = accumulate(orders, ['Order_Date', 'City', 'Road_traffic_density'], MEASURES, {'count': ('Time_taken(min)', 'size')})
+    out = combine(acc, ['City', 'Road_traffic_density'], list(MEASURES), {'count': 'sum'})
+    expected = expected_stats(orders, ['City', 'Road_traffic_density'], 'Time_taken(min)')
+
+    mean, std = mean_std(out, 'time')
+    assert out['count'].tolist() == expected['count'].tolist()
+    assert np.allclose(mean, expected['mean'])
+    assert np.allclose(std, expected['std'])
+
+
+def test_combine_partitions_matches_whole(orders):
+    # acumuladores de partes disjuntas combinados = acumuladores do todo
+    metade = len(orders) // 2
+    partes = [accumulate(orders.iloc[:metade], ['City'], MEASURES), accumulate(orders.iloc[metade:], ['City'], MEASURES)]
+    out = combine(concat_frames(partes), ['City'], list(MEASURES))
+    whole = accumulate(orders, ['City'], MEASURES)
+
+    for col in ['time_n', 'time_mean', 'time_m2', 'rating_n', 'rating_mean', 'rating_m2']:
+        assert np.allclose(out[col], whole[col])
+
+
+def test_merge_tree_combines_every_partial_once():
+    chamadas = []
+
+    def merge(parts):
+        chamadas.append(len(parts))
+        return sum(parts, [])
+
+    assert merge_tree(([i] for i in range(13)), merge) == list(range(13))
+    # 13 = 8 + 4 + 1: 7 + 3 combinações de pares e uma final com os três parciais restantes
+    assert chamadas == [2] * 10 + [3]
+    assert merge_tree([], merge) is None
+    assert merge_tree([[1]], merge) == [1]
@@ -0,0 +1,45 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+from utils.table import IndexedTable
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Busca, ordenação e paginação no servidor comparadas com o pandas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def deliverer_table(orders):
+    return (orders.groupby('Delivery_person_ID', observed=True)['Time_taken(min)'].agg(['count', 'mean'])
+            .rename(columns={'mean': 'avg_time'}).reset_index())
+
+
+def test_search_matches_str_startswith(orders):
+    df_aux = deliverer_table(orders)
+    table = IndexedTable(df_aux, 'Delivery_person_ID')
+
+    for prefix in ['bang', 'BANGRES1', ' coimbres10del0', 'XYZ', '']:
+        expected = np.flatnonzero(df_aux['Delivery_person_ID'].astype(str).str.upper().str.startswith(prefix.strip().upper()))
+        assert sorted(table.search(prefix)) == expected.tolist()
+
+
+def test_select_and_page_match_pandas(orders):
+    df_aux = deliverer_table(orders)
+    table = IndexedTable(df_aux, 'Delivery_person_ID')
+
+    positions = table.select('bang', 'avg_time', ascending=True)
+    expected = (df_aux.loc[df_aux['Delivery_person_ID'].astype(str).str.upper().str.startswith('BANG')]
+                .sort_values('avg_time', kind='stable'))
+    pd.testing.assert_frame_equal(table.page(positions, 1, 25), expected.iloc[25:50])
+
+    positions = table.select(None, 'count', ascending=False)
+    assert table.page(positions, 0, 25)['count'].tolist() == df_aux['count'].sort_values(ascending=False).head(25).tolist()
+    assert len(table.select()) == len(df_aux)
+
+
+def test_nbytes_is_final_at_construction(orders):
+    # o FIGURE_CACHE mede a tabela quando ela é guardada: ordenar depois não pode aumentar o tamanho
+    table = IndexedTable(deliverer_table(orders), 'Delivery_person_ID')
+    nbytes = table.nbytes
+
+    for column in table.df.columns:
+        table.select(None, column)
+    assert table.nbytes == nbytes
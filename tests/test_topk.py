@@ -0,0 +1,35 @@
+# Libraries
+import pandas as pd
+
+from utils.topk import top_k_per_group
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Top-K por grupo comparado com sort_values + groupby().head() do pandas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def expected_top(df, ascending, k):
+    df_aux = df.dropna(subset=['avg_time']).sort_values(['City', 'avg_time'], ascending=[True, ascending], kind='stable')
+    return df_aux.groupby('City', observed=True).head(k).reset_index(drop=True)
+
+
+def deliverer_times(orders):
+    return (orders.groupby(['City', 'Delivery_person_ID'], observed=True)['Time_taken(min)'].mean()
+            .rename('avg_time').reset_index())
+
+
+def test_top_k_matches_pandas(orders):
+    df_aux = deliverer_times(orders)
+    menores, maiores = top_k_per_group(df_aux, 'City', 'avg_time', k=10)
+
+    for result, ascending in [(menores, True), (maiores, False)]:
+        expected = expected_top(df_aux, ascending, 10)
+        assert result['City'].tolist() == expected['City'].tolist()
+        assert result['avg_time'].tolist() == expected['avg_time'].tolist()
+
+
+def test_top_k_with_small_groups(orders):
+    # grupos com menos de k linhas devolvem todas as linhas, ordenadas
+    df_aux = deliverer_times(orders).groupby('City', observed=True).head(3)
+    menores, maiores = top_k_per_group(df_aux, 'City', 'avg_time', k=10)
+
+    pd.testing.assert_series_equal(menores['avg_time'], expected_top(df_aux, True, 10)['avg_time'])
+    pd.testing.assert_series_equal(maiores['avg_time'], expected_top(df_aux, False, 10)['avg_time'])
@@ -0,0 +1,43 @@
+""" Gera o cache colunar do dataset limpo
+
+    Uso:
+        python -m utils.build_cache [--csv dataset/train.csv] [--mmap] [--sqlite]
+
+    Os arquivos são gravados ao lado do csv, com o mesmo nome (.parquet, .arrow e
+    .sqlite), que é onde as páginas os procuram.
+"""
+# Libraries
+import argparse
+import time
+
+from utils import columnar, sqlstore
+from utils.dataset import DATASET_PATH, build_cache, cache_path_for, mapped_path_for, publish_mapped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Limpa o dataset e grava o cache colunar (Parquet).')
+    parser.add_argument('--csv', default=DATASET_PATH, help='csv de origem')
+    parser.add_argument('--mmap', action='store_true', help='publica também o arquivo Arrow mapeado (CURRY_MMAP=1)')
+    parser.add_argument('--sqlite', action='store_true', help='publica também o banco SQLite indexado (CURRY_SQLITE=1)')
+    args = parser.parse_args(argv)
+
+    if not columnar.available():
+        parser.error('pyarrow não está instalado')
+
+    inicio = time.perf_counter()
+    report = build_cache(args.csv)
+    print('{}: {} linhas ({} removidas) em {:.2f}s'.format(cache_path_for(args.csv), report['rows_out'], report['rows_dropped'],
+                                                          time.perf_counter() - inicio))
+    print('memória: {:.1f} MB -> {:.1f} MB'.format(report['memory_before'] / 2**20, report['memory_after'] / 2**20))
+
+    if args.mmap:
+        publish_mapped(args.csv)
+        print('{}: publicado'.format(mapped_path_for(args.csv)))
+
+    if args.sqlite:
+        sqlstore.publish_sqlite(args.csv)
+        print('{}: publicado'.format(sqlstore.sqlite_path_for(args.csv)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+""" Pré-calcula os painéis das páginas para os filtros mais usados
+
+    Uso:
+        python -m utils.build_snapshots [--csv dataset/train.csv] [--output dataset/snapshots] [--dates 2022-04-13 ...]
+"""
+# Libraries
+import argparse
+import itertools
+import time
+
+import pandas as pd
+
+from utils.dataset import DATASET_PATH
+from utils.snapshot import SNAPSHOT_DIR, compute_panels, filter_state, source_version, write_snapshot
+from views import empresa, entregadores, restaurantes
+
+# Páginas exportadas: nome -> (painéis, parâmetros pré-calculados de cada painel)
+PAGES = {'visao_empresa': (empresa.PANELS, {}),
+         'visao_entregadores': (entregadores.PANELS, {'top_delivers': {'top_k': 10}}),
+         'visao_restaurantes': (restaurantes.PANELS, {})}
+
+# Data limite padrão do slider das páginas
+DEFAULT_DATES = ['2022-04-13']
+
+TRAFFIC_OPTIONS = ['Low', 'Medium', 'High', 'Jam']
+
+
+def traffic_presets():
+    # todas as combinações não vazias das condições de trânsito
+    return [list(combo) for size in range(1, len(TRAFFIC_OPTIONS) + 1) for combo in itertools.combinations(TRAFFIC_OPTIONS, size)]
+
+
+def build_snapshots(path=DATASET_PATH, directory=SNAPSHOT_DIR, dates=DEFAULT_DATES):
+    """ Calcula e grava os snapshots de todas as páginas e presets de filtros
+        
+        Input: caminho do csv, diretório dos snapshots, lista de datas limite
+        Output: quantidade de snapshots gravados
+    """
+    version = source_version(path)
+    if version is None:
+        raise FileNotFoundError(path)
+
+    total = 0
+    for page, (builders, params) in PAGES.items():
+        for date, traffic_options in itertools.product(dates, traffic_presets()):
+            date_limit = pd.Timestamp(date).to_pydatetime()
+            panels = compute_panels(builders, date_limit, traffic_options, path, params)
+            write_snapshot(page, filter_state(date_limit, traffic_options), panels, version, directory, params)
+            total += 1
+
+    if source_version(path) != version:
+        raise RuntimeError('{} mudou durante a exportação; execute novamente'.format(path))
+
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pré-calcula métricas, tabelas e gráficos das páginas em snapshots JSON.')
+    parser.add_argument('--csv', default=DATASET_PATH, help='csv de origem')
+    parser.add_argument('--output', default=SNAPSHOT_DIR, help='diretório dos snapshots')
+    parser.add_argument('--dates', nargs='+', default=DEFAULT_DATES, help='datas limite pré-calculadas (AAAA-MM-DD)')
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    total = build_snapshots(args.csv, args.output, args.dates)
+    print('{}: {} snapshots em {:.2f}s'.format(args.output, total, time.perf_counter() - inicio))
+
+
+if __name__ == '__main__':
+    main()
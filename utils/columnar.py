@@ -0,0 +1,165 @@
+# Libraries
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional: sem ele as páginas usam o csv
+    pa = None
+    pq = None
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Cache colunar (Parquet) do dataset já limpo
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Chave dos metadados do arquivo que guarda a versão do csv de origem
+METADATA_KEY = b'curry_company'
+
+# Versão do layout do arquivo (tipos, ordenação, colunas derivadas).
+# Arquivos gravados com outra versão são ignorados e o csv volta a ser usado.
+FORMAT_VERSION = 2
+
+
+def available():
+    """ Indica se o pyarrow está instalado """
+    return pq is not None
+
+
+@contextmanager
+def _replacing(path):
+    # arquivo temporário exclusivo no mesmo diretório (processos diferentes
+    # nunca escrevem no mesmo temporário), renomeado para path no final
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_columnar(df, path, source_version, report=None):
+    """ Grava o dataframe limpo em Parquet comprimido
+        A escrita é feita em um arquivo temporário exclusivo e depois
+        renomeada, para que um leitor nunca encontre um arquivo pela metade.
+        
+        Input: Dataframe limpo, caminho de saída, versão do csv de origem
+               (tamanho, mtime em ns) e relatório do clean_code
+        Output: None
+    """
+    table = _to_table(df, source_version, report)
+
+    with _replacing(path) as tmp_path:
+        pq.write_table(table, tmp_path, compression='zstd')
+
+
+def _to_table(df, source_version, report=None):
+    # tabela Arrow do dataframe com os metadados da versão do csv de origem
+    metadata = {'format': FORMAT_VERSION,
+                'source_size': source_version[0],
+                'source_mtime_ns': source_version[1],
+                'report': report or {}}
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[METADATA_KEY] = json.dumps(metadata).encode('utf-8')
+    return table.replace_schema_metadata(schema_metadata)
+
+
+def _from_schema(schema):
+    # metadados gravados por _to_table, ou None se ausentes ou de outra versão do layout
+    schema_metadata = schema.metadata or {}
+    if METADATA_KEY not in schema_metadata:
+        return None
+
+    metadata = json.loads(schema_metadata[METADATA_KEY].decode('utf-8'))
+    if metadata.get('format') != FORMAT_VERSION:
+        return None
+
+    return metadata
+
+
+def read_metadata(path):
+    """ Lê apenas os metadados gravados por write_columnar
+        
+        Input: caminho do Parquet
+        Output: dicionário com source_size, source_mtime_ns e report, ou None
+    """
+    if pq is None or not os.path.exists(path):
+        return None
+
+    return _from_schema(pq.read_schema(path))
+
+
+def read_columnar(path, columns=None):
+    """ Lê o Parquet lendo do disco apenas as colunas pedidas
+        
+        Input: caminho do Parquet, lista de colunas (None = todas)
+        Output: Dataframe
+    """
+    table = pq.read_table(path, columns=list(columns) if columns is not None else None)
+    return table.to_pandas()
+
+
+def iter_columnar(path, batch_size=100000, columns=None):
+    """ Lê o Parquet em pedaços, sem carregar o arquivo inteiro
+        
+        Input: caminho do Parquet, linhas por pedaço, lista de colunas (None = todas)
+        Output: gerador de Dataframes
+    """
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=list(columns) if columns is not None else None):
+        yield batch.to_pandas()
+
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Arquivo Arrow mapeado em memória, compartilhado entre processos
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def write_mapped(df, path, source_version, report=None):
+    """ Grava o dataframe limpo em Arrow IPC sem compressão
+        Por não ter compressão, o arquivo pode ser mapeado em memória: todos os
+        processos que o leem compartilham as mesmas páginas do cache do sistema
+        operacional. A escrita é atômica, como em write_columnar.
+        
+        Input: Dataframe limpo, caminho de saída, versão do csv de origem
+               (tamanho, mtime em ns) e relatório do clean_code
+        Output: None
+    """
+    table = _to_table(df, source_version, report)
+
+    with _replacing(path) as tmp_path:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def read_mapped_metadata(path):
+    """ Lê apenas os metadados gravados por write_mapped
+        
+        Input: caminho do arquivo Arrow
+        Output: dicionário com source_size, source_mtime_ns e report, ou None
+    """
+    if pa is None or not os.path.exists(path):
+        return None
+
+    with pa.memory_map(path, 'r') as source:
+        return _from_schema(pa.ipc.open_file(source).schema)
+
+
+def read_mapped(path, columns=None):
+    """ Abre o arquivo Arrow mapeado em memória, sem copiar os dados
+        As colunas numéricas do Dataframe apontam direto para o mapeamento e
+        são somente leitura; o mapeamento continua válido enquanto o Dataframe
+        existir, mesmo que o arquivo seja substituído por uma versão nova.
+        
+        Input: caminho do arquivo Arrow, lista de colunas (None = todas)
+        Output: Dataframe
+    """
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    if columns is not None:
+        table = table.select(list(columns))
+
+    return table.to_pandas(split_blocks=True)
@@ -0,0 +1,635 @@
+# Libraries
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from utils import columnar
+from utils.geo import delivery_distance
+
+try:
+    import fcntl
+except ImportError:  # fcntl só existe em sistemas POSIX: sem ele o lock vale só dentro do processo
+    fcntl = None
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Acesso ao dataset compartilhado entre as páginas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+DATASET_PATH = 'dataset/train.csv'
+
+# Com CURRY_MMAP=1 o dataset limpo é publicado uma vez por máquina em um arquivo
+# Arrow mapeado em memória, compartilhado por todas as sessões e processos
+MAPPED = os.environ.get('CURRY_MMAP', '0') not in ('', '0')
+
+# Cache do processo: (caminho absoluto, colunas) -> (chave da versão, dataframe limpo, relatório)
+_cache = {}
+_cache_lock = threading.RLock()
+
+# Gerações publicadas pela atualização em segundo plano: caminho absoluto -> geração
+_published = {}
+
+# Locks de publicação de cada arquivo compartilhado dentro do processo (ver file_lock)
+_file_locks = {}
+
+
+# Colunas em que o texto 'NaN ' invalida a linha inteira
+NAN_COLUMNS = ['Delivery_person_Age', 'Road_traffic_density', 'City', 'Festival', 'multiple_deliveries']
+
+# Colunas de texto que chegam com espaços sobrando
+STRIP_COLUMNS = ['ID', 'Road_traffic_density', 'Type_of_order', 'Type_of_vehicle', 'City', 'Festival']
+
+
+def clean_code(df, report=None):
+    """ Esta função tem a responsabilidade de limpar o dataframe
+        1. Remoção dos dados NaN
+        2. Mudança do tipo de coluna de dados
+        3. Remoção dos espaços das variáveis de texto
+        4. Formatação de coluna de datas
+        5. Limpeza da coluna de tempo (remoção do texto da variável numérica)
+        
+        Todas as colunas de NaN são combinadas em uma única máscara e o
+        dataframe é materializado uma só vez; as conversões são vetorizadas.
+        Se um dicionário for passado em report, ele recebe o tempo de cada
+        etapa (em segundos) e a quantidade de linhas removidas.
+        
+        Input: Dataframe
+        Output: Dataframe
+    """
+    tempos = {}
+    inicio = time.perf_counter()
+
+    # Máscara única de linhas válidas
+    invalidas = {col: (df[col] == 'NaN ').to_numpy() for col in NAN_COLUMNS}
+    linhas_selecionadas = ~np.logical_or.reduce(list(invalidas.values()))
+    tempos['mask'] = time.perf_counter() - inicio
+
+    # Uma única materialização do dataframe filtrado
+    etapa = time.perf_counter()
+    linhas_entrada = len(df)
+    df = df.loc[linhas_selecionadas, :].copy()
+    tempos['filter'] = time.perf_counter() - etapa
+
+    # Convertendo colunas numéricas e de data
+    etapa = time.perf_counter()
+    df['Delivery_person_Age'] = df['Delivery_person_Age'].astype( int )
+    df['Delivery_person_Ratings'] = df['Delivery_person_Ratings'].astype( float )
+    df['multiple_deliveries'] = df['multiple_deliveries'].astype( int )
+    df['Order_Date'] = pd.to_datetime(df['Order_Date'], format='%d-%m-%Y')
+    tempos['convert'] = time.perf_counter() - etapa
+
+    # Removendo os espaços dentro de string/texto/objeto
+    etapa = time.perf_counter()
+    for col in STRIP_COLUMNS:
+        df[col] = df[col].str.strip()
+    tempos['strip'] = time.perf_counter() - etapa
+
+    # Limpando a Coluna de time taken: '(min) 24' -> 24
+    etapa = time.perf_counter()
+    df['Time_taken(min)'] = df['Time_taken(min)'].str.extract(r'(\d+)', expand=False).astype( int )
+    tempos['time_taken'] = time.perf_counter() - etapa
+
+    if report is not None:
+        tempos['total'] = time.perf_counter() - inicio
+        report['timings'] = tempos
+        report['rows_in'] = linhas_entrada
+        report['rows_out'] = len(df)
+        report['rows_dropped'] = linhas_entrada - len(df)
+        report['rows_dropped_by_column'] = {col: int(mask.sum()) for col, mask in invalidas.items()}
+
+    return df
+
+
+# Schema compacto do dataset limpo: texto de baixa cardinalidade vira
+# categoria e os números são reduzidos ao menor tipo que comporta os valores
+SCHEMA = {
+    'City': 'category',
+    'Road_traffic_density': 'category',
+    'Festival': 'category',
+    'Weatherconditions': 'category',
+    'Type_of_order': 'category',
+    'Type_of_vehicle': 'category',
+    'Delivery_person_Age': 'int8',
+    'Vehicle_condition': 'int8',
+    'multiple_deliveries': 'int8',
+    'Time_taken(min)': 'int16',
+    'Delivery_person_Ratings': 'float32',
+    'Restaurant_latitude': 'float32',
+    'Restaurant_longitude': 'float32',
+    'Delivery_location_latitude': 'float32',
+    'Delivery_location_longitude': 'float32',
+}
+
+
+def compact_dtypes(df, report=None):
+    """ Aplica o SCHEMA ao dataframe limpo
+        Se um dicionário for passado em report, ele recebe o uso de memória
+        (em bytes) antes e depois da conversão.
+        
+        Input: Dataframe limpo
+        Output: Dataframe com tipos compactos
+    """
+    memoria_antes = df.memory_usage(deep=True).sum()
+
+    df = df.astype({col: dtype for col, dtype in SCHEMA.items() if col in df.columns})
+
+    if report is not None:
+        report['memory_before'] = int(memoria_antes)
+        report['memory_after'] = int(df.memory_usage(deep=True).sum())
+
+    return df
+
+
+def build_dataset(df, report=None):
+    """ Pipeline completo de preparação do dataset lido do csv
+        1. clean_code
+        2. Coluna 'distance' (km, float32) entre restaurante e local de entrega,
+           calculada uma única vez para todas as páginas
+        3. Tipos compactos do SCHEMA (categorias e números reduzidos)
+        4. Ordenação por Order_Date, que permite filtrar datas por busca binária
+        
+        Input: Dataframe bruto
+        Output: Dataframe pronto para as páginas
+    """
+    df = clean_code(df, report)
+    df['distance'] = delivery_distance(df)
+    df = compact_dtypes(df, report)
+    df = df.sort_values('Order_Date', kind='mergesort', ignore_index=True)
+
+    return df
+
+
+def date_offset(df, date_limit):
+    """ Posição da primeira linha com Order_Date >= date_limit
+        Busca binária sobre a coluna ordenada por build_dataset.
+        
+        Input: Dataframe ordenado por Order_Date, data limite
+        Output: inteiro (quantidade de linhas anteriores à data limite)
+    """
+    return int(df['Order_Date'].searchsorted(pd.Timestamp(date_limit), side='left'))
+
+
+def filter_dataset(df, date_limit, traffic_options):
+    """ Aplica os filtros da barra lateral (data limite e condições de trânsito)
+        O corte de data é uma fatia sem cópia encontrada por busca binária; o
+        filtro de trânsito roda só dentro dessa fatia e também é evitado quando
+        todas as condições presentes estão selecionadas. O resultado pode
+        compartilhar memória com o dataset carregado e não deve ser alterado.
+        
+        Input: Dataframe ordenado por Order_Date, data limite (exclusiva),
+               lista de condições de trânsito
+        Output: Dataframe filtrado
+    """
+    df = df.iloc[:date_offset(df, date_limit)]
+
+    linhas_selecionadas = df['Road_traffic_density'].isin(traffic_options)
+    if linhas_selecionadas.all():
+        return df
+
+    return df.loc[linhas_selecionadas, :]
+
+
+def dataset_version(path=DATASET_PATH):
+    """ Identifica a versão do arquivo do dataset
+        
+        Input: caminho do arquivo
+        Output: tupla (caminho absoluto, tamanho em bytes, mtime em ns) ou None se o arquivo não existe
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def cache_path_for(path):
+    """ Caminho do cache colunar correspondente a um csv """
+    return os.path.splitext(path)[0] + '.parquet'
+
+
+def batches_path_for(cache_path):
+    """ Diretório dos lotes ingeridos depois da geração do cache colunar """
+    return os.path.splitext(cache_path)[0] + '.batches'
+
+
+def list_batches(cache_path):
+    """ Lotes ingeridos, em ordem de ingestão
+        
+        Input: caminho do Parquet
+        Output: tupla com os nomes dos arquivos de lote
+    """
+    try:
+        names = os.listdir(batches_path_for(cache_path))
+    except FileNotFoundError:
+        return ()
+    return tuple(sorted(name for name in names if name.endswith('.parquet')))
+
+
+def mapped_path_for(path):
+    """ Caminho do arquivo Arrow mapeado correspondente a um csv """
+    return os.path.splitext(path)[0] + '.arrow'
+
+
+def concat_frames(frames):
+    """ Concatena dataframes do dataset mantendo as colunas categóricas
+        (as categorias de cada coluna são unidas antes da concatenação)
+        
+        Input: lista de Dataframes com as mesmas colunas
+        Output: Dataframe
+    """
+    if len(frames) == 1:
+        return frames[0]
+
+    dtypes = {}
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([f[col] for f in frames], ignore_order=True).categories
+            dtypes[col] = pd.CategoricalDtype(categories)
+
+    return pd.concat([f.astype(dtypes) for f in frames], ignore_index=True)
+
+
+def append_rows(df, new):
+    """ Acrescenta linhas ao dataset mantendo a ordenação por Order_Date
+        Lotes novos costumam ter datas posteriores ao dataset, caso em que a
+        ordenação é dispensada.
+        
+        Input: Dataframe ordenado, Dataframe com as novas linhas
+        Output: Dataframe ordenado
+    """
+    if len(new) == 0:
+        return df
+
+    ordenado = len(df) == 0 or new['Order_Date'].min() >= df['Order_Date'].iloc[-1]
+    df = concat_frames([df, new])
+    if not (ordenado and new['Order_Date'].is_monotonic_increasing):
+        df = df.sort_values('Order_Date', kind='mergesort', ignore_index=True)
+
+    return df
+
+
+def read_batches(path=DATASET_PATH, names=None, columns=None):
+    """ Lê lotes ingeridos do cache colunar
+        
+        Input: caminho do csv, nomes dos lotes (None = todos), colunas
+        Output: Dataframe com as linhas dos lotes, na ordem de ingestão
+    """
+    batches_path = batches_path_for(cache_path_for(path))
+    names = list_batches(cache_path_for(path)) if names is None else names
+
+    return concat_frames([columnar.read_columnar(os.path.join(batches_path, name), columns) for name in names])
+
+
+@contextmanager
+def file_lock(path):
+    """ Lock exclusivo entre processos para publicar um arquivo compartilhado
+        (Parquet, Arrow, SQLite), em um arquivo <path>.lock ao lado dele.
+        Quem espera o lock deve verificar de novo se o arquivo ainda está
+        desatualizado antes de publicá-lo.
+        
+        Input: caminho do arquivo publicado
+        Output: context manager
+    """
+    with _cache_lock:
+        lock = _file_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path + '.lock', 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def build_cache(path=DATASET_PATH, cache_path=None):
+    """ Limpa o csv uma única vez e grava o resultado tipado em Parquet
+        Os lotes ingeridos anteriormente já estão no csv e são descartados.
+        
+        Input: caminho do csv, caminho do Parquet (padrão: mesmo nome do csv)
+        Output: relatório do clean_code
+    """
+    cache_path = cache_path or cache_path_for(path)
+
+    with file_lock(cache_path):
+        version = dataset_version(path)
+        report = {}
+        df = build_dataset(pd.read_csv(path), report)
+        columnar.write_columnar(df, cache_path, version[1:], report)
+
+        batches_path = batches_path_for(cache_path)
+        for name in list_batches(cache_path):
+            os.remove(os.path.join(batches_path, name))
+
+    return report
+
+
+def cache_is_fresh(path=DATASET_PATH, cache_path=None):
+    """ Verifica se o Parquet (e os lotes ingeridos depois dele) corresponde à
+        versão atual do csv
+        Sem o csv (deploy só com o Parquet) o cache é sempre considerado válido.
+        
+        Input: caminho do csv, caminho do Parquet
+        Output: bool
+    """
+    cache_path = cache_path or cache_path_for(path)
+    metadata = columnar.read_metadata(cache_path)
+    if metadata is None:
+        return False
+
+    # O último lote ingerido registra a versão do csv depois da ingestão
+    batches = list_batches(cache_path)
+    if batches:
+        metadata = columnar.read_metadata(os.path.join(batches_path_for(cache_path), batches[-1]))
+        if metadata is None:
+            return False
+
+    version = dataset_version(path)
+    if version is None:
+        return True
+
+    return (metadata['source_size'], metadata['source_mtime_ns']) == version[1:]
+
+
+def mapped_is_fresh(path=DATASET_PATH, mapped_path=None):
+    """ Verifica se o arquivo Arrow mapeado corresponde à versão atual do csv
+        (a ingestão de lotes também altera o csv)
+        
+        Input: caminho do csv, caminho do arquivo Arrow
+        Output: bool
+    """
+    metadata = columnar.read_mapped_metadata(mapped_path or mapped_path_for(path))
+    if metadata is None:
+        return False
+
+    version = dataset_version(path)
+    if version is None:
+        return True
+
+    return (metadata['source_size'], metadata['source_mtime_ns']) == version[1:]
+
+
+def publish_mapped(path=DATASET_PATH, mapped_path=None, force=True):
+    """ Publica o dataset limpo no arquivo Arrow mapeado em memória
+        O dataset vem do cache colunar (com os lotes ingeridos) quando ele está
+        atualizado, senão do csv. Depois de publicado, cada processo só mapeia
+        o arquivo, sem ler nem limpar os dados de novo. A publicação acontece
+        sob file_lock: com force=False, um processo que esperou outro publicar
+        a mesma versão não publica de novo.
+        
+        Input: caminho do csv, caminho do arquivo Arrow (padrão: mesmo nome do csv),
+               publicar mesmo se o arquivo já estiver atualizado
+        Output: relatório do clean_code (None se o arquivo já estava atualizado)
+    """
+    mapped_path = mapped_path or mapped_path_for(path)
+    cache_path = cache_path_for(path)
+
+    with file_lock(mapped_path):
+        if not force and mapped_is_fresh(path, mapped_path):
+            return None
+
+        version = dataset_version(path)
+        if cache_is_fresh(path, cache_path):
+            metadata = columnar.read_metadata(cache_path)
+            df = columnar.read_columnar(cache_path)
+            batches = list_batches(cache_path)
+            if batches:
+                df = append_rows(df, read_batches(path, batches))
+                metadata = columnar.read_metadata(os.path.join(batches_path_for(cache_path), batches[-1]))
+            report = dict(metadata['report'])
+            source_version = version[1:] if version is not None else (metadata['source_size'], metadata['source_mtime_ns'])
+        else:
+            report = {}
+            df = build_dataset(pd.read_csv(path), report)
+            source_version = version[1:]
+
+        columnar.write_mapped(df, mapped_path, source_version, report)
+
+    return report
+
+
+def dataset_chunks(path=DATASET_PATH, chunksize=100000):
+    """ Dataset limpo em pedaços, para publicar cópias sem carregar o dataset
+        inteiro. Com o cache colunar atualizado os pedaços vêm do Parquet e dos
+        lotes ingeridos; senão cada pedaço do csv passa pelo build_dataset.
+        
+        Input: caminho do csv, linhas por pedaço
+        Output: gerador de Dataframes limpos
+    """
+    cache_path = cache_path_for(path)
+    if columnar.available() and cache_is_fresh(path, cache_path):
+        yield from columnar.iter_columnar(cache_path, chunksize)
+        batches_path = batches_path_for(cache_path)
+        for name in list_batches(cache_path):
+            yield columnar.read_columnar(os.path.join(batches_path, name))
+        return
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield build_dataset(chunk)
+
+
+def ingest_batch(batch_path, path=DATASET_PATH):
+    """ Ingestão incremental de um lote de pedidos novos
+        1. O lote (csv com o mesmo cabeçalho do dataset) é anexado ao csv, que
+           continua sendo a fonte completa dos dados
+        2. Apenas o lote passa pelo build_dataset
+        3. O lote limpo é gravado como mais um arquivo do cache colunar
+        Tudo sob o file_lock do cache colunar (uma ingestão por vez). As páginas
+        acrescentam só o lote novo ao dataset em memória e ao rollup, sem
+        reprocessar o histórico.
+        
+        Input: caminho do csv do lote, caminho do csv do dataset
+        Output: relatório do clean_code do lote
+    """
+    cache_path = cache_path_for(path)
+    with file_lock(cache_path):
+        if not columnar.available() or not cache_is_fresh(path, cache_path):
+            raise RuntimeError('cache colunar ausente ou desatualizado: rode python -m utils.build_cache antes da ingestão')
+
+        report = {}
+        df = build_dataset(pd.read_csv(batch_path), report)
+
+        # Anexando as linhas brutas do lote ao csv, sem o cabeçalho
+        with open(path, 'rb') as f:
+            header = f.readline()
+            f.seek(-1, os.SEEK_END)
+            termina_com_quebra = f.read(1) == b'\n'
+        with open(batch_path, 'rb') as f:
+            if f.readline().strip() != header.strip():
+                raise ValueError('o cabeçalho do lote é diferente do cabeçalho do dataset')
+            linhas = f.read()
+        with open(path, 'ab') as f:
+            if not termina_com_quebra:
+                f.write(b'\n')
+            f.write(linhas)
+
+        batches_path = batches_path_for(cache_path)
+        os.makedirs(batches_path, exist_ok=True)
+        name = '{:06d}.parquet'.format(len(list_batches(cache_path)) + 1)
+        columnar.write_columnar(df, os.path.join(batches_path, name), dataset_version(path)[1:], report)
+
+    return report
+
+
+def current_version(path=DATASET_PATH):
+    """ Versão atual dos arquivos do dataset
+        
+        Input: caminho do csv
+        Output: tupla (versão do csv, versão do Parquet, lotes)
+    """
+    cache_path = cache_path_for(path)
+    return (dataset_version(path), dataset_version(cache_path), list_batches(cache_path))
+
+
+def read_dataset(path=DATASET_PATH, columns=None, previous=None, full=None):
+    """ Lê e limpa a versão atual do dataset, sem consultar o cache do processo
+        Se existir um Parquet gerado a partir da versão atual do csv
+        (python -m utils.build_cache), ele é lido lendo do disco só as colunas
+        pedidas; caso contrário o csv é lido e limpo. Lotes novos
+        (python -m utils.ingest) são acrescentados à entrada anterior sem
+        reler o restante.
+        
+        Input: caminho do csv, lista de colunas (None = todas), entrada anterior
+               (versão, dataframe, relatório) e função que devolve a entrada do
+               dataset completo (projeções sem cache colunar)
+        Output: tupla (versão, Dataframe limpo, relatório)
+    """
+    cache_path = cache_path_for(path)
+    version = current_version(path)
+
+    if MAPPED and columnar.available():
+        inicio = time.perf_counter()
+        mapped_path = mapped_path_for(path)
+        if not mapped_is_fresh(path, mapped_path):
+            publish_mapped(path, mapped_path, force=False)
+        df = columnar.read_mapped(mapped_path, columns)
+        report = dict(columnar.read_mapped_metadata(mapped_path)['report'])
+        report['source'] = 'mmap'
+        report['mapped_path'] = mapped_path
+        report['load_time'] = time.perf_counter() - inicio
+    elif columnar.available() and cache_is_fresh(path, cache_path):
+        inicio = time.perf_counter()
+        batches = version[2]
+        if previous is not None and previous[2]['source'] == 'parquet' and is_append(previous[0], version):
+            # Só os lotes novos são lidos
+            df = append_rows(previous[1], read_batches(path, batches[len(previous[0][2]):], columns))
+            report = dict(previous[2])
+        else:
+            df = columnar.read_columnar(cache_path, columns)
+            if batches:
+                df = append_rows(df, read_batches(path, batches, columns))
+            report = dict(columnar.read_metadata(cache_path)['report'])
+        report['source'] = 'parquet'
+        report['batches'] = len(batches)
+        report['load_time'] = time.perf_counter() - inicio
+    elif columns is not None:
+        # Sem cache colunar: o csv é limpo uma única vez e cada página recebe uma projeção
+        version, df, report = full() if full is not None else read_dataset(path)
+        df = df.loc[:, list(columns)]
+    else:
+        inicio = time.perf_counter()
+        report = {}
+        df = build_dataset(pd.read_csv(path), report)
+        report['source'] = 'csv'
+        report['load_time'] = time.perf_counter() - inicio
+
+    return version, df, report
+
+
+def published(path=DATASET_PATH):
+    """ Geração publicada pela atualização em segundo plano (utils.refresh)
+        
+        Input: caminho do csv
+        Output: dicionário com version, datasets (colunas -> entrada do cache),
+                rollups, profiles, loaded_at e load_seconds, ou None se ainda não houve publicação
+    """
+    return _published.get(os.path.abspath(path))
+
+
+def publish(path, generation):
+    """ Troca atômica da geração servida às páginas
+        As execuções em andamento continuam com os dataframes da geração
+        anterior até terminarem.
+        
+        Input: caminho do csv, geração montada por utils.refresh.build_generation
+        Output: None
+    """
+    abspath = os.path.abspath(path)
+    with _cache_lock:
+        for columns, entry in generation['datasets'].items():
+            _cache[(abspath, columns)] = entry
+        _published[abspath] = generation
+
+
+def cached_entries(path=DATASET_PATH):
+    """ Entradas do cache do processo para um csv
+        
+        Input: caminho do csv
+        Output: dicionário colunas -> (versão, dataframe, relatório)
+    """
+    abspath = os.path.abspath(path)
+    return {columns: entry for (key_path, columns), entry in list(_cache.items()) if key_path == abspath}
+
+
+def load_dataset(path=DATASET_PATH, columns=None):
+    """ Carrega e limpa o dataset uma única vez por processo (ver read_dataset)
+        A leitura só é refeita quando algum dos arquivos muda (caminho, tamanho
+        ou mtime diferentes). Se o caminho é atualizado em segundo plano
+        (utils.refresh), a versão publicada é devolvida sem nenhuma leitura.
+        Todas as sessões recebem o mesmo dataframe, que deve ser tratado como
+        somente leitura: os filtros das páginas geram novos dataframes antes
+        de qualquer escrita. Com CURRY_MMAP=1 o dataframe aponta para o
+        arquivo Arrow mapeado (publicado na primeira carga da máquina) e as
+        colunas numéricas são de fato somente leitura.
+        
+        Input: caminho do csv, lista de colunas usadas pela página (None = todas)
+        Output: Dataframe limpo
+    """
+    columns = tuple(columns) if columns is not None else None
+    key = (os.path.abspath(path), columns)
+
+    generation = published(path)
+    if generation is not None and columns in generation['datasets']:
+        return generation['datasets'][columns][1]
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == current_version(path):
+            return cached[1]
+
+        _cache[key] = read_dataset(path, columns, cached, lambda: dataset_entry(path))
+
+    return _cache[key][1]
+
+
+def dataset_entry(path=DATASET_PATH, columns=None):
+    """ Entrada do cache do processo (versão, dataframe, relatório), carregando se preciso """
+    load_dataset(path, columns)
+    return _cache[(os.path.abspath(path), tuple(columns) if columns is not None else None)]
+
+
+def is_append(old, new):
+    """ Indica se a versão new difere da old apenas por lotes ingeridos a mais
+        
+        Input: versões retornadas por current_version
+        Output: bool
+    """
+    return old[1] == new[1] and len(new[2]) > len(old[2]) and new[2][:len(old[2])] == old[2]
+
+
+def load_report(path=DATASET_PATH, columns=None):
+    """ Relatório da carga do dataset: origem (csv ou parquet), tempo de carga,
+        tempos por etapa do clean_code e linhas removidas
+        
+        Input: caminho do csv, colunas usadas na carga
+        Output: dicionário do relatório ou None se o dataset não foi carregado
+    """
+    columns = tuple(columns) if columns is not None else None
+    cached = _cache.get((os.path.abspath(path), columns))
+    return cached[2] if cached is not None else None
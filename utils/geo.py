@@ -0,0 +1,91 @@
+# Libraries
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Funções geográficas vetorizadas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Raio médio da Terra em km (o mesmo usado pela biblioteca haversine)
+EARTH_RADIUS_KM = 6371.0088
+
+DISTANCE_COLUMNS = ['Restaurant_latitude', 'Restaurant_longitude', 'Delivery_location_latitude', 'Delivery_location_longitude']
+
+
+def haversine_np(lat1, lon1, lat2, lon2):
+    """ Distância de grande círculo entre arrays de coordenadas
+        Equivalente a chamar haversine((lat1, lon1), (lat2, lon2)) linha a linha,
+        mas calculado de uma só vez sobre os arrays inteiros.
+        
+        Input: arrays de latitude/longitude em graus
+        Output: array de distâncias em km
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    d = np.sin(dlat * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(d))
+
+
+def delivery_distance(df):
+    """ Distância entre restaurante e local de entrega de cada pedido
+        
+        Input: Dataframe com as colunas de latitude/longitude
+        Output: array float32 com a distância em km
+    """
+    coords = [df[col].to_numpy() for col in DISTANCE_COLUMNS]
+    return haversine_np(*coords).astype(np.float32)
+
+
+def grid_cells(df, lat_col, lon_col, cell_size):
+    """ Agrupa pontos em uma grade regular de células de cell_size graus
+        Toda a agregação acontece no servidor: o navegador recebe só as células.
+        
+        Input: Dataframe com as colunas de coordenadas, 'Time_taken(min)' e
+               'distance'; colunas de latitude/longitude; tamanho da célula em graus
+        Output: Dataframe com uma linha por célula ocupada: lat/lon do canto
+                sudoeste, count, median_time e median_distance
+    """
+    df_aux = pd.DataFrame({
+        'lat_idx': np.floor(df[lat_col].to_numpy(dtype=np.float64) / cell_size).astype(np.int64),
+        'lon_idx': np.floor(df[lon_col].to_numpy(dtype=np.float64) / cell_size).astype(np.int64),
+        'time': df['Time_taken(min)'].to_numpy(),
+        'distance': df['distance'].to_numpy(),
+    })
+
+    cells = (df_aux.groupby(['lat_idx', 'lon_idx'])
+                   .agg(count=('time', 'size'), median_time=('time', 'median'), median_distance=('distance', 'median'))
+                   .reset_index())
+    cells['lat'] = cells['lat_idx'] * cell_size
+    cells['lon'] = cells['lon_idx'] * cell_size
+
+    return cells.drop(columns=['lat_idx', 'lon_idx'])
+
+
+def cells_geojson(cells, cell_size):
+    """ GeoJSON compacto (um polígono por célula) para uma única camada do mapa
+        A propriedade intensity (0 a 1, escala logarítmica da contagem) é usada
+        para colorir as células.
+        
+        Input: células de grid_cells, tamanho da célula em graus
+        Output: dicionário GeoJSON FeatureCollection
+    """
+    lat = np.round(cells['lat'].to_numpy(), 5)
+    lon = np.round(cells['lon'].to_numpy(), 5)
+    lat2 = np.round(lat + cell_size, 5)
+    lon2 = np.round(lon + cell_size, 5)
+
+    count = cells['count'].to_numpy()
+    intensity = np.round(np.log1p(count) / np.log1p(count.max()), 3) if len(count) else count
+    median_time = np.round(cells['median_time'].to_numpy(dtype=np.float64), 1)
+    median_distance = np.round(cells['median_distance'].to_numpy(dtype=np.float64), 2)
+
+    features = [{'type': 'Feature',
+                 'geometry': {'type': 'Polygon', 'coordinates': [[[x1, y1], [x2, y1], [x2, y2], [x1, y2], [x1, y1]]]},
+                 'properties': {'count': int(n), 'median_time': float(t), 'median_distance': float(d), 'intensity': float(i)}}
+                for y1, x1, y2, x2, n, t, d, i in zip(lat.tolist(), lon.tolist(), lat2.tolist(), lon2.tolist(),
+                                                       count.tolist(), median_time.tolist(), median_distance.tolist(),
+                                                       intensity.tolist())]
+
+    return {'type': 'FeatureCollection', 'features': features}
@@ -0,0 +1,30 @@
+""" Ingestão incremental de um lote de pedidos
+
+    Uso:
+        python -m utils.ingest lote.csv [--csv dataset/train.csv]
+"""
+# Libraries
+import argparse
+import time
+
+from utils.dataset import DATASET_PATH, ingest_batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Limpa um lote de pedidos e o acrescenta ao dataset.')
+    parser.add_argument('batch', help='csv do lote, com o mesmo cabeçalho do dataset')
+    parser.add_argument('--csv', default=DATASET_PATH, help='csv do dataset')
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    try:
+        report = ingest_batch(args.batch, args.csv)
+    except (RuntimeError, ValueError) as e:
+        parser.error(str(e))
+
+    print('{}: {} linhas ingeridas ({} removidas) em {:.2f}s'.format(args.batch, report['rows_out'], report['rows_dropped'],
+                                                                    time.perf_counter() - inicio))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Libraries
+import os
+import threading
+from collections import OrderedDict
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Cache LRU com orçamento em bytes para figuras e tabelas prontas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Orçamento do cache de painéis em MB (CURRY_FIGURE_CACHE_MB=0 desliga o cache)
+FIGURE_CACHE_MB = float(os.environ.get('CURRY_FIGURE_CACHE_MB', '128'))
+
+
+class ByteLRU:
+    """ Cache LRU limitado pela soma dos tamanhos dos valores
+        Compartilhado por todas as sessões do processo: ao passar do orçamento
+        os valores usados há mais tempo são descartados.
+    """
+
+    def __init__(self, budget, sizeof):
+        self.budget = budget
+        self.sizeof = sizeof
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, builder, keep=None):
+        """ Valor da chave, calculado por builder() e guardado quando ausente
+            
+            Input: chave (hashable), função sem argumentos que calcula o valor e
+                   função keep() que decide, depois do cálculo, se ele é guardado
+            Output: valor
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+
+        # o cálculo fica fora do lock: sessões diferentes não esperam umas pelas outras
+        value = builder()
+        if keep is None or keep():
+            self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.budget:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.budget:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """ Contadores do cache
+            
+            Input: None
+            Output: dicionário com hits, misses, evictions, entries, bytes e budget
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._items), 'bytes': self._bytes, 'budget': self.budget}
@@ -0,0 +1,105 @@
+# Libraries
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Agregação paralela sobre partições do dataset
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Quantidade de processos usados nas agregações (CURRY_WORKERS <= 1: execução serial)
+WORKERS = int(os.environ.get('CURRY_WORKERS', '1'))
+
+# Pool de processos criado na primeira utilização e reaproveitado entre as cargas
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def month_bounds(df):
+    """ Fronteiras das fatias de um mês do dataset ordenado por Order_Date,
+        encontradas por busca binária
+        
+        Input: Dataframe ordenado por Order_Date
+        Output: lista de tuplas (início, fim) de linhas, uma por mês presente nos dados
+    """
+    if len(df) == 0:
+        return [(0, 0)]
+
+    dates = df['Order_Date']
+    months = pd.date_range(dates.iloc[0].to_period('M').to_timestamp(), dates.iloc[-1], freq='MS')
+    bounds = [0] + [int(dates.searchsorted(month, side='left')) for month in months[1:]] + [len(df)]
+
+    return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def partition_by_month(df):
+    """ Divide o dataset ordenado por Order_Date em fatias de um mês, sem
+        copiar as linhas
+        
+        Input: Dataframe ordenado por Order_Date
+        Output: lista de Dataframes (um por mês presente nos dados)
+    """
+    return [df.iloc[start:stop] for start, stop in month_bounds(df)]
+
+
+def _get_pool(workers):
+    # 'spawn' evita copiar por fork as threads do servidor do Streamlit (chamado com _pool_lock)
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _pool_workers = workers
+    return _pool
+
+
+@contextmanager
+def _without_main_script():
+    # Os processos do 'spawn' reimportam o arquivo do __main__ do processo pai.
+    # Dentro do Streamlit o __main__ é a página, que rodaria de novo (sem
+    # contexto do Streamlit) em cada worker; enquanto os workers são criados o
+    # __main__ é trocado por um módulo vazio, sem __file__.
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+def map_partitions(func, parts, workers=None):
+    """ Aplica func a cada partição, em paralelo quando há mais de um worker
+        func deve ser uma função de módulo (para poder ser enviada aos
+        processos). Se o pool não puder ser usado, a execução cai para o modo
+        serial e o motivo é registrado no log.
+        
+        Input: função, lista de partições, quantidade de workers (padrão: WORKERS)
+        Output: lista com o resultado de cada partição, na mesma ordem
+    """
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or len(parts) <= 1:
+        return [func(part) for part in parts]
+
+    global _pool
+    try:
+        # os workers são criados no submit (sob demanda), com o __main__ trocado
+        with _pool_lock, _without_main_script():
+            futures = [_get_pool(workers).submit(func, part) for part in parts]
+        return [future.result() for future in futures]
+    except (BrokenProcessPool, OSError) as error:
+        logger.warning('Pool de %d processos indisponível (%r): agregação em modo serial', workers, error)
+        with _pool_lock:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = None
+        return [func(part) for part in parts]
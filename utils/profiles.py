@@ -0,0 +1,273 @@
+# Libraries
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import DATASET_PATH, build_dataset, concat_frames, dataset_entry, dataset_version, published
+from utils.rollup import STREAM_CHUNKSIZE
+from utils.stats import accumulate, combine, merge_tree
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Perfis por entregador
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Colunas do dataset usadas para montar os perfis
+PROFILE_COLUMNS = ['Delivery_person_ID', 'Order_Date', 'City', 'Road_traffic_density', 'Time_taken(min)',
+                   'Delivery_person_Ratings', 'Delivery_person_Age', 'Vehicle_condition', 'Type_of_vehicle']
+
+# Medidas guardadas por (entregador, cidade, trânsito): prefixo -> coluna de origem
+PROFILE_MEASURES = {'time': 'Time_taken(min)', 'rating': 'Delivery_person_Ratings'}
+
+# Granularidade dos resumos e agregações extras de cada célula (nome -> (coluna, função))
+PROFILE_KEYS = ['Delivery_person_ID', 'City', 'Road_traffic_density']
+PROFILE_EXTREMES = {'count': ('Time_taken(min)', 'size'),
+                    'age_min': ('Delivery_person_Age', 'min'), 'age_max': ('Delivery_person_Age', 'max'),
+                    'vehicle_min': ('Vehicle_condition', 'min'), 'vehicle_max': ('Vehicle_condition', 'max'),
+                    'last_order': ('Order_Date', 'max')}
+
+# Cache do processo: caminho -> (dataframe de origem, perfis, versão do dataset)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _reduce(n, mean, m2, axis):
+    # combina acumuladores (n, média, m2) ao longo dos eixos (fórmula de Chan, ver utils.stats.combine)
+    total = n.sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        group_mean = (n * mean).sum(axis=axis) / total
+        desvios = n * (mean - np.expand_dims(group_mean, axis)) ** 2
+    return total, group_mean, m2.sum(axis=axis) + np.nan_to_num(desvios).sum(axis=axis)
+
+
+def _std(n, m2):
+    # desvio padrão amostral (ddof=1, como no pandas)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(n > 1, np.sqrt(np.clip(m2, 0, None) / (n - 1)), np.nan)
+
+
+def profile_summary(df):
+    """ Resumo combinável dos perfis de um pedaço do dataset
+        
+        Input: Dataframe com PROFILE_COLUMNS
+        Output: tupla (acumuladores por PROFILE_KEYS com count e os extremos de
+                PROFILE_EXTREMES, pedidos por entregador e tipo de veículo)
+    """
+    df_aux = df.loc[:, PROFILE_COLUMNS].copy()
+    df_aux['Delivery_person_ID'] = df_aux['Delivery_person_ID'].astype(str).str.strip().astype('category')
+
+    cells = accumulate(df_aux, PROFILE_KEYS, PROFILE_MEASURES, PROFILE_EXTREMES)
+    vehicles = (df_aux.assign(Type_of_vehicle=df_aux['Type_of_vehicle'].astype(str))
+                .groupby(['Delivery_person_ID', 'Type_of_vehicle'], observed=True).size()
+                .rename('count').reset_index())
+    return cells, vehicles
+
+
+def merge_profile_summaries(summaries):
+    """ Junta resumos de pedaços diferentes do dataset (ver profile_summary)
+        
+        Input: lista de tuplas (acumuladores, veículos)
+        Output: tupla (acumuladores, veículos) combinada
+    """
+    aggregations = {name: 'sum' if func == 'size' else func for name, (_, func) in PROFILE_EXTREMES.items()}
+    cells = combine(concat_frames([cells for cells, _ in summaries]), PROFILE_KEYS, PROFILE_MEASURES, aggregations)
+    vehicles = (concat_frames([vehicles for _, vehicles in summaries])
+                .groupby(['Delivery_person_ID', 'Type_of_vehicle'], observed=True)['count'].sum().reset_index())
+    return cells, vehicles
+
+
+def stream_profile_summary(path=DATASET_PATH, chunksize=100000):
+    """ Resumo dos perfis lendo o csv em pedaços (modo streaming, como em
+        utils.rollup.stream_rollups): o dataset completo nunca é carregado.
+        Os resumos parciais são combinados em árvore (merge_tree); o resumo
+        tem uma célula por entregador, cidade e trânsito e cresce com a
+        quantidade de entregadores.
+        
+        Input: caminho do csv, linhas por pedaço
+        Output: tupla (acumuladores, veículos)
+    """
+    partials = (profile_summary(build_dataset(chunk)) for chunk in pd.read_csv(path, chunksize=chunksize))
+    return merge_tree(partials, merge_profile_summaries)
+
+
+class DelivererProfiles:
+    """ Perfis de todos os entregadores de uma versão do dataset
+        Cada entregador ocupa uma posição de arrays numpy, encontrada por um
+        índice hash (dicionário ID -> posição). Quantidade de pedidos e os
+        acumuladores (n, média, m2) de tempo e avaliação ficam em arrays
+        [entregador, cidade, trânsito]; extremos de idade e condição do veículo,
+        veículo mais usado e data do último pedido, em arrays [entregador].
+        Consultas de um entregador e rankings não percorrem os pedidos.
+        Os arrays são montados a partir do resumo combinável (profile_summary),
+        então os perfis também podem ser construídos pedaço a pedaço.
+    """
+
+    def __init__(self, cells, vehicles):
+        ids = cells['Delivery_person_ID'].astype(str)
+        city = cells['City'].astype('category')
+        traffic = cells['Road_traffic_density'].astype('category')
+
+        self.ids = np.array(sorted(set(ids) | set(vehicles['Delivery_person_ID'].astype(str))), dtype=object)
+        self.index = {deliverer: posicao for posicao, deliverer in enumerate(self.ids)}
+        self.cities = list(city.cat.categories)
+        self.traffics = list(traffic.cat.categories)
+
+        # acumuladores por (entregador, cidade, trânsito)
+        shape = (len(self.ids), len(self.cities), len(self.traffics))
+        deliverer = pd.Categorical(ids, categories=self.ids).codes
+        celula = (deliverer, city.cat.codes.to_numpy(), traffic.cat.codes.to_numpy())
+        self.cells = {}
+        for col in ['count'] + [prefix + suffix for prefix in PROFILE_MEASURES for suffix in ['_n', '_mean', '_m2']]:
+            values = np.zeros(shape)
+            values[celula] = cells[col].to_numpy(dtype=np.float64)
+            self.cells[col] = values
+
+        # atributos por entregador
+        extremes = {name: func for name, (_, func) in PROFILE_EXTREMES.items() if name != 'count'}
+        df_person = cells.groupby(deliverer)[list(extremes)].agg(extremes)
+        df_person = df_person.reindex(np.arange(len(self.ids)))
+        self.person = {col: df_person[col].to_numpy() for col in df_person.columns}
+
+        # veículo mais usado por cada entregador
+        vehicles = (pd.DataFrame({'deliverer': pd.Categorical(vehicles['Delivery_person_ID'].astype(str), categories=self.ids).codes,
+                                  'vehicle': vehicles['Type_of_vehicle'].astype(str).to_numpy(), 'count': vehicles['count'].to_numpy()})
+                    .sort_values(['count', 'deliverer', 'vehicle'], ascending=[False, True, True], kind='mergesort')
+                    .drop_duplicates('deliverer')
+                    .set_index('deliverer')['vehicle']
+                    .reindex(np.arange(len(self.ids))))
+        self.person['vehicle_type'] = vehicles.to_numpy()
+
+    @classmethod
+    def build(cls, df):
+        """ Perfis a partir das linhas do dataset
+            
+            Input: Dataframe com PROFILE_COLUMNS
+            Output: DelivererProfiles
+        """
+        return cls(*profile_summary(df))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, deliverer_id):
+        return str(deliverer_id).strip() in self.index
+
+    @property
+    def nbytes(self):
+        return (sum(values.nbytes for values in self.cells.values()) + sum(values.nbytes for values in self.person.values())
+                + sum(len(deliverer) for deliverer in self.ids))
+
+    def _mask(self, cities=None, traffics=None):
+        # máscara [cidade, trânsito] das células selecionadas (None = todas)
+        city_mask = np.isin(self.cities, cities) if cities is not None else np.ones(len(self.cities), dtype=bool)
+        traffic_mask = np.isin(self.traffics, traffics) if traffics is not None else np.ones(len(self.traffics), dtype=bool)
+        return np.outer(city_mask, traffic_mask)
+
+    def _measure(self, prefix, rows, mask, axis):
+        # (n, média, desvio padrão) de uma medida nas células selecionadas
+        n, mean, m2 = (self.cells[prefix + suffix][rows] * mask for suffix in ['_n', '_mean', '_m2'])
+        n, mean, m2 = _reduce(n, mean, m2, axis)
+        return n, mean, _std(n, m2)
+
+    def profile(self, deliverer_id, traffics=None):
+        """ Perfil de um entregador (busca no índice hash, sem percorrer os pedidos)
+            
+            Input: ID do entregador, lista de condições de trânsito (None = todas)
+            Output: dicionário com count, avg/std de rating e time, extremos de idade
+                    e condição do veículo, vehicle_type, last_order e time_by_city
+                    (Dataframe por cidade e trânsito), ou None se o ID não existe
+        """
+        posicao = self.index.get(str(deliverer_id).strip())
+        if posicao is None:
+            return None
+
+        mask = self._mask(traffics=traffics)
+        profile = {'Delivery_person_ID': self.ids[posicao], 'count': int((self.cells['count'][posicao] * mask).sum())}
+        for prefix in PROFILE_MEASURES:
+            _, profile['avg_' + prefix], profile['std_' + prefix] = (float(value) for value in self._measure(prefix, posicao, mask, (0, 1)))
+        profile.update({col: values[posicao].item() if hasattr(values[posicao], 'item') else values[posicao]
+                        for col, values in self.person.items() if col != 'last_order'})
+        profile['last_order'] = pd.Timestamp(self.person['last_order'][posicao])
+
+        # tempo por cidade e trânsito, só das células com pedidos
+        cidade, transito = np.nonzero((self.cells['count'][posicao] > 0) & mask)
+        n = self.cells['time_n'][posicao][cidade, transito]
+        profile['time_by_city'] = pd.DataFrame({'City': np.array(self.cities, dtype=object)[cidade],
+                                                'Road_traffic_density': np.array(self.traffics, dtype=object)[transito],
+                                                'count': self.cells['count'][posicao][cidade, transito].astype(int),
+                                                'avg_time': self.cells['time_mean'][posicao][cidade, transito],
+                                                'std_time': _std(n, self.cells['time_m2'][posicao][cidade, transito])})
+        return profile
+
+    def ranked(self, measure='rating', k=10, ascending=False, cities=None, traffics=None, min_orders=1):
+        """ Ranking dos entregadores por uma medida, calculado sobre os arrays
+            (seleção parcial dos k primeiros, como em utils.topk)
+            
+            Input: medida ('rating', 'time' ou 'count'), quantidade de entregadores,
+                   sentido, cidades e condições de trânsito consideradas (None = todas),
+                   mínimo de pedidos para entrar no ranking
+            Output: Dataframe com Delivery_person_ID, count, avg_<medida> e std_<medida>
+        """
+        mask = self._mask(cities, traffics)
+        count = (self.cells['count'] * mask).sum(axis=(1, 2))
+        if measure == 'count':
+            values = count.astype(np.float64)
+            std = None
+        else:
+            _, values, std = self._measure(measure, slice(None), mask, (1, 2))
+
+        elegiveis = np.flatnonzero((count >= min_orders) & ~np.isnan(values))
+        chave = values[elegiveis] if ascending else -values[elegiveis]
+        if len(elegiveis) > k:
+            escolhidos = np.argpartition(chave, k - 1)[:k]
+        else:
+            escolhidos = np.arange(len(elegiveis))
+        posicoes = elegiveis[escolhidos[np.argsort(chave[escolhidos], kind='stable')]]
+
+        df_aux = pd.DataFrame({'Delivery_person_ID': self.ids[posicoes], 'count': count[posicoes].astype(int)})
+        if measure != 'count':
+            df_aux['avg_' + measure] = values[posicoes]
+            df_aux['std_' + measure] = std[posicoes]
+        return df_aux
+
+
+def profiles_entry(path, df, version):
+    """ Perfis de uma versão do dataset. No modo streaming (df None) os perfis
+        são montados lendo o csv em pedaços, sem carregar o dataset completo.
+        
+        Input: caminho do csv, dataframe com PROFILE_COLUMNS (ou None), versão do dataset
+        Output: tupla (dataframe, perfis, versão)
+    """
+    if df is None:
+        return None, DelivererProfiles(*stream_profile_summary(path, STREAM_CHUNKSIZE)), version
+    return df, DelivererProfiles.build(df), version
+
+
+def load_profiles(path=DATASET_PATH):
+    """ Perfis dos entregadores da versão atual do dataset, montados uma única
+        vez por versão. Se o caminho é atualizado em segundo plano
+        (utils.refresh), os perfis publicados são devolvidos sem nenhuma leitura.
+        
+        Input: caminho do csv
+        Output: DelivererProfiles
+    """
+    generation = published(path)
+    if generation is not None and generation.get('profiles') is not None:
+        return generation['profiles'][1]
+
+    if STREAM_CHUNKSIZE > 0:
+        df = None
+        version = dataset_version(path)
+    else:
+        version, df, _ = dataset_entry(path, PROFILE_COLUMNS)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[2] != version or cached[0] is not df:
+            _cache[path] = profiles_entry(path, df, version)
+
+    return _cache[path][1]
+
+
+def cached_profiles(path=DATASET_PATH):
+    """ Entrada do cache do processo (dataframe, perfis, versão) ou None """
+    return _cache.get(path)
@@ -0,0 +1,163 @@
+# Libraries
+import json
+import os
+import time
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow é opcional: sem ele o tamanho das tabelas é estimado pela memória
+    pa = None
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Instrumentação do tempo de cada etapa e painel das páginas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Com CURRY_PROFILE=1 as páginas medem cada etapa, mostram o resultado na barra
+# lateral e gravam uma linha JSON por etapa em CURRY_PROFILE_LOG
+PROFILE = os.environ.get('CURRY_PROFILE', '0') not in ('', '0')
+PROFILE_LOG = os.environ.get('CURRY_PROFILE_LOG', 'profile.jsonl')
+
+
+def payload_bytes(obj):
+    """ Estima quantos bytes um objeto ocupa ao ser enviado ao navegador
+        
+        Input: figura plotly, Dataframe, mapa folium, tupla desses ou valor de métrica
+        Output: quantidade de bytes
+    """
+    if isinstance(obj, tuple):
+        return sum(payload_bytes(item) for item in obj)
+    if hasattr(obj, 'nbytes') and not hasattr(obj, 'dtype'):
+        return obj.nbytes
+    if isinstance(obj, pd.DataFrame):
+        if pa is not None:
+            return pa.Table.from_pandas(obj).nbytes
+        return int(obj.memory_usage(deep=True).sum())
+    if hasattr(obj, 'to_plotly_json'):
+        return len(obj.to_json())
+    if hasattr(obj, 'get_root'):
+        return len(obj.get_root().render())
+    return len(str(obj))
+
+
+class Stage:
+    """ Medição de uma etapa (usada como context manager) """
+
+    def __init__(self, recorder, name, kind):
+        self.recorder = recorder
+        self.record = {'name': name, 'kind': kind}
+        self.inicio = 0.0
+        self.overhead = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record['seconds'] = time.perf_counter() - self.inicio - self.overhead
+        self.recorder.records.append(self.record)
+        return False
+
+    def mark(self, lap):
+        # tempo decorrido desde o início da etapa (ex.: 'build' antes de renderizar)
+        self.record[lap + '_seconds'] = time.perf_counter() - self.inicio - self.overhead
+
+    def payload(self, obj):
+        # o tempo gasto estimando o payload não entra no tempo da etapa
+        inicio = time.perf_counter()
+        self.record['payload_bytes'] = self.record.get('payload_bytes', 0) + payload_bytes(obj)
+        self.overhead += time.perf_counter() - inicio
+
+
+class Recorder:
+    """ Medições de uma execução de uma página """
+
+    enabled = True
+
+    def __init__(self, page, log_path=PROFILE_LOG):
+        self.page = page
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex
+        self.started = time.time()
+        self.inicio = time.perf_counter()
+        self.records = []
+
+    def stage(self, name, kind='stage'):
+        return Stage(self, name, kind)
+
+    def report(self):
+        """ Medições da execução como Dataframe
+            
+            Input: None
+            Output: Dataframe com uma linha por etapa/painel
+        """
+        return pd.DataFrame(self.records, columns=['name', 'kind', 'seconds', 'build_seconds', 'payload_bytes'])
+
+    def finish(self, container=None, counters=None, report=None):
+        """ Encerra a execução: grava as linhas JSON e mostra o resumo
+            
+            Input: container do streamlit para o resumo (ex.: st.sidebar), opcional,
+                   contadores extras (ex.: hits/misses do cache de painéis) e
+                   relatório da carga do dataset em uso (utils.dataset.load_report)
+            Output: None
+        """
+        total = time.perf_counter() - self.inicio
+        records = self.records + [{'name': 'total', 'kind': 'run', 'seconds': total, 'counters': counters}]
+        if report:
+            # só os valores simples do relatório (os tempos por etapa do clean_code ficam de fora)
+            load = {key: value for key, value in report.items() if not isinstance(value, dict)}
+            records.append({'name': 'load_dataset', 'kind': 'load', 'seconds': report.get('load_time'), 'report': load})
+
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                for record in records:
+                    f.write(json.dumps(dict(record, page=self.page, run_id=self.run_id, started=self.started), default=str) + '\n')
+
+        if container is not None:
+            expander = container.expander('Desempenho', expanded=True)
+            expander.caption('Total da execução: {:.3f} s'.format(total))
+            if report:
+                expander.caption('Última carga do dataset: {} em {:.3f} s, {} linhas'.format(report.get('source'), report.get('load_time', 0.0),
+                                                                                           report.get('rows_out', '?')))
+            expander.dataframe(self.report())
+            if counters:
+                expander.dataframe(pd.DataFrame([counters]))
+
+
+class NullStage:
+    """ Etapa sem medição (instrumentação desligada) """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mark(self, lap):
+        pass
+
+    def payload(self, obj):
+        pass
+
+
+class NullRecorder:
+    """ Recorder sem custo usado quando CURRY_PROFILE está desligado """
+
+    enabled = False
+    _stage = NullStage()
+
+    def stage(self, name, kind='stage'):
+        return self._stage
+
+    def finish(self, container=None, counters=None, report=None):
+        pass
+
+
+def start(page):
+    """ Inicia as medições de uma execução da página
+        
+        Input: nome da página
+        Output: Recorder (ou NullRecorder, sem custo, quando CURRY_PROFILE está desligado)
+    """
+    return Recorder(page) if PROFILE else NullRecorder()
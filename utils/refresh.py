@@ -0,0 +1,165 @@
+# Libraries
+import datetime
+import os
+import threading
+import time
+
+from utils.dataset import (DATASET_PATH, cached_entries, current_version, dataset_version, publish, published,
+                           read_dataset)
+from utils import sqlstore
+from utils.profiles import PROFILE_COLUMNS, cached_profiles, profiles_entry
+from utils.rollup import ROLLUP_COLUMNS, STREAM_CHUNKSIZE, cached_rollups, rollups_entry
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Atualização do dataset em segundo plano
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Intervalo (segundos) entre as verificações dos arquivos do dataset; 0 desliga a
+# atualização em segundo plano e as páginas voltam a recarregar na própria execução
+REFRESH_SECONDS = float(os.environ.get('CURRY_REFRESH_SECONDS', '0'))
+
+# Threads de atualização do processo (caminho absoluto -> thread) e último erro de cada uma
+_threads = {}
+_threads_lock = threading.Lock()
+_errors = {}
+
+
+def build_generation(path=DATASET_PATH):
+    """ Carrega a versão atual do dataset fora das execuções das páginas
+        Todas as projeções de colunas já usadas pelas páginas e os rollups (com
+        os sketches de entregadores distintos) são montados em uma nova geração,
+        que só é servida depois de publicada.
+        Entradas do cache que já correspondem à versão atual são reaproveitadas
+        e lotes ingeridos são acrescentados sem reler o restante.
+        
+        Input: caminho do csv
+        Output: geração (dicionário com version, datasets, rollups, profiles, loaded_at e load_seconds)
+    """
+    inicio = time.perf_counter()
+    version = current_version(path)
+    previous = cached_entries(path)
+    columns_list = set(previous)
+    if STREAM_CHUNKSIZE <= 0:
+        columns_list.add(tuple(ROLLUP_COLUMNS))
+
+    datasets = {}
+
+    def entry(columns):
+        if columns not in datasets:
+            cached = previous.get(columns)
+            if cached is not None and cached[0] == version:
+                datasets[columns] = cached
+            else:
+                datasets[columns] = read_dataset(path, columns, cached, lambda: entry(None))
+        return datasets[columns]
+
+    for columns in sorted(columns_list, key=lambda columns: columns is not None):
+        entry(columns)
+
+    cached = cached_rollups(path)
+    if STREAM_CHUNKSIZE > 0:
+        rollup_version = dataset_version(path)
+        rollups = cached if cached is not None and cached[3] == rollup_version else rollups_entry(path, None, rollup_version)
+    else:
+        rollup_version, df, report = datasets[tuple(ROLLUP_COLUMNS)]
+        if cached is not None and cached[3] == rollup_version and cached[0] is df:
+            rollups = cached
+        else:
+            rollups = rollups_entry(path, df, rollup_version, report, cached)
+
+    # perfis dos entregadores, remontados só se alguma página já os usou
+    profiles = None
+    cached = cached_profiles(path)
+    if cached is not None:
+        if STREAM_CHUNKSIZE > 0:
+            profile_version, df = dataset_version(path), None
+        else:
+            profile_version, df, _ = entry(tuple(PROFILE_COLUMNS))
+        profiles = cached if cached[2] == profile_version and cached[0] is df else profiles_entry(path, df, profile_version)
+
+    # banco SQLite dos mapas (CURRY_SQLITE=1), republicado em pedaços, sem manter o dataset completo na geração
+    if sqlstore.SQLITE:
+        sqlstore.publish_sqlite(path, force=False)
+
+    return {'version': version, 'datasets': datasets, 'rollups': rollups, 'profiles': profiles,
+            'loaded_at': time.time(), 'load_seconds': time.perf_counter() - inicio}
+
+
+def refresh(path=DATASET_PATH):
+    """ Monta e publica uma nova geração do dataset
+        Se os arquivos mudarem durante a carga (ex.: csv ainda sendo copiado),
+        a geração é descartada e a anterior continua sendo servida.
+        
+        Input: caminho do csv
+        Output: bool indicando se uma nova geração foi publicada
+    """
+    generation = build_generation(path)
+    if current_version(path) != generation['version']:
+        return False
+
+    publish(path, generation)
+    return True
+
+
+def watch(path=DATASET_PATH, interval=REFRESH_SECONDS):
+    # laço da thread: uma versão nova só é carregada depois de ficar igual em duas
+    # verificações seguidas, para não ler um arquivo que ainda está sendo escrito
+    abspath = os.path.abspath(path)
+    last_seen = None
+    while True:
+        time.sleep(interval)
+        try:
+            version = current_version(path)
+            generation = published(path)
+            if generation is None or (version != generation['version'] and version == last_seen):
+                refresh(path)
+                _errors.pop(abspath, None)
+            last_seen = version
+        except Exception as exc:  # a geração publicada continua valendo; nova tentativa no próximo ciclo
+            _errors[abspath] = repr(exc)
+
+
+def start(path=DATASET_PATH, interval=REFRESH_SECONDS):
+    """ Inicia, uma vez por processo, a atualização em segundo plano do dataset
+        
+        Input: caminho do csv, intervalo entre verificações (segundos)
+        Output: bool indicando se a atualização em segundo plano está ativa
+    """
+    if interval <= 0:
+        return False
+
+    abspath = os.path.abspath(path)
+    with _threads_lock:
+        if abspath not in _threads:
+            thread = threading.Thread(target=watch, args=(path, interval), name='curry-refresh', daemon=True)
+            thread.start()
+            _threads[abspath] = thread
+
+    return True
+
+
+def status(path=DATASET_PATH):
+    """ Versão do dataset servida às páginas e duração da última carga
+        
+        Input: caminho do csv
+        Output: dicionário com modified (data do csv), rows, load_seconds,
+                loaded_at, background e error, ou None se nada foi carregado
+    """
+    abspath = os.path.abspath(path)
+    generation = published(path)
+    if generation is not None:
+        version = generation['version']
+        rows = len(next(iter(generation['datasets'].values()))[1]) if generation['datasets'] else None
+        load_seconds = generation['load_seconds']
+        loaded_at = datetime.datetime.fromtimestamp(generation['loaded_at'])
+    else:
+        entries = cached_entries(path)
+        if not entries:
+            return None
+        version, df, report = next(iter(entries.values()))
+        rows = len(df)
+        load_seconds = (report or {}).get('load_time')
+        loaded_at = None
+
+    modified = datetime.datetime.fromtimestamp(version[0][2] / 1e9) if version[0] is not None else None
+    return {'modified': modified, 'rows': rows, 'load_seconds': load_seconds, 'loaded_at': loaded_at,
+            'background': abspath in _threads, 'error': _errors.get(abspath)}
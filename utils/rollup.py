@@ -0,0 +1,475 @@
+# Libraries
+import os
+import threading
+from contextlib import nullcontext
+
+import pandas as pd
+
+from utils.dataset import (DATASET_PATH, build_dataset, concat_frames, dataset_entry, dataset_version, filter_dataset,
+                           is_append, load_dataset, published, read_batches)
+from utils import columnar, sqlstore
+from utils.parallel import WORKERS, map_partitions, month_bounds, partition_by_month
+from utils.sketch import DistinctSketches
+from utils.stats import accumulate, combine, mean_std, merge_tree
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Rollups pré-agregados para os filtros da barra lateral
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Granularidade do rollup: cada célula é uma combinação destas colunas
+ROLLUP_KEYS = ['Order_Date', 'City', 'Road_traffic_density', 'Festival', 'Type_of_order', 'Weatherconditions']
+
+# Granularidade do rollup por entregador
+DELIVERER_KEYS = ['Order_Date', 'City', 'Road_traffic_density', 'Delivery_person_ID']
+
+ROLLUP_COLUMNS = ROLLUP_KEYS + ['Delivery_person_ID', 'Time_taken(min)', 'Delivery_person_Ratings', 'distance',
+                                'Delivery_person_Age', 'Vehicle_condition']
+
+# Medidas com média/desvio padrão recuperáveis: prefixo -> coluna de origem
+MEASURES = {'time': 'Time_taken(min)', 'rating': 'Delivery_person_Ratings'}
+
+# Extremos guardados no rollup por entregador: coluna do rollup -> (coluna de origem, agregação)
+EXTREMES = {'age_min': ('Delivery_person_Age', 'min'), 'age_max': ('Delivery_person_Age', 'max'),
+            'vehicle_min': ('Vehicle_condition', 'min'), 'vehicle_max': ('Vehicle_condition', 'max')}
+
+# Granularidade do histograma de tempos: cada linha conta os pedidos de uma
+# célula com um mesmo Time_taken(min)
+QUANTILE_KEYS = ['Order_Date', 'City', 'Road_traffic_density', 'Festival']
+
+# Percentis do tempo de entrega exibidos nas páginas
+PERCENTILES = [0.5, 0.9, 0.99]
+
+# Modo streaming: com CURRY_STREAM_CHUNKSIZE > 0 os rollups são construídos
+# lendo o csv em pedaços desse tamanho, sem carregar o dataset inteiro
+STREAM_CHUNKSIZE = int(os.environ.get('CURRY_STREAM_CHUNKSIZE', '0'))
+
+# Cache do processo: caminho -> (dataframe de origem, rollup, rollup por entregador, versão do dataset,
+# histograma de tempos, sketches de entregadores distintos)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def build_rollup(df):
+    """ Materializa o rollup do dataset limpo
+        Cada célula guarda a quantidade de pedidos, a soma das distâncias e os
+        acumuladores (n, média, m2) de cada medida, o que permite recuperar
+        média e desvio padrão de qualquer agrupamento.
+        
+        Input: Dataframe limpo
+        Output: Dataframe com uma linha por célula do rollup
+    """
+    return accumulate(df, ROLLUP_KEYS, MEASURES, {'count': ('Time_taken(min)', 'size'), 'distance_sum': ('distance', 'sum')})
+
+
+def build_deliverer_rollup(df):
+    """ Materializa o rollup por entregador do dataset limpo
+        Além dos acumuladores das medidas, cada célula guarda os extremos de
+        idade e de condição do veículo, que também podem ser combinados (min/max).
+        
+        Input: Dataframe limpo
+        Output: Dataframe com uma linha por (dia, cidade, trânsito, entregador)
+    """
+    return accumulate(df, DELIVERER_KEYS, MEASURES, dict({'count': ('Time_taken(min)', 'size')}, **EXTREMES))
+
+
+def build_time_histogram(df):
+    """ Materializa o histograma de tempos de entrega do dataset limpo
+        Como Time_taken(min) é inteiro, cada célula guarda a contagem de pedidos
+        por minuto: um sketch de quantis exato, de tamanho limitado pela faixa de
+        tempos e combinável por soma (ver time_percentiles).
+        
+        Input: Dataframe limpo
+        Output: Dataframe com uma linha por (dia, cidade, trânsito, festival, tempo)
+    """
+    return df.groupby(QUANTILE_KEYS + ['Time_taken(min)'], observed=True).size().reset_index(name='count')
+
+
+def regroup(cube, by):
+    """ Agrupa um rollup (ou um resultado de regroup) em grupos mais agregados
+        Contagens e somas são somadas, extremos combinados por min/max e os
+        acumuladores das medidas combinados exatamente (ver utils.stats.combine).
+        
+        Input: rollup, lista de colunas do agrupamento
+        Output: Dataframe com as mesmas medidas, uma linha por grupo
+    """
+    aggregations = {col: EXTREMES[col][1] if col in EXTREMES else 'sum' for col in ['count', 'distance_sum'] + list(EXTREMES)
+                    if col in cube.columns}
+    prefixes = [prefix for prefix in MEASURES if prefix + '_n' in cube.columns]
+
+    return combine(cube, by, prefixes, aggregations)
+
+
+def merge_histograms(histograms):
+    """ Junta histogramas de tempos de partes diferentes do dataset (soma das contagens)
+        
+        Input: lista de histogramas
+        Output: histograma combinado, ordenado por Order_Date
+    """
+    return (concat_frames(histograms).groupby(QUANTILE_KEYS + ['Time_taken(min)'], observed=True)['count']
+            .sum().reset_index())
+
+
+def merge_rollups(cubes, keys=ROLLUP_KEYS):
+    """ Junta rollups de partes diferentes do dataset
+        Como as células só guardam contagens, somas, extremos e acumuladores
+        combináveis, o rollup da união é a combinação célula a célula dos
+        rollups de cada parte.
+        
+        Input: lista de rollups, colunas da granularidade
+        Output: rollup combinado, ordenado por Order_Date
+    """
+    return regroup(concat_frames(cubes), keys)
+
+
+def _build_rollups(df):
+    # os rollups e o histograma de tempos de uma partição (executado nos processos do pool)
+    return build_rollup(df), build_deliverer_rollup(df), build_time_histogram(df)
+
+
+def _build_mapped_rollups(part):
+    # os rollups de uma fatia do arquivo Arrow mapeado: o processo do pool mapeia
+    # o arquivo em vez de receber a partição serializada
+    mapped_path, start, stop = part
+    return _build_rollups(columnar.read_mapped(mapped_path, ROLLUP_COLUMNS).iloc[start:stop])
+
+
+def compute_rollups(df, workers=None, mapped_path=None):
+    """ Constrói os rollups do dataset, em paralelo por mês quando
+        CURRY_WORKERS > 1
+        Cada processo agrega uma partição (contagens por dia, entregadores por
+        dia e acumuladores de média/desvio) e o processo principal combina os
+        resultados com merge_rollups. Se o dataset vem do arquivo Arrow
+        mapeado, os processos recebem só as fronteiras de cada mês.
+        
+        Input: Dataframe limpo e ordenado, quantidade de workers (padrão: CURRY_WORKERS),
+               caminho do arquivo Arrow de onde o dataframe foi mapeado
+        Output: tupla (rollup, rollup por entregador, histograma de tempos)
+    """
+    if (WORKERS if workers is None else workers) <= 1:
+        results = [_build_rollups(df)]
+    elif mapped_path is not None:
+        results = map_partitions(_build_mapped_rollups, [(mapped_path, start, stop) for start, stop in month_bounds(df)], workers)
+    else:
+        results = map_partitions(_build_rollups, partition_by_month(df), workers)
+    if len(results) == 1:
+        return results[0]
+
+    return _merge_results(results)
+
+
+def _merge_results(results):
+    # combina uma lista de tuplas (rollup, rollup por entregador, histograma) em uma só
+    return (merge_rollups([cube for cube, _, _ in results]),
+            merge_rollups([deliverer_cube for _, deliverer_cube, _ in results], DELIVERER_KEYS),
+            merge_histograms([histogram for _, _, histogram in results]))
+
+
+def stream_rollups(path=DATASET_PATH, chunksize=100000):
+    """ Constrói os rollups lendo o csv em pedaços (modo streaming)
+        Cada pedaço passa pelo mesmo build_dataset do carregamento completo e é
+        agregado; os rollups parciais são combinados em árvore (merge_tree),
+        sem recombinar o resultado acumulado a cada pedaço. O dataset completo
+        nunca fica em memória, mas os rollups sim: o rollup principal e o
+        histograma são limitados pela quantidade de células, e o rollup por
+        entregador (uma célula por dia, cidade, trânsito e entregador) cresce
+        quase na proporção dos pedidos.
+        
+        Input: caminho do csv, linhas por pedaço
+        Output: tupla (rollup, rollup por entregador, histograma de tempos)
+    """
+    partials = (_build_rollups(build_dataset(chunk)) for chunk in pd.read_csv(path, chunksize=chunksize))
+    return merge_tree(partials, _merge_results) or (None, None, None)
+
+
+def rollups_entry(path, df, version, report=None, previous=None):
+    """ Constrói os rollups de uma versão do dataset
+        Quando a versão nova só acrescenta lotes ingeridos, apenas os lotes
+        novos são agregados e combinados aos rollups da entrada anterior. No
+        modo streaming (df None) o dataset completo nunca é carregado. Os
+        sketches de entregadores distintos são montados junto, a partir do
+        rollup por entregador, para que nenhuma página os construa.
+        
+        Input: caminho do csv, dataframe com ROLLUP_COLUMNS (ou None), versão e
+               relatório da carga, entrada anterior
+        Output: tupla (dataframe, rollup, rollup por entregador, versão, histograma de tempos, sketches)
+    """
+    if df is None:
+        cube, deliverer_cube, histogram = stream_rollups(path, STREAM_CHUNKSIZE)
+    elif (previous is not None and previous[0] is not None and report['source'] == 'parquet'
+          and is_append(previous[3], version)):
+        new = read_batches(path, version[2][len(previous[3][2]):], ROLLUP_COLUMNS)
+        cube = merge_rollups([previous[1], build_rollup(new)])
+        deliverer_cube = merge_rollups([previous[2], build_deliverer_rollup(new)], DELIVERER_KEYS)
+        histogram = merge_histograms([previous[4], build_time_histogram(new)])
+    else:
+        cube, deliverer_cube, histogram = compute_rollups(df, mapped_path=report.get('mapped_path'))
+
+    sketches = DistinctSketches.build(deliverer_cube, 'Delivery_person_ID')
+    return df, cube, deliverer_cube, version, histogram, sketches
+
+
+def load_rollups(path=DATASET_PATH):
+    """ Rollups da versão atual do dataset, construídos uma única vez por versão
+        (ver rollups_entry). Se o caminho é atualizado em segundo plano
+        (utils.refresh), os rollups publicados são devolvidos sem nenhuma leitura.
+        
+        Input: caminho do csv
+        Output: tupla (rollup, rollup por entregador)
+    """
+    entry = rollups_cache_entry(path)
+    return entry[1], entry[2]
+
+
+def rollups_cache_entry(path=DATASET_PATH):
+    """ Entrada dos rollups da versão atual (ver load_rollups)
+        
+        Input: caminho do csv
+        Output: tupla (dataframe, rollup, rollup por entregador, versão, histograma de tempos, sketches)
+    """
+    generation = published(path)
+    if generation is not None and generation['rollups'] is not None:
+        return generation['rollups']
+
+    if STREAM_CHUNKSIZE > 0:
+        df, report = None, None
+        version = dataset_version(path)
+    else:
+        version, df, report = dataset_entry(path, ROLLUP_COLUMNS)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[3] == version and cached[0] is df:
+            return cached
+
+        _cache[path] = rollups_entry(path, df, version, report, cached)
+
+    return _cache[path]
+
+
+def cached_rollups(path=DATASET_PATH):
+    """ Entrada do cache do processo (dataframe, rollup, rollup por entregador, versão, histograma, sketches) ou None """
+    return _cache.get(path)
+
+
+def load_sketches(path=DATASET_PATH):
+    """ Sketches de entregadores distintos por célula (dia, cidade, trânsito) da
+        versão atual, montados junto com os rollups (ver rollups_entry e utils.sketch)
+        
+        Input: caminho do csv
+        Output: DistinctSketches
+    """
+    return rollups_cache_entry(path)[5]
+
+
+def load_time_histogram(path=DATASET_PATH):
+    """ Histograma de tempos da versão atual do dataset (ver load_rollups) """
+    return rollups_cache_entry(path)[4]
+
+
+def filter_rollup(cube, date_limit, traffic_options):
+    """ Aplica os filtros da barra lateral às células do rollup
+        As células saem do groupby ordenadas por Order_Date, então o mesmo
+        filtro por busca binária do dataset vale para os rollups.
+        
+        Input: rollup, data limite (exclusiva), lista de condições de trânsito
+        Output: rollup filtrado
+    """
+    return filter_dataset(cube, date_limit, traffic_options)
+
+
+def time_percentiles(histogram, by=(), percentiles=PERCENTILES):
+    """ Percentis do tempo de entrega a partir do histograma (filtrado)
+        As contagens das células de cada grupo são somadas por minuto e o
+        percentil q é o menor tempo cuja contagem acumulada alcança q do total
+        do grupo (mesmo resultado de numpy.quantile com method='inverted_cdf').
+        
+        Input: histograma de tempos, colunas do agrupamento (vazio = total),
+               lista de percentis entre 0 e 1
+        Output: Dataframe com as colunas do agrupamento, count e p<percentil> (ex.: p50, p90, p99)
+    """
+    by = list(by)
+    keys = by or [pd.Series(0, index=histogram.index, name='_total')]
+    df_aux = (histogram.groupby(keys + ['Time_taken(min)'], observed=True)['count'].sum()
+              .reset_index())
+    group_keys = by or ['_total']
+
+    acumulado = df_aux.groupby(group_keys, observed=True)['count'].cumsum()
+    total = df_aux.groupby(group_keys, observed=True)['count'].transform('sum')
+
+    out = df_aux.groupby(group_keys, observed=True)['count'].sum().rename('count').reset_index()
+    for q in percentiles:
+        tempo = (df_aux.loc[acumulado >= q * total, group_keys + ['Time_taken(min)']]
+                 .groupby(group_keys, observed=True)['Time_taken(min)'].min())
+        out['p{:g}'.format(q * 100)] = tempo.to_numpy()
+
+    return out.drop(columns=['_total']) if not by else out
+
+
+def summarize(cube, by, measure='time'):
+    """ Agrupa um rollup e recupera média/desvio padrão de uma medida
+        
+        Input: rollup (filtrado) ou resultado de regroup, lista de colunas do
+               agrupamento, medida ('time' ou 'rating')
+        Output: Dataframe com as colunas do agrupamento, count, avg_<medida>,
+                std_<medida> e, no rollup principal, avg_distance
+    """
+    df_aux = regroup(cube, by)
+
+    out = df_aux.loc[:, list(by) + ['count']].copy()
+    out['avg_' + measure], out['std_' + measure] = mean_std(df_aux, measure)
+    if 'distance_sum' in df_aux.columns:
+        out['avg_distance'] = df_aux['distance_sum'] / df_aux['count']
+
+    return out
+
+
+class Generation:
+    """ Versão do dataset fixada para uma execução de página
+        Rollups, sketches, histograma de tempos e projeções do dataset vêm de
+        uma única geração: a publicada pela atualização em segundo plano
+        (utils.refresh) no início da execução ou, sem ela, as entradas do cache
+        do processo. Cada parte é resolvida uma vez, então uma geração publicada
+        no meio da execução não mistura versões nos painéis. Leituras feitas
+        fora da geração publicada vêm do disco: se o csv não é mais o do início
+        da execução, a geração fica stale e os resultados não vão para os
+        caches compartilhados.
+    """
+
+    def __init__(self, path=DATASET_PATH):
+        self.path = path
+        self.published = published(path)
+        self.version = self._csv_version() if self.published is None else self._source(self.published['version'][0])
+        self.stale = False
+        self._rollups = None
+        self._datasets = {}
+
+    @staticmethod
+    def _source(version):
+        # (tamanho, mtime) do csv, como gravado nos snapshots
+        return None if version is None else list(version[1:])
+
+    def _csv_version(self):
+        return self._source(dataset_version(self.path))
+
+    def _loaded(self):
+        # leitura fora da geração publicada: vale a versão do csv em disco
+        if self._csv_version() != self.version:
+            self.stale = True
+
+    @property
+    def rollups(self):
+        # entrada dos rollups (ver rollups_entry)
+        if self._rollups is None:
+            if self.published is not None and self.published['rollups'] is not None:
+                self._rollups = self.published['rollups']
+            else:
+                self._rollups = rollups_cache_entry(self.path)
+                self._loaded()
+        return self._rollups
+
+    @property
+    def cube(self):
+        return self.rollups[1]
+
+    @property
+    def deliverer_cube(self):
+        return self.rollups[2]
+
+    @property
+    def time_histogram(self):
+        return self.rollups[4]
+
+    @property
+    def sketches(self):
+        return self.rollups[5]
+
+    def dataset(self, columns=None):
+        """ Projeção do dataset limpo da geração (ver utils.dataset.load_dataset)
+            
+            Input: lista de colunas (None = todas)
+            Output: Dataframe limpo
+        """
+        columns = tuple(columns) if columns is not None else None
+        if columns not in self._datasets:
+            datasets = self.published['datasets'] if self.published is not None else {}
+            if columns in datasets:
+                self._datasets[columns] = datasets[columns][1]
+            else:
+                self._datasets[columns] = load_dataset(self.path, columns)
+                self._loaded()
+        return self._datasets[columns]
+
+    def sqlite_available(self):
+        # o banco SQLite corresponde ao csv em disco: só é usado se ele ainda for o da geração
+        return sqlstore.available(self.path) and self._csv_version() == self.version
+
+
+class FilteredRollups:
+    """ Rollups de uma geração (ver Generation) com os filtros da barra lateral
+        Os rollups só são filtrados no primeiro acesso e os reagrupamentos
+        ficam guardados, então os painéis de uma página compartilham o mesmo
+        trabalho. A carga e a filtragem são medidas como etapas separadas
+        quando um stage (ex.: Recorder.stage) é informado.
+    """
+
+    def __init__(self, date_limit, traffic_options, path=DATASET_PATH, stage=None, generation=None):
+        self.date_limit = date_limit
+        self.traffic_options = traffic_options
+        self.path = path
+        self.generation = generation or Generation(path)
+        self.stage = stage or (lambda name: nullcontext())
+        self._cubes = None
+        self._sketches = None
+        self._histogram = None
+        self._regrouped = {}
+        self._summaries = {}
+
+    def _load(self):
+        if self._cubes is None:
+            with self.stage('load_rollups'):
+                cube, deliverer_cube = self.generation.cube, self.generation.deliverer_cube
+            with self.stage('filter_rollups'):
+                self._cubes = (filter_rollup(cube, self.date_limit, self.traffic_options),
+                               filter_rollup(deliverer_cube, self.date_limit, self.traffic_options))
+        return self._cubes
+
+    @property
+    def cube(self):
+        return self._load()[0]
+
+    @property
+    def deliverer_cube(self):
+        return self._load()[1]
+
+    @property
+    def sketches(self):
+        # entregadores distintos por célula, só das células dentro dos filtros
+        if self._sketches is None:
+            with self.stage('load_sketches'):
+                sketches = self.generation.sketches
+            with self.stage('filter_rollups'):
+                self._sketches = sketches.filter(self.date_limit, self.traffic_options)
+        return self._sketches
+
+    @property
+    def time_histogram(self):
+        # histograma de tempos, só das células dentro dos filtros
+        if self._histogram is None:
+            with self.stage('load_rollups'):
+                histogram = self.generation.time_histogram
+            with self.stage('filter_rollups'):
+                self._histogram = filter_rollup(histogram, self.date_limit, self.traffic_options)
+        return self._histogram
+
+    def regroup(self, by):
+        # reagrupamento do rollup principal, calculado uma vez por agrupamento
+        key = tuple(by)
+        if key not in self._regrouped:
+            self._regrouped[key] = regroup(self.cube, list(by))
+        return self._regrouped[key]
+
+    def summary(self, keys, by):
+        # summarize de um reagrupamento, calculado uma vez por (reagrupamento, agrupamento)
+        key = (tuple(keys), tuple(by))
+        if key not in self._summaries:
+            self._summaries[key] = summarize(self.regroup(keys), list(by))
+        return self._summaries[key]
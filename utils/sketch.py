@@ -0,0 +1,146 @@
+# Libraries
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import filter_dataset
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Contagem de valores distintos combinável (HyperLogLog)
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Precisão dos sketches. O padrão (0) é o modo exato, que guarda os valores
+# distintos de cada célula. Com CURRY_HLL_PRECISION=p > 0 cada célula guarda
+# 2^p registradores HyperLogLog, com erro relativo típico de 1.04 / sqrt(2^p)
+# (p=12: ~1.6%, 4 KB por célula), e as páginas indicam que a contagem é aproximada.
+HLL_PRECISION = int(os.environ.get('CURRY_HLL_PRECISION', '0'))
+
+# Granularidade dos sketches de entregadores
+SKETCH_KEYS = ['Order_Date', 'City', 'Road_traffic_density']
+
+
+def hash_values(values):
+    # hash de 64 bits estável entre processos e versões (o hash() do Python muda a cada execução)
+    return pd.util.hash_array(np.asarray(values, dtype=object).astype(str), categorize=True)
+
+
+def _leading_zeros(w):
+    # quantidade de zeros à esquerda de cada inteiro de 64 bits (busca binária vetorizada)
+    zeros = np.zeros(len(w), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        vazio = (w >> np.uint64(64 - shift)) == 0
+        zeros[vazio] += shift
+        w = np.where(vazio, w << np.uint64(shift), w)
+    zeros[w == 0] = 64
+    return zeros
+
+
+def hll_registers(hashes, rows, n_rows, precision=HLL_PRECISION):
+    """ Registradores HyperLogLog de cada linha (célula) a partir dos hashes
+        Os p primeiros bits escolhem o registrador e o registrador guarda a
+        maior posição do primeiro bit 1 dos bits restantes.
+        
+        Input: hashes (uint64), linha de destino de cada hash, quantidade de linhas, precisão
+        Output: array uint8 [linhas, 2^p]
+    """
+    registers = np.zeros((n_rows, 2 ** precision), dtype=np.uint8)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    rank = np.minimum(_leading_zeros(hashes << np.uint64(precision)), 64 - precision) + 1
+    np.maximum.at(registers, (rows, index), rank)
+    return registers
+
+
+def hll_estimate(registers):
+    """ Estimativa da quantidade de distintos de cada linha de registradores
+        (estimador harmônico com correção por contagem linear para poucos valores)
+        
+        Input: array [linhas, 2^p] (ou um único vetor de registradores)
+        Output: array de estimativas
+    """
+    registers = np.atleast_2d(registers)
+    m = registers.shape[1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+
+    estimate = alpha * m * m / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+    zeros = (registers == 0).sum(axis=1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((estimate <= 2.5 * m) & (zeros > 0), linear, estimate)
+
+
+class DistinctSketches:
+    """ Valores distintos de uma coluna por célula (dia, cidade, trânsito)
+        Cada célula guarda um sketch HyperLogLog (ou, no modo exato, os códigos
+        dos valores distintos). O sketch de um conjunto de células é a
+        combinação dos sketches (máximo registrador a registrador, ou união no
+        modo exato), então qualquer período e seleção de trânsito é contado sem
+        reler os pedidos.
+    """
+
+    def __init__(self, cells, registers=None, members=None, offsets=None):
+        # cells: células ordenadas por Order_Date, com a coluna 'row' apontando para os sketches
+        self.cells = cells
+        self.registers = registers
+        self.members = members
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, df, column, keys=SKETCH_KEYS, precision=HLL_PRECISION):
+        """ Sketches de cada célula de um dataframe
+            
+            Input: Dataframe com as colunas da célula e a coluna contada (pode ser um
+                   rollup com uma linha por célula e valor), colunas da célula, precisão (0 = exato)
+            Output: DistinctSketches
+        """
+        grupos = df.groupby(keys, observed=True, sort=True)
+        rows = grupos.ngroup().to_numpy()
+        cells = grupos.size().index.to_frame(index=False)
+        cells['row'] = np.arange(len(cells))
+
+        if precision > 0:
+            return cls(cells, registers=hll_registers(hash_values(df[column].to_numpy()), rows, len(cells), precision))
+
+        # modo exato: códigos distintos de cada célula, contíguos por célula
+        codes = pd.factorize(df[column].to_numpy())[0]
+        pares = np.unique(np.stack([rows, codes]), axis=1)
+        offsets = np.searchsorted(pares[0], np.arange(len(cells) + 1))
+        return cls(cells, members=pares[1], offsets=offsets)
+
+    @property
+    def exact(self):
+        return self.registers is None
+
+    @property
+    def nbytes(self):
+        sketches = self.registers.nbytes if not self.exact else self.members.nbytes + self.offsets.nbytes
+        return int(self.cells.memory_usage(deep=True).sum()) + sketches
+
+    def filter(self, date_limit, traffic_options):
+        """ Sketches só das células dentro dos filtros da barra lateral (os sketches são compartilhados)
+            
+            Input: data limite (exclusiva), lista de condições de trânsito
+            Output: DistinctSketches
+        """
+        return DistinctSketches(filter_dataset(self.cells, date_limit, traffic_options), self.registers, self.members, self.offsets)
+
+    def _count(self, rows):
+        # quantidade de distintos da combinação dos sketches das linhas
+        if len(rows) == 0:
+            return 0
+        if not self.exact:
+            return int(round(hll_estimate(np.maximum.reduce(self.registers[rows], axis=0))[0]))
+        return len(np.unique(np.concatenate([self.members[self.offsets[row]:self.offsets[row + 1]] for row in rows])))
+
+    def count(self, by=None):
+        """ Quantidade de distintos por grupo de células
+            
+            Input: colunas das células (ou Series alinhadas a self.cells) do agrupamento,
+                   None para o total
+            Output: inteiro (total) ou Series indexada pelos grupos
+        """
+        rows = self.cells['row'].to_numpy()
+        if by is None:
+            return self._count(rows)
+
+        grupos = sorted(self.cells.groupby(by, observed=True).indices.items())
+        return pd.Series([self._count(rows[posicoes]) for _, posicoes in grupos], index=[grupo for grupo, _ in grupos], dtype='int64')
@@ -0,0 +1,198 @@
+# Libraries
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+import plotly.io as pio
+
+from utils.dataset import DATASET_PATH
+from utils.lrucache import FIGURE_CACHE_MB, ByteLRU
+from utils.profiling import payload_bytes
+from utils.rollup import FilteredRollups, Generation
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Snapshots pré-calculados dos painéis das páginas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Diretório dos snapshots (um arquivo JSON por página e estado dos filtros)
+SNAPSHOT_DIR = os.environ.get('CURRY_SNAPSHOT_DIR', 'dataset/snapshots')
+
+# Painéis prontos compartilhados por todas as sessões do processo, por
+# (versão do dataset, página, painel, estado dos filtros)
+FIGURE_CACHE = ByteLRU(int(FIGURE_CACHE_MB * 2**20), payload_bytes)
+
+
+def filter_state(date_limit, traffic_options):
+    """ Estado normalizado dos filtros: a mesma seleção sempre gera a mesma chave
+        
+        Input: data limite, lista de condições de trânsito
+        Output: dicionário serializável em JSON
+    """
+    return {'date': pd.Timestamp(date_limit).strftime('%Y-%m-%d'), 'traffic': sorted(traffic_options)}
+
+
+def snapshot_path(page, state, directory=SNAPSHOT_DIR):
+    key = hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.join(directory, page, key + '.json')
+
+
+def source_version(path=DATASET_PATH):
+    # versão do csv de origem (tamanho, mtime em ns); a ingestão de lotes também altera o csv.
+    # Com atualização em segundo plano vale a versão publicada, não a do arquivo em disco.
+    return Generation(path).version
+
+
+def encode(value):
+    """ Converte o resultado de um painel para JSON
+        
+        Input: figura plotly, Dataframe, Series, tupla desses ou valor de métrica
+        Output: dicionário {'kind', 'data'}
+    """
+    if isinstance(value, tuple):
+        return {'kind': 'tuple', 'data': [encode(item) for item in value]}
+    if isinstance(value, pd.DataFrame):
+        return {'kind': 'table', 'data': value.to_json(orient='split', index=False)}
+    if isinstance(value, pd.Series):
+        return {'kind': 'series', 'data': value.to_json(orient='split')}
+    if hasattr(value, 'to_plotly_json'):
+        return {'kind': 'figure', 'data': value.to_json()}
+    if hasattr(value, 'item'):
+        value = value.item()
+    return {'kind': 'metric', 'data': value}
+
+
+def decode(entry):
+    """ Reconstrói o resultado de um painel a partir do JSON gravado por encode """
+    if entry['kind'] == 'tuple':
+        return tuple(decode(item) for item in entry['data'])
+    if entry['kind'] == 'series':
+        return pd.read_json(io.StringIO(entry['data']), orient='split', typ='series', dtype=False, convert_dates=False)
+    if entry['kind'] == 'table':
+        return pd.read_json(io.StringIO(entry['data']), orient='split', dtype=False, convert_dates=False)
+    if entry['kind'] == 'figure':
+        return pio.from_json(entry['data'])
+    return entry['data']
+
+
+def write_snapshot(page, state, panels, version, directory=SNAPSHOT_DIR, params=None):
+    """ Grava os painéis calculados de uma página para um estado dos filtros
+        A escrita é feita em um arquivo temporário e depois renomeada.
+        
+        Input: nome da página, estado dos filtros, dicionário painel -> resultado,
+               versão do csv de origem, diretório dos snapshots e parâmetros
+               usados em cada painel (ex.: {'top_delivers': {'top_k': 10}})
+        Output: caminho do arquivo gravado
+    """
+    params = params or {}
+    path = snapshot_path(page, state, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'page': page, 'state': state, 'source_version': version,
+                   'panels': {name: dict(encode(value), params=params.get(name, {})) for name, value in panels.items()}}, f)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def read_snapshot(page, state, version, directory=SNAPSHOT_DIR):
+    """ Painéis gravados para a página e o estado dos filtros
+        
+        Input: nome da página, estado dos filtros, versão atual do csv, diretório
+        Output: dicionário painel -> JSON, ou None se não houver snapshot da versão atual
+    """
+    if version is None:
+        return None
+    try:
+        with open(snapshot_path(page, state, directory)) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get('source_version') != version or snapshot.get('state') != state:
+        return None
+
+    return snapshot['panels']
+
+
+class Panels:
+    """ Painéis de uma página para os filtros atuais
+        Cada painel vem do snapshot pré-calculado quando existe um da versão
+        atual do dataset; os demais são calculados a partir dos rollups. O
+        snapshot e os rollups só são lidos se algum painel precisar deles.
+        Toda a execução usa uma única geração do dataset (ver
+        utils.rollup.Generation), cuja versão é a chave do snapshot, do memo e
+        do FIGURE_CACHE; os mapas leem as linhas pela mesma geração.
+        Os painéis prontos ficam no FIGURE_CACHE do processo e, com um memo
+        (ex.: dicionário da sessão), também na sessão enquanto os filtros e a
+        versão do dataset não mudarem.
+    """
+
+    def __init__(self, page, builders, date_limit, traffic_options, path=DATASET_PATH, directory=SNAPSHOT_DIR, memo=None, stage=None):
+        state = filter_state(date_limit, traffic_options)
+        self.generation = Generation(path)
+        version = self.generation.version
+
+        self.page = page
+        self.builders = builders
+        self.data = FilteredRollups(date_limit, traffic_options, path, stage, self.generation)
+        self.state = state
+        self.directory = directory
+        self._snapshot = None
+
+        # resultados de outro estado dos filtros são descartados
+        memo = {} if memo is None else memo
+        key = (json.dumps(state, sort_keys=True), None if version is None else tuple(version))
+        self.key = key
+        if memo.get('key') != key:
+            memo.clear()
+            memo['key'] = key
+        self.results = memo.setdefault('results', {})
+
+    @property
+    def snapshot(self):
+        # o arquivo só é lido quando algum painel não está no memo nem no FIGURE_CACHE
+        if self._snapshot is None:
+            self._snapshot = read_snapshot(self.page, self.state, self.generation.version, self.directory) or {}
+        return self._snapshot
+
+    def cached(self, key, builder):
+        # resultado guardado no memo e no FIGURE_CACHE, calculado por builder() só na primeira vez;
+        # resultados de leituras de outra versão (geração stale) não são guardados
+        if key in self.results:
+            return self.results[key]
+
+        fresh = lambda: not self.generation.stale
+        if FIGURE_CACHE.budget > 0:
+            value = FIGURE_CACHE.get((self.key[1], self.page, key, self.key[0]), builder, fresh)
+        else:
+            value = builder()
+        if fresh():
+            self.results[key] = value
+        return value
+
+    def get(self, name, **params):
+        return self.cached((name, tuple(sorted(params.items()))), lambda: self._build(name, params))
+
+    def _build(self, name, params):
+        # o snapshot só vale se o painel foi calculado com os mesmos parâmetros
+        entry = self.snapshot.get(name)
+        if entry is not None and entry.get('params', {}) == params:
+            return decode(entry)
+        return self.builders[name](self.data, params)
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+
+def compute_panels(builders, date_limit, traffic_options, path=DATASET_PATH, params=None):
+    """ Calcula todos os painéis de uma página (usado na exportação)
+        
+        Input: dicionário painel -> função(data, params), filtros, caminho do csv
+               e parâmetros de cada painel
+        Output: dicionário painel -> resultado
+    """
+    params = params or {}
+    data = FilteredRollups(date_limit, traffic_options, path)
+    return {name: builder(data, params.get(name, {})) for name, builder in builders.items()}
@@ -0,0 +1,245 @@
+# Libraries
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from utils.dataset import DATASET_PATH, dataset_chunks, dataset_version, file_lock
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Dataset limpo em SQLite com índices (consultas com os filtros na própria consulta)
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Com CURRY_SQLITE=1 o dataset limpo é publicado uma vez por máquina em um banco
+# SQLite e as consultas das páginas que ainda agregavam linhas (mapas) rodam no
+# banco: só o resultado agregado volta para o pandas. O banco é publicado pela
+# linha de comando (python -m utils.build_cache --sqlite) ou pela atualização em
+# segundo plano, nunca durante a execução de uma página.
+SQLITE = os.environ.get('CURRY_SQLITE', '0') not in ('', '0')
+
+# Nome da tabela e colunas indexadas
+TABLE = 'orders'
+INDEXED_COLUMNS = ['Order_Date', 'Road_traffic_density', 'City', 'Delivery_person_ID']
+
+# Linhas inseridas por vez na publicação
+CHUNKSIZE = 100000
+
+# Conexões de cada thread e bancos desatualizados já avisados no log
+_local = threading.local()
+_warned = set()
+
+
+def sqlite_path_for(path):
+    """ Caminho do banco SQLite correspondente ao csv (mesmo nome, extensão .sqlite) """
+    return os.path.splitext(path)[0] + '.sqlite'
+
+
+def _quote(name):
+    # nome de coluna entre aspas (ex.: "Time_taken(min)")
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def read_sqlite_metadata(sqlite_path):
+    """ Metadados gravados por publish_sqlite, ou None se o banco não existe """
+    if not os.path.exists(sqlite_path):
+        return None
+    try:
+        with closing(sqlite3.connect('file:{}?mode=ro'.format(sqlite_path), uri=True)) as conn:
+            return json.loads(conn.execute('SELECT value FROM metadata WHERE key = ?', ('curry_company',)).fetchone()[0])
+    except (sqlite3.Error, TypeError, ValueError):
+        return None
+
+
+def sqlite_is_fresh(path=DATASET_PATH, sqlite_path=None):
+    """ Verifica se o banco corresponde à versão atual do csv (a ingestão de
+        lotes também altera o csv). Sem o csv o banco é sempre considerado válido.
+        
+        Input: caminho do csv, caminho do banco
+        Output: bool
+    """
+    metadata = read_sqlite_metadata(sqlite_path or sqlite_path_for(path))
+    if metadata is None:
+        return False
+
+    version = dataset_version(path)
+    return version is None or (metadata['source_size'], metadata['source_mtime_ns']) == version[1:]
+
+
+def publish_sqlite(path=DATASET_PATH, sqlite_path=None, force=True, chunksize=CHUNKSIZE):
+    """ Grava o dataset limpo no banco SQLite, com um índice por coluna de
+        INDEXED_COLUMNS. O dataset é lido e inserido em pedaços (ver
+        utils.dataset.dataset_chunks), então nenhum dataframe completo fica em
+        memória. O banco é montado em um arquivo temporário e depois renomeado,
+        sob file_lock; as conexões abertas continuam lendo o arquivo anterior.
+        
+        Input: caminho do csv, caminho do banco (padrão: mesmo nome do csv),
+               publicar mesmo se o banco já estiver atualizado, linhas por pedaço
+        Output: quantidade de linhas gravadas (None se o banco já estava atualizado)
+    """
+    sqlite_path = sqlite_path or sqlite_path_for(path)
+
+    with file_lock(sqlite_path):
+        if not force and sqlite_is_fresh(path, sqlite_path):
+            return None
+
+        version = dataset_version(path)
+        tmp_path = '{}.{}.tmp'.format(sqlite_path, os.getpid())
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            rows = 0
+            for df in dataset_chunks(path, chunksize):
+                # datas como texto ISO (ordenáveis) e categorias como texto
+                df = df.astype({col: str for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+                df['Order_Date'] = df['Order_Date'].dt.strftime('%Y-%m-%d')
+                df.to_sql(TABLE, conn, index=False, if_exists='append')
+                rows += len(df)
+
+            for col in INDEXED_COLUMNS:
+                conn.execute('CREATE INDEX {} ON {} ({})'.format(_quote('idx_' + col), TABLE, _quote(col)))
+            conn.execute('ANALYZE')
+
+            metadata = {'source_size': version[1] if version else None, 'source_mtime_ns': version[2] if version else None,
+                        'rows': rows}
+            conn.execute('CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)')
+            conn.execute('INSERT INTO metadata VALUES (?, ?)', ('curry_company', json.dumps(metadata)))
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, sqlite_path)
+
+    return rows
+
+
+def available(path=DATASET_PATH):
+    """ Indica se as páginas devem consultar o banco: CURRY_SQLITE ligado e
+        banco da versão atual do csv. Um banco ausente ou desatualizado não é
+        republicado durante a execução da página; as páginas usam o pandas e
+        o aviso vai para o log.
+        
+        Input: caminho do csv
+        Output: bool
+    """
+    if not SQLITE:
+        return False
+    if sqlite_is_fresh(path):
+        return True
+
+    if path not in _warned:
+        _warned.add(path)
+        logger.warning('Banco SQLite de %s ausente ou desatualizado: mapas calculados no pandas '
+                       '(rode python -m utils.build_cache --sqlite)', path)
+    return False
+
+
+def connect(path=DATASET_PATH):
+    """ Conexão somente leitura da thread atual com o banco publicado
+        Uma conexão por thread (sqlite3 não compartilha conexões entre threads),
+        reaberta quando o arquivo é republicado.
+        
+        Input: caminho do csv
+        Output: sqlite3.Connection
+    """
+    sqlite_path = sqlite_path_for(path)
+    stat = os.stat(sqlite_path)
+    key = (os.path.abspath(sqlite_path), stat.st_ino, stat.st_mtime_ns)
+
+    connections = _local.__dict__.setdefault('connections', {})
+    conn = connections.get(key[0])
+    if conn is None or conn[0] != key:
+        if conn is not None:
+            conn[1].close()
+        conn = (key, sqlite3.connect('file:{}?mode=ro'.format(sqlite_path), uri=True))
+        connections[key[0]] = conn
+
+    return conn[1]
+
+
+def filter_clause(date_limit, traffic_options):
+    """ Filtros da barra lateral como cláusula WHERE (atendida pelos índices
+        de Order_Date e Road_traffic_density)
+        
+        Input: data limite (exclusiva), lista de condições de trânsito
+        Output: tupla (texto da cláusula, parâmetros)
+    """
+    placeholders = ', '.join('?' for _ in traffic_options)
+    clause = 'Order_Date < ? AND Road_traffic_density IN ({})'.format(placeholders)
+    return clause, [pd.Timestamp(date_limit).strftime('%Y-%m-%d')] + list(traffic_options)
+
+
+def query(sql, params=(), path=DATASET_PATH):
+    """ Executa uma consulta no banco do dataset
+        
+        Input: SQL, parâmetros, caminho do csv
+        Output: Dataframe com o resultado
+    """
+    return pd.read_sql_query(sql, connect(path), params=list(params))
+
+
+def _median_sql(value, groups, source):
+    # mediana de value por grupo com funções de janela (média dos dois valores centrais, como no pandas)
+    partition = ', '.join(groups)
+    return ('SELECT {groups}, AVG(v) AS median FROM ('
+            'SELECT {groups}, {value} AS v, '
+            'ROW_NUMBER() OVER (PARTITION BY {groups} ORDER BY {value}) AS rn, '
+            'COUNT(*) OVER (PARTITION BY {groups}) AS n '
+            'FROM {source} WHERE {value} IS NOT NULL) '
+            'WHERE rn IN ((n + 1) / 2, (n + 2) / 2) GROUP BY {groups}').format(groups=partition, value=value, source=source)
+
+
+def city_medians(date_limit, traffic_options, path=DATASET_PATH):
+    """ Mediana da localização de entrega por cidade e trânsito, calculada no banco
+        
+        Input: data limite, lista de condições de trânsito, caminho do csv
+        Output: Dataframe com City, Road_traffic_density, Delivery_location_latitude
+                e Delivery_location_longitude
+    """
+    where, params = filter_clause(date_limit, traffic_options)
+    groups = ['City', 'Road_traffic_density']
+    source = '(SELECT * FROM {} WHERE {})'.format(TABLE, where)
+
+    sql = ('SELECT lat.City, lat.Road_traffic_density, lat.median AS Delivery_location_latitude, '
+           'lon.median AS Delivery_location_longitude '
+           'FROM ({}) AS lat JOIN ({}) AS lon USING (City, Road_traffic_density) '
+           'ORDER BY lat.City, lat.Road_traffic_density').format(_median_sql('Delivery_location_latitude', groups, source),
+                                                                 _median_sql('Delivery_location_longitude', groups, source))
+    return query(sql, params * 2, path)
+
+
+def grid_cells(date_limit, traffic_options, lat_col, lon_col, cell_size, path=DATASET_PATH):
+    """ Mesmas células de utils.geo.grid_cells, agregadas no banco
+        
+        Input: data limite, lista de condições de trânsito, colunas de
+               latitude/longitude, tamanho da célula em graus, caminho do csv
+        Output: Dataframe com uma linha por célula ocupada: lat/lon do canto
+                sudoeste, count, median_time e median_distance
+    """
+    where, params = filter_clause(date_limit, traffic_options)
+
+    def floor(col):
+        # floor(col / cell_size) sem depender das funções matemáticas opcionais do SQLite
+        x = '({} / {!r})'.format(_quote(col), float(cell_size))
+        return '(CAST({x} AS INTEGER) - ({x} < CAST({x} AS INTEGER)))'.format(x=x)
+
+    source = ('(SELECT {} AS lat_idx, {} AS lon_idx, "Time_taken(min)" AS time, distance FROM {} WHERE {})'
+              .format(floor(lat_col), floor(lon_col), TABLE, where))
+    groups = ['lat_idx', 'lon_idx']
+
+    sql = ('WITH cells AS {source} '
+           'SELECT c.lat_idx, c.lon_idx, c.count, t.median AS median_time, d.median AS median_distance '
+           'FROM (SELECT lat_idx, lon_idx, COUNT(*) AS count FROM cells GROUP BY lat_idx, lon_idx) AS c '
+           'JOIN ({time}) AS t USING (lat_idx, lon_idx) '
+           'LEFT JOIN ({distance}) AS d USING (lat_idx, lon_idx) '
+           'ORDER BY c.lat_idx, c.lon_idx').format(source=source, time=_median_sql('time', groups, 'cells'),
+                                                   distance=_median_sql('distance', groups, 'cells'))
+    cells = query(sql, params, path)
+    cells['lat'] = cells['lat_idx'] * cell_size
+    cells['lon'] = cells['lon_idx'] * cell_size
+
+    return cells.drop(columns=['lat_idx', 'lon_idx'])
@@ -0,0 +1,108 @@
+# Libraries
+import numpy as np
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Acumuladores combináveis de média e desvio padrão (Welford / Chan)
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Cada medida é guardada em três colunas: <prefixo>_n (quantidade de valores
+# válidos), <prefixo>_mean (média) e <prefixo>_m2 (soma dos quadrados dos
+# desvios em relação à média). Acumuladores de partes diferentes dos dados
+# podem ser combinados sem perder precisão, ao contrário de soma/soma dos
+# quadrados.
+
+
+def accumulate(df, by, measures, aggregations=None):
+    """ Acumuladores de cada grupo a partir das linhas do dataset
+        
+        Input: Dataframe, colunas do agrupamento, medidas {prefixo: coluna},
+               agregações extras {nome: (coluna, função)} calculadas no mesmo groupby
+        Output: Dataframe com uma linha por grupo
+    """
+    aggregations = aggregations or {}
+    cols = list(dict.fromkeys(list(measures.values()) + [col for col, _ in aggregations.values()]))
+    df_aux = df.loc[:, list(by) + cols]
+    for col in cols:
+        if df_aux[col].dtype == np.float32:
+            df_aux[col] = df_aux[col].astype('float64')
+
+    named = {}
+    for prefix, col in measures.items():
+        named[prefix + '_n'] = (col, 'count')
+        named[prefix + '_mean'] = (col, 'mean')
+        named[prefix + '_m2'] = (col, 'var')
+    named.update(aggregations)
+
+    acc = df_aux.groupby(by, observed=True).agg(**named).reset_index()
+    for prefix in measures:
+        acc[prefix + '_m2'] = acc[prefix + '_m2'].fillna(0) * (acc[prefix + '_n'] - 1).clip(lower=0)
+
+    return acc
+
+
+def combine(acc, by, prefixes, aggregations=None):
+    """ Combina acumuladores em grupos mais agregados (fórmula de Chan)
+        n = soma dos n; média = média ponderada pelos n;
+        m2 = soma dos m2 + soma de n * (média da parte - média do grupo)^2
+        
+        Input: Dataframe de acumuladores, colunas do novo agrupamento,
+               prefixos das medidas, agregações {coluna: 'sum'/'min'/'max'}
+               das demais colunas
+        Output: Dataframe de acumuladores com uma linha por grupo
+    """
+    aggregations = dict(aggregations or {})
+    df_aux = acc.loc[:, list(by) + list(aggregations)].copy()
+    keys = [acc[col] for col in by]
+
+    for prefix in prefixes:
+        n = acc[prefix + '_n']
+        mean = acc[prefix + '_mean'].where(n > 0, 0)
+        w = n * mean
+        group_mean = w.groupby(keys, observed=True).transform('sum') / n.groupby(keys, observed=True).transform('sum')
+
+        df_aux[prefix + '_n'] = n
+        df_aux[prefix + '_w'] = w
+        df_aux[prefix + '_m2'] = acc[prefix + '_m2'] + (n * (mean - group_mean) ** 2).fillna(0)
+        aggregations.update({prefix + '_n': 'sum', prefix + '_w': 'sum', prefix + '_m2': 'sum'})
+
+    out = df_aux.groupby(by, observed=True).agg(aggregations).reset_index()
+    for prefix in prefixes:
+        out[prefix + '_mean'] = out[prefix + '_w'] / out[prefix + '_n']
+
+    return out.drop(columns=[prefix + '_w' for prefix in prefixes])
+
+
+def mean_std(acc, prefix):
+    """ Média e desvio padrão amostral (ddof=1, como no pandas) de uma medida
+        
+        Input: Dataframe de acumuladores, prefixo da medida
+        Output: tupla de Series (média, desvio padrão)
+    """
+    n = acc[prefix + '_n']
+    std = np.sqrt(acc[prefix + '_m2'].clip(lower=0) / (n - 1)).where(n > 1)
+
+    return acc[prefix + '_mean'], std
+
+
+def merge_tree(partials, merge):
+    """ Combina resultados parciais em árvore, à medida que chegam
+        Parciais de mesmo nível são combinados dois a dois (como um contador
+        binário), então cada linha passa por O(log k) combinações em vez de
+        uma por pedaço, e no máximo log2(k) parciais ficam em memória. Os
+        parciais que sobram são combinados em uma única chamada no final.
+        
+        Input: iterável de resultados parciais, função que combina uma lista de parciais
+        Output: resultado combinado (None se não houver parciais)
+    """
+    pilha = []
+    for partial in partials:
+        nivel = 0
+        while pilha and pilha[-1][0] == nivel:
+            partial = merge([pilha.pop()[1], partial])
+            nivel += 1
+        pilha.append((nivel, partial))
+
+    if not pilha:
+        return None
+    if len(pilha) == 1:
+        return pilha[0][1]
+    return merge([partial for _, partial in pilha])
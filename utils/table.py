@@ -0,0 +1,81 @@
+# Libraries
+import numpy as np
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Tabelas paginadas no servidor
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+class IndexedTable:
+    """ Tabela com índices para ordenação, busca e paginação no servidor
+        A ordenação de cada coluna é calculada na construção, então a tabela
+        guardada no cache de painéis já tem o tamanho final (ver nbytes); a
+        busca por prefixo usa a coluna de busca ordenada (busca binária). Só as
+        linhas da página pedida são materializadas.
+    """
+
+    def __init__(self, df, search_column=None):
+        self.df = df.reset_index(drop=True)
+        self.search_column = search_column
+        # todas as colunas podem ser escolhidas em 'Ordenar por' (views.layout.paged_table)
+        self._orders = {column: np.argsort(self.df[column].to_numpy(), kind='stable') for column in self.df.columns}
+
+        if search_column is not None:
+            keys = self.df[search_column].astype(str).str.upper().to_numpy()
+            self._search_order = np.argsort(keys, kind='stable')
+            self._search_keys = keys[self._search_order]
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def nbytes(self):
+        # memória aproximada da tabela e dos índices (usada pelo cache de painéis)
+        total = int(self.df.memory_usage(deep=True).sum()) + sum(order.nbytes for order in self._orders.values())
+        if self.search_column is not None:
+            total += self._search_order.nbytes + sum(len(key) for key in self._search_keys)
+        return total
+
+    def order(self, column):
+        """ Posições das linhas ordenadas por uma coluna (calculadas na construção)
+            
+            Input: nome da coluna
+            Output: array de posições em ordem crescente
+        """
+        return self._orders[column]
+
+    def search(self, prefix):
+        """ Posições das linhas cuja coluna de busca começa com o prefixo
+            
+            Input: texto (sem diferenciar maiúsculas e minúsculas)
+            Output: array de posições
+        """
+        prefix = prefix.strip().upper()
+        inicio = np.searchsorted(self._search_keys, prefix, side='left')
+        fim = np.searchsorted(self._search_keys, prefix + '\uffff', side='right')
+        return self._search_order[inicio:fim]
+
+    def select(self, search=None, sort_by=None, ascending=True):
+        """ Posições das linhas que atendem à busca, na ordem pedida
+            
+            Input: prefixo buscado na coluna de busca, coluna de ordenação, sentido
+            Output: array de posições
+        """
+        rows = self.search(search) if search and self.search_column is not None else None
+
+        if sort_by is None:
+            positions = np.sort(rows) if rows is not None else np.arange(len(self.df))
+        else:
+            positions = self.order(sort_by)
+            if rows is not None:
+                selecionadas = np.zeros(len(self.df), dtype=bool)
+                selecionadas[rows] = True
+                positions = positions[selecionadas[positions]]
+
+        return positions if ascending else positions[::-1]
+
+    def page(self, positions, page, page_size):
+        """ Linhas de uma página
+            
+            Input: posições retornadas por select, número da página (a partir de 0), linhas por página
+            Output: Dataframe só com as linhas da página
+        """
+        return self.df.iloc[positions[page * page_size:(page + 1) * page_size]]
@@ -0,0 +1,43 @@
+# Libraries
+import numpy as np
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Top-K por grupo
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def _k_extremes(values, k):
+    # posições dos k menores e dos k maiores valores, já ordenadas (seleção parcial + ordenação só dos k)
+    n = len(values)
+    if n <= k:
+        ordem = np.argsort(values, kind='stable')
+        return ordem, ordem[::-1]
+
+    menores = np.argpartition(values, k - 1)[:k]
+    maiores = np.argpartition(values, n - k)[n - k:]
+
+    return menores[np.argsort(values[menores], kind='stable')], maiores[np.argsort(-values[maiores], kind='stable')]
+
+
+def top_k_per_group(df, group, value, k=10):
+    """ Os k menores e os k maiores valores de cada grupo em uma única passada
+        Em vez de ordenar todas as linhas, cada grupo faz uma seleção parcial
+        (argpartition) e ordena apenas os k escolhidos. Os grupos são os
+        presentes nos dados.
+        
+        Input: Dataframe, coluna do grupo, coluna do valor, k
+        Output: tupla (Dataframe dos menores, Dataframe dos maiores), com os
+                grupos em ordem e os valores ordenados dentro de cada grupo
+    """
+    values = df[value].to_numpy(dtype=np.float64)
+    menores, maiores = [], []
+
+    for _, posicoes in sorted(df.groupby(group, observed=True).indices.items()):
+        posicoes = posicoes[~np.isnan(values[posicoes])]
+        idx_menores, idx_maiores = _k_extremes(values[posicoes], k)
+        menores.append(posicoes[idx_menores])
+        maiores.append(posicoes[idx_maiores])
+
+    if not menores:
+        return df.iloc[:0], df.iloc[:0]
+
+    return (df.iloc[np.concatenate(menores)].reset_index(drop=True),
+            df.iloc[np.concatenate(maiores)].reset_index(drop=True))
@@ -0,0 +1 @@
+# Funções de cada página do dashboard (sem chamadas ao Streamlit)
@@ -0,0 +1,118 @@
+# Libraries
+import folium
+import pandas as pd
+import plotly.express as px
+
+from utils.geo import cells_geojson
+from utils.rollup import summarize
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Gráficos e mapas da Visão Empresa
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Pedidos por dia
+def order_metric(cube):
+    # Quantidade de pedidos por dia a partir do rollup
+    df_pedidos_dia = summarize(cube, ['Order_Date'])
+
+    # Desenhar o gráfico de barras
+    fig = px.bar(df_pedidos_dia, x = 'Order_Date', y = 'count')
+    return fig
+
+# Porcentagem de tráfego  
+def traffic_order_share(cube): 
+    df_pedidos_trafego = summarize(cube, ['Road_traffic_density'])
+
+    df_pedidos_trafego['entregas_perc'] = df_pedidos_trafego['count'] / df_pedidos_trafego['count'].sum()
+
+    fig = px.pie(df_pedidos_trafego, values='entregas_perc', names='Road_traffic_density')
+
+    return fig
+# Tráfego por cidade
+def traffic_order_city(cube):
+    df_aux = summarize(cube, ['City', 'Road_traffic_density'])
+    
+    # Fazendo um gráfico de bolhas
+    fig = px.scatter(df_aux, x = 'City', y = 'Road_traffic_density', size='count', color='City')
+    return fig
+
+# Pedidos por semana
+def order_by_week(cube):
+    # Pedidos por dia do rollup, agrupados pela semana do ano
+    df_pedidos_dia = summarize(cube, ['Order_Date'])
+    df_pedidos_dia['week_of_year'] = df_pedidos_dia['Order_Date'].dt.strftime('%U')
+
+    df_pedidos_semana = df_pedidos_dia.loc[:, ['count', 'week_of_year']].groupby(['week_of_year']).sum().reset_index()
+
+    # Desenhando o gráfico
+    fig = px.line(df_pedidos_semana, x = 'week_of_year', y = 'count')
+
+    return fig
+
+def order_by_week_person(deliverer_cube, sketches):
+    # Pedidos por semana do rollup por entregador
+    df_aux01 = (deliverer_cube.loc[:, ['count']]
+                .assign(week_of_year=deliverer_cube['Order_Date'].dt.strftime('%U'))
+                .groupby(['week_of_year']).sum().reset_index())
+
+    # Entregadores únicos por semana: combinação dos sketches das células de cada semana
+    df_aux02 = (sketches.count(sketches.cells['Order_Date'].dt.strftime('%U'))
+                .rename_axis('week_of_year').reset_index(name='Delivery_person_ID'))
+
+    # Quantidade de pedidos dividos pelo número único de entregadores por semana
+    df_aux = pd.merge(df_aux01, df_aux02, how='inner')
+    df_aux['order_by_deliver'] = df_aux['count'] / df_aux['Delivery_person_ID'] 
+
+    fig = px.line(df_aux, x = 'week_of_year', y='order_by_deliver')
+    if not sketches.exact:
+        # com HyperLogLog o número de entregadores é uma estimativa (ver utils.sketch)
+        fig.update_layout(title='Pedidos por entregador (entregadores únicos aproximados)', yaxis_title='order_by_deliver (aprox.)')
+
+    return fig
+
+def city_medians(df):
+    # Mediana da localização de entrega por cidade e trânsito (ver utils.sqlstore.city_medians)
+    cols = ['City', 'Road_traffic_density', 'Delivery_location_latitude', 'Delivery_location_longitude']
+    return df.loc[:, cols].groupby(['City','Road_traffic_density'], observed=True).median().reset_index()
+
+def country_maps(df_aux):
+        # df_aux: medianas de city_medians, calculadas no pandas ou no banco
+        map = folium.Map()
+        for index, location_info in df_aux.iterrows():
+            folium.Marker([location_info['Delivery_location_latitude'],
+                          location_info['Delivery_location_longitude']],
+                          popup=location_info[['City', 'Road_traffic_density']]).add_to(map)
+        return map
+
+def density_map(grid, cell_size):
+    # Entregas e restaurantes agregados em células no servidor: o mapa recebe uma camada GeoJSON por tipo de ponto.
+    # grid(lat_col, lon_col, cell_size) devolve as células (utils.geo.grid_cells ou utils.sqlstore.grid_cells)
+    layers = {'Entregas': ('Delivery_location_latitude', 'Delivery_location_longitude', '#d7301f'),
+              'Restaurantes': ('Restaurant_latitude', 'Restaurant_longitude', '#2171b5')}
+
+    map = folium.Map()
+    for name, (lat_col, lon_col, color) in layers.items():
+        cells = grid(lat_col, lon_col, cell_size)
+        if len(cells) == 0:
+            continue
+
+        folium.GeoJson(cells_geojson(cells, cell_size), name=name,
+                       style_function=lambda feature, color=color: {'fillColor': color, 'color': color, 'weight': 0,
+                                                                    'fillOpacity': 0.1 + 0.7 * feature['properties']['intensity']},
+                       tooltip=folium.GeoJsonTooltip(fields=['count', 'median_time', 'median_distance'],
+                                                     aliases=['Pedidos', 'Tempo mediano (min)', 'Distância mediana (km)'])).add_to(map)
+
+        if name == 'Entregas':
+            map.fit_bounds([[cells['lat'].min(), cells['lon'].min()],
+                            [cells['lat'].max() + cell_size, cells['lon'].max() + cell_size]])
+
+    folium.LayerControl().add_to(map)
+    return map
+
+
+# Painéis da página calculados a partir dos rollups filtrados (ver utils.snapshot.Panels).
+# Os mapas dependem das linhas do dataset (ou do banco SQLite) e continuam sendo calculados na página.
+PANELS = {'order_metric': lambda data, params: order_metric(data.cube),
+          'traffic_order_share': lambda data, params: traffic_order_share(data.cube),
+          'traffic_order_city': lambda data, params: traffic_order_city(data.cube),
+          'order_by_week': lambda data, params: order_by_week(data.cube),
+          'order_by_week_person': lambda data, params: order_by_week_person(data.deliverer_cube, data.sketches)}
@@ -0,0 +1,51 @@
+# Libraries
+from utils.rollup import regroup, summarize
+from utils.topk import top_k_per_group
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Tabelas da Visão Entregadores
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Retornar os entregadores mais rápidos e mais lentos por cidade
+def top_delivers(deliverer_cube, k=10):
+    # Tempo médio de cada entregador em cada cidade, calculado uma única vez
+    df_delivery_city = (regroup(deliverer_cube, ['City', 'Delivery_person_ID'])
+                        .loc[:, ['City', 'Delivery_person_ID', 'time_mean']]
+                        .rename(columns={'time_mean': 'Time_taken(min)'}))
+
+    # Os k mais rápidos e os k mais lentos de cada cidade em uma passada
+    df_fastest, df_slowest = top_k_per_group(df_delivery_city, 'City', 'Time_taken(min)', k)
+
+    return df_fastest, df_slowest
+
+# Avaliação média de cada entregador
+def ratings_by_deliverer(deliverer_cube):
+    df_aux = summarize(deliverer_cube, ['Delivery_person_ID'], 'rating')
+
+    return df_aux.loc[:, ['Delivery_person_ID', 'avg_rating']].rename(columns={'avg_rating': 'Delivery_person_Ratings'})
+
+# Avaliação média e desvio padrão por condição de trânsito
+def ratings_by_traffic(cube):
+    df_aux = summarize(cube, ['Road_traffic_density'], 'rating')
+
+    # Mudando nomes das colunas
+    return (df_aux.loc[:, ['Road_traffic_density', 'avg_rating', 'std_rating']]
+            .rename(columns={'avg_rating': 'delivery_mean', 'std_rating': 'delivery_std'}))
+
+# Avaliação média e desvio padrão por clima
+def ratings_by_weather(cube):
+    df_aux = summarize(cube, ['Weatherconditions'], 'rating')
+
+    # Mudando os nomes das colunas
+    return (df_aux.loc[:, ['Weatherconditions', 'avg_rating', 'std_rating']]
+            .rename(columns={'avg_rating': 'weather_mean', 'std_rating': 'weather_std'}))
+
+
+# Painéis da página calculados a partir dos rollups filtrados (ver utils.snapshot.Panels)
+PANELS = {'maior_idade': lambda data, params: data.deliverer_cube['age_max'].max(),
+          'menor_idade': lambda data, params: data.deliverer_cube['age_min'].min(),
+          'melhor_condicao': lambda data, params: data.deliverer_cube['vehicle_max'].max(),
+          'pior_condicao': lambda data, params: data.deliverer_cube['vehicle_min'].min(),
+          'ratings_by_deliverer': lambda data, params: ratings_by_deliverer(data.deliverer_cube),
+          'ratings_by_traffic': lambda data, params: ratings_by_traffic(data.cube),
+          'ratings_by_weather': lambda data, params: ratings_by_weather(data.cube),
+          'top_delivers': lambda data, params: top_delivers(data.deliverer_cube, params.get('top_k', 10))}
@@ -0,0 +1,88 @@
+# Libraries
+import folium
+import streamlit as st
+import streamlit.components.v1 as components
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Componentes de layout compartilhados pelas páginas
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def lazy_tabs(labels, key):
+    """ Substitui st.tabs: o st.tabs executa o conteúdo de todas as abas a cada
+        interação, aqui só a aba escolhida é calculada e desenhada
+        
+        Input: nomes das abas, chave do widget
+        Output: índice da aba escolhida
+    """
+    return st.radio('Aba', range(len(labels)), format_func=labels.__getitem__, horizontal=True, key=key,
+                    label_visibility='collapsed')
+
+
+def session_memo(page):
+    """ Resultados dos painéis guardados na sessão entre as interações
+        
+        Input: nome da página
+        Output: dicionário da sessão usado como memo pelo utils.snapshot.Panels
+    """
+    return st.session_state.setdefault('panel_memo_' + page, {})
+
+
+def folium_html(map):
+    """ Renderiza o mapa uma única vez, para guardar o html no memo da sessão
+        (renderizar de novo o mesmo folium.Map duplica as camadas)
+        
+        Input: folium.Map
+        Output: html do mapa
+    """
+    return folium.Figure().add_child(map).render()
+
+
+def static_map(html, width=1024, height=600):
+    # mesmo componente usado pelo folium_static, a partir do html já renderizado
+    components.html(html, height=height + 10, width=width)
+
+
+def dataset_status(container, status):
+    """ Mostra a versão do dataset em uso e a duração da última carga
+        
+        Input: container do streamlit (ex.: st.sidebar), dicionário de utils.refresh.status
+        Output: None
+    """
+    if status is None:
+        return
+
+    linhas = ['Dados de {:%d-%m-%Y %H:%M}'.format(status['modified']) if status['modified'] else 'Dados carregados']
+    if status['rows'] is not None:
+        linhas.append('{} pedidos'.format(status['rows']))
+    if status['load_seconds'] is not None:
+        linhas.append('carga em {:.2f} s'.format(status['load_seconds']))
+    if status['loaded_at'] is not None:
+        linhas.append('atualizado às {:%H:%M:%S}'.format(status['loaded_at']))
+    container.caption(' · '.join(linhas))
+
+    if status['error']:
+        container.caption('Falha na última atualização: {}'.format(status['error']))
+
+
+def paged_table(table, key, page_size=25, search_label='Buscar'):
+    """ Tabela paginada: ordenação, busca e paginação rodam no servidor
+        (utils.table.IndexedTable) e só as linhas da página são enviadas ao
+        navegador
+        
+        Input: IndexedTable, prefixo das chaves dos widgets, linhas por página,
+               rótulo do campo de busca
+        Output: Dataframe da página exibida
+    """
+    col1, col2, col3 = st.columns([2, 2, 1])
+    search = col1.text_input(search_label, key=key + '_search') if table.search_column is not None else None
+    sort_by = col2.selectbox('Ordenar por', ['—'] + list(table.df.columns), key=key + '_sort')
+    ascending = col3.radio('Ordem', ['↑', '↓'], horizontal=True, key=key + '_order') == '↑'
+
+    positions = table.select(search, None if sort_by == '—' else sort_by, ascending)
+    pages = max(1, -(-len(positions) // page_size))
+    page = min(int(st.number_input('Página (de {})'.format(pages), min_value=1, value=1, step=1, key=key + '_page')), pages)
+
+    df_page = table.page(positions, page - 1, page_size)
+    st.dataframe(df_page)
+    st.caption('{} linhas'.format(len(positions)))
+
+    return df_page
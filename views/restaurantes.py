@@ -0,0 +1,93 @@
+# Libraries
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from utils.rollup import PERCENTILES, summarize, time_percentiles
+
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Métricas e gráficos da Visão Restaurantes
+# -----------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def distance(cube, fig):
+    # A distância de cada pedido já vem somada nas células do rollup
+    if fig:
+        avg_distance = summarize(cube, ['City'])
+
+        fig = go.Figure(data= [go.Pie(labels=avg_distance['City'], values=avg_distance['avg_distance'], pull=[0, 0.1, 0])])
+        return fig
+    else:
+        avg_distance = np.round(cube['distance_sum'].sum() / cube['count'].sum(), 2)
+        return avg_distance
+
+def avg_std_time_deliverie(df_festival, operation, festival):
+    # df_festival: summarize por Festival, calculado uma vez para as quatro métricas
+    df_aux = np.round(df_festival.loc[df_festival['Festival'] == festival, operation], 2)
+
+    return df_aux
+
+def avg_std_time_graph(cube):    
+    df_aux = summarize(cube, ['City'])
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name = 'Control', x=df_aux['City'], y=df_aux['avg_time'], error_y=dict(type='data', array=df_aux['std_time'])))
+    fig.update_layout(barmode='group')
+
+    return fig
+
+def avg_std_time_on_traffic(cube):
+    df_aux = summarize(cube, ['City', 'Road_traffic_density'])
+
+    fig = px.sunburst(df_aux, path=['City', 'Road_traffic_density'], values='avg_time',
+                     color='std_time', color_continuous_scale='RdBu',
+                     color_continuous_midpoint=np.average(df_aux['std_time']))
+    return fig
+
+def time_by_city_order(cube):
+    df_aux = summarize(cube, ['City', 'Type_of_order'])
+
+    return df_aux.loc[:, ['City', 'Type_of_order', 'avg_time', 'std_time']]
+
+def percentile_time_graph(histogram):
+    # Percentis do tempo de entrega por cidade
+    df_aux = time_percentiles(histogram, ['City'])
+    cols = ['p{:g}'.format(q * 100) for q in PERCENTILES]
+
+    fig = go.Figure()
+    for col in cols:
+        fig.add_trace(go.Bar(name=col, x=df_aux['City'], y=df_aux[col]))
+    fig.update_layout(barmode='group', yaxis_title='Time_taken(min)')
+
+    return fig
+
+def percentile_time_on_traffic(histogram):
+    # Percentis do tempo de entrega por cidade e condição de trânsito
+    df_aux = time_percentiles(histogram, ['City', 'Road_traffic_density'])
+
+    return df_aux
+
+
+# Granularidade que atende todas as métricas de tempo e distância da página: os
+# acumuladores do filtro atual são combinados uma única vez nela
+TIME_STATS_KEYS = ['City', 'Road_traffic_density', 'Festival', 'Type_of_order']
+
+
+def festival_time(data, operation, festival):
+    # média/desvio padrão do tempo de entrega com ou sem festival (o summarize
+    # por Festival é calculado uma vez e compartilhado pelas quatro métricas)
+    return avg_std_time_deliverie(data.summary(TIME_STATS_KEYS, ['Festival']), operation, festival)
+
+
+# Painéis da página calculados a partir dos rollups filtrados (ver utils.snapshot.Panels)
+PANELS = {'entregadores_unicos': lambda data, params: data.sketches.count(),
+          'distancia_media': lambda data, params: distance(data.regroup(TIME_STATS_KEYS), False),
+          'festival_avg_time': lambda data, params: festival_time(data, 'avg_time', 'Yes'),
+          'festival_std_time': lambda data, params: festival_time(data, 'std_time', 'Yes'),
+          'no_festival_avg_time': lambda data, params: festival_time(data, 'avg_time', 'No'),
+          'no_festival_std_time': lambda data, params: festival_time(data, 'std_time', 'No'),
+          'avg_std_time_graph': lambda data, params: avg_std_time_graph(data.regroup(TIME_STATS_KEYS)),
+          'time_by_city_order': lambda data, params: time_by_city_order(data.regroup(TIME_STATS_KEYS)),
+          'distance': lambda data, params: distance(data.regroup(TIME_STATS_KEYS), True),
+          'avg_std_time_on_traffic': lambda data, params: avg_std_time_on_traffic(data.regroup(TIME_STATS_KEYS)),
+          'time_percentiles': lambda data, params: time_percentiles(data.time_histogram),
+          'percentile_time_graph': lambda data, params: percentile_time_graph(data.time_histogram),
+          'percentile_time_on_traffic': lambda data, params: percentile_time_on_traffic(data.time_histogram)}